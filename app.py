@@ -75,8 +75,7 @@ def delete_file(filename):
 def edit_file(filename):
     field_loader = FieldLoader(ASSETS_FOLDER, filename)
     fields = field_loader.load_fields_to_dict()
-    all_expends_field = field_loader.get_all_fields(fields)
-    available_parent_fields = FieldLoader.get_available_parent_fields(all_expends_field)
+    available_parent_fields = field_loader.load_views().parent_fields
 
     return render_template('editor.html',
                            filename=filename,
@@ -192,8 +191,7 @@ def edit_field(filename, field_path):
     parent = field_loader.find_field_by_path(data, parent_path)
 
     target = field_loader.find_field_by_path(data, field_path)
-    all_expends_field = field_loader.get_all_fields(data)
-    available_fields = FieldLoader.get_available_child_fields(all_expends_field)
+    available_fields = field_loader.load_views().child_fields
 
     return render_template('field_editor.html',
                            parent=parent,
@@ -0,0 +1,73 @@
+import json
+import os
+import random
+from typing import List
+
+_CONDITION_VALUES = {"string": "x", "number": 1, "bool": "True", "ip": "10.0.0.1", "object": None}
+_REGEXES = [r"^[a-z0-9_-]+$", r"^\d+$", r"^(\d{1,3}\.){3}\d{1,3}$", r"^[A-Za-z][\w.]*$"]
+
+
+def generate_rules(depth: int = 3, breadth: int = 10, seed: int = 0,
+                   conditions: float = 0.0, regexes: float = 0.0) -> List[dict]:
+    """產生規則檔內容（與 save_json 寫出的格式相同）
+
+    每一層 breadth 個欄位，前 depth - 1 層為 object 並帶有下一層子欄位，
+    節點總數為 breadth + breadth^2 + ... + breadth^depth。
+    conditions：非必填欄位帶有 condition（引用同一層前面的欄位）的比例。
+    regexes：string 欄位啟用 regex 的比例。
+    兩者使用另一個亂數來源，調整比例不會改變樹的形狀與型別。
+    """
+    rng = random.Random(seed)
+    extra = random.Random(seed + 1)
+
+    def level(current_depth: int, prefix: str) -> List[dict]:
+        fields = []
+        for n in range(breadth):
+            key = f"{prefix}f{n}"
+            has_children = current_depth < depth
+            field_type = "object" if has_children else rng.choice(["string", "number", "bool", "ip"])
+            required = rng.random() < 0.2
+            field = {
+                "key": key,
+                "description": f"generated field {key}",
+                "multi_type": [field_type],
+                "item_multi_type": [],
+                "regex": None,
+                "regex_enabled": False,
+                "required": required,
+                "condition": None,
+                "children": level(current_depth + 1, f"{key}_") if has_children else [],
+            }
+            if field_type == "string" and regexes and extra.random() < regexes:
+                field["regex"] = extra.choice(_REGEXES)
+                field["regex_enabled"] = True
+            if fields and not required and conditions and extra.random() < conditions:
+                target = extra.choice(fields)
+                target_type = target["multi_type"][0]
+                value = _CONDITION_VALUES[target_type]
+                field["condition"] = {
+                    "logical": "and",
+                    "conditions": [{
+                        "key": path_prefix(prefix) + target["key"],
+                        "operator": "not_empty" if value is None else "eq",
+                        "value": value,
+                    }],
+                }
+            fields.append(field)
+        return fields
+
+    def path_prefix(prefix: str) -> str:
+        # key 本身帶有祖先的名稱（f1_f2），dotted path 為 f1.f1_f2
+        parts = prefix.rstrip("_").split("_") if prefix else []
+        return "".join("_".join(parts[:n + 1]) + "." for n in range(len(parts)))
+
+    return level(1, "")
+
+
+def write_rules(folder: str, filename: str, **kwargs) -> str:
+    """產生規則檔並寫到 folder/filename，回傳檔案路徑"""
+    os.makedirs(folder, exist_ok=True)
+    file_path = os.path.join(folder, filename)
+    with open(file_path, "w") as f:
+        json.dump(generate_rules(**kwargs), f, indent=4)
+    return file_path
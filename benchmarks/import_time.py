@@ -0,0 +1,72 @@
+"""啟動時間：在全新的 Python process 中 import 模組（python -X importtime），列出最耗時的直接 import
+
+python -m benchmarks.import_time --repeat 5
+python -m benchmarks.import_time main src.utils --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+DEFAULT_MODULES = ["main", "src.utils", "src.models"]
+# 不應該出現在 FastAPI 啟動路徑上的套件
+WATCHED = ["flask", "jinja2", "werkzeug", "sqlite3"]
+
+_CHECK = "import sys, json; import {module}; print(json.dumps([m for m in {watched!r} if m in sys.modules]))"
+
+
+def profile(module: str) -> dict:
+    """執行一次 import，回傳總時間、每個直接 import 的累計時間（微秒）與已載入的 WATCHED 套件"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": root}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", _CHECK.format(module=module, watched=WATCHED)],
+                            cwd=root, env=env, capture_output=True, text=True, check=True)
+    total, children, pending = 0, {}, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        # 子模組先於父模組輸出，遇到最外層的模組時才知道前面的 import 屬於誰
+        if depth == 0:
+            if name.strip() == module:
+                total, children = int(cumulative), pending
+            pending = {}
+        elif depth == 1:
+            pending[name.strip()] = int(cumulative)
+    return {"total_us": total, "children": children, "loaded": json.loads(result.stdout.splitlines()[-1])}
+
+
+def run(modules: List[str], repeat: int, top: int) -> dict:
+    results: Dict[str, dict] = {}
+    for module in modules:
+        runs = [profile(module) for _ in range(repeat)]
+        totals = [r["total_us"] / 1000 for r in runs]
+        # 每個直接 import 取各次的中位數
+        names = runs[0]["children"]
+        children = {name: statistics.median(r["children"].get(name, 0) for r in runs) / 1000 for name in names}
+        slowest = sorted(children.items(), key=lambda item: item[1], reverse=True)[:top]
+        results[module] = {
+            "runs": repeat,
+            "min_ms": round(min(totals), 3),
+            "median_ms": round(statistics.median(totals), 3),
+            "loaded": runs[0]["loaded"],
+            "slowest_imports_ms": {name: round(ms, 3) for name, ms in slowest},
+        }
+    return {"meta": {"python": sys.version.split()[0], "repeat": repeat}, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="how many direct imports to list")
+    args = parser.parse_args()
+    print(json.dumps(run(args.modules, args.repeat, args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""比較 pydantic Field 樹與 CompactTree 每個節點的記憶體用量
+
+python -m benchmarks.memory --depth 3 --breadth 47
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+from benchmarks.generator import generate_rules
+from src.models import Field
+from src.utils.compact_tree import CompactTree, count_nodes
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def run(depth: int, breadth: int) -> dict:
+    data = generate_rules(depth=depth, breadth=breadth)
+    nodes = count_nodes(data)
+
+    # ConditionField 建立時會 print，避免輸出影響計時
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        fields, pydantic_bytes, pydantic_seconds = measure(lambda: [Field.from_dict(item) for item in data])
+    compact, compact_bytes, compact_seconds = measure(lambda: CompactTree.from_json(data))
+    _, from_fields_bytes, from_fields_seconds = measure(lambda: CompactTree.from_fields(fields))
+
+    return {
+        "nodes": nodes,
+        "pydantic": {"bytes_per_node": pydantic_bytes / nodes, "build_seconds": pydantic_seconds},
+        "compact": {"bytes_per_node": compact_bytes / nodes, "build_seconds": compact_seconds},
+        "compact_from_fields": {"bytes_per_node": from_fields_bytes / nodes, "build_seconds": from_fields_seconds},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--breadth", type=int, default=47)
+    args = parser.parse_args()
+    print(json.dumps(run(args.depth, args.breadth), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""比較 JSON 資料夾與 SQLite 兩種規則儲存方式：整檔載入、單一欄位讀取與修改、condition 引用查詢
+
+python -m benchmarks.stores --depth 3 --breadth 20
+"""
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.generator import generate_rules, write_rules
+from benchmarks.suite import deepest_path, measure
+from src.models import Field
+from src.utils.compact_tree import count_nodes
+from src.utils.field_cache import field_cache
+from src.utils.rule_store import JsonDirectoryStore, RuleStore, copy_rules
+from src.utils.sqlite_store import SqliteRuleStore
+
+RULES_FILE = "gen/rules.json"
+
+
+def _leaf(key: str, description: str = "") -> Field:
+    return Field(key=key, description=description, multi_type=["string"], item_multi_type=[])
+
+
+def run_store(store: RuleStore, repeat: int, clear_cache: bool) -> Dict[str, dict]:
+    fields = store.load(RULES_FILE)
+    path = deepest_path(fields)
+    parent = fields[-1].key
+    referenced = next((c.key for field in fields for c in (field.condition.conditions if field.condition else ())),
+                      fields[0].key)
+    cold = field_cache.clear if clear_cache else None
+
+    def key(n: int) -> str:
+        return f"bench_{n + repeat}"
+
+    return {
+        "load.cold": measure(lambda n: store.load(RULES_FILE), repeat, setup=cold),
+        "get_field.cold": measure(lambda n: store.get_field(RULES_FILE, path), repeat, setup=cold),
+        "get_field.warm": measure(lambda n: store.get_field(RULES_FILE, path), repeat),
+        # 依序新增、修改、刪除同一批欄位，跑完後內容回到原本的樣子
+        "add_field": measure(lambda n: store.add_field(RULES_FILE, parent, _leaf(key(n))), repeat),
+        "replace_field": measure(lambda n: store.replace_field(RULES_FILE, parent, _leaf(key(n), "updated")), repeat),
+        "remove_field": measure(lambda n: store.remove_field(RULES_FILE, parent, key(n)), repeat),
+        "references": measure(lambda n: store.references(referenced), repeat),
+    }
+
+
+def run(depth: int, breadth: int, conditions: float, regexes: float, repeat: int) -> dict:
+    params = {"depth": depth, "breadth": breadth, "conditions": conditions, "regexes": regexes}
+    with tempfile.TemporaryDirectory() as folder, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        root = os.path.join(folder, "json")
+        write_rules(os.path.join(root, os.path.dirname(RULES_FILE)), os.path.basename(RULES_FILE), **params)
+        json_store = JsonDirectoryStore(root)
+        sqlite_store = SqliteRuleStore(os.path.join(folder, "rules.db"))
+        try:
+            start = time.perf_counter()
+            copy_rules(json_store, sqlite_store)
+            import_seconds = time.perf_counter() - start
+
+            results = {
+                "json": run_store(json_store, repeat, clear_cache=True),
+                "sqlite": run_store(sqlite_store, repeat, clear_cache=False),
+            }
+            start = time.perf_counter()
+            copy_rules(sqlite_store, JsonDirectoryStore(os.path.join(folder, "exported")))
+            export_seconds = time.perf_counter() - start
+        finally:
+            sqlite_store.close()
+            field_cache.clear()
+
+    return {
+        "meta": {"nodes": count_nodes(generate_rules(**params)), "repeat": repeat, **params},
+        "import_seconds": round(import_seconds, 4),
+        "export_seconds": round(export_seconds, 4),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--breadth", type=int, default=20)
+    parser.add_argument("--conditions", type=float, default=0.1, help="ratio of fields with a condition")
+    parser.add_argument("--regexes", type=float, default=0.2, help="ratio of string fields with a regex")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(run(args.depth, args.breadth, args.conditions, args.regexes, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
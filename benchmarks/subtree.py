@@ -0,0 +1,70 @@
+"""比較大檔案冷啟動時讀取單一欄位：完整解析整個檔案 vs 串流只讀出目標子樹
+
+python -m benchmarks.subtree --depth 3 --breadth 40
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.generator import write_rules
+from src.utils import FieldLoader, json_stream
+from src.utils.field_cache import field_cache
+
+
+def measure(loader: FieldLoader, field_path: str, stream: bool) -> dict:
+    """時間與記憶體分開量測，避免 tracemalloc 影響計時"""
+    json_stream.STREAM_MIN_BYTES = 0 if stream else float("inf")
+
+    field_cache.clear()
+    gc.collect()
+    start = time.perf_counter()
+    field = loader.load_field(field_path)
+    elapsed = time.perf_counter() - start
+    assert field is not None
+
+    field_cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    loader.load_field(field_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_bytes": peak}
+
+
+def run(depth: int, breadth: int) -> dict:
+    stream_min_bytes = json_stream.STREAM_MIN_BYTES
+    last = breadth - 1
+    paths = {
+        "first_leaf": ".".join("_".join(["f0"] * (n + 1)) for n in range(depth)),
+        "last_leaf": ".".join("_".join([f"f{last}"] * (n + 1)) for n in range(depth)),
+        "last_subtree": f"f{last}",
+    }
+    try:
+        with tempfile.TemporaryDirectory() as folder, \
+                open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            file_path = write_rules(folder, "rules.json", depth=depth, breadth=breadth)
+            loader = FieldLoader(folder, "rules.json")
+            results = {name: {"full": measure(loader, path, False), "stream": measure(loader, path, True)}
+                       for name, path in paths.items()}
+            size = os.path.getsize(file_path)
+    finally:
+        json_stream.STREAM_MIN_BYTES = stream_min_bytes
+        field_cache.clear()
+    return {"file_bytes": size, "paths": paths, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--breadth", type=int, default=40)
+    args = parser.parse_args()
+    print(json.dumps(run(args.depth, args.breadth), indent=2))
+
+
+if __name__ == "__main__":
+    main()
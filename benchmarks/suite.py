@@ -0,0 +1,248 @@
+"""規則檔的效能測試：FieldLoader / save_json 與每個 FastAPI endpoint（in-process TestClient）
+
+python -m benchmarks.suite --depth 3 --breadth 20 --output results.json
+python -m benchmarks.suite --baseline results.json   # 與先前的結果比較，變慢超過門檻時 exit 1
+
+結果為 JSON，每個項目記錄 min / median / mean（毫秒），附上 commit 與產生資料的參數。
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.generator import generate_rules, write_rules
+from src.models import Field
+from src.utils import FieldLoader
+from src.utils.compact_tree import count_nodes
+from src.utils.field_cache import field_cache
+from src.utils.json_loader import save_json
+
+RULES_FOLDER = "gen"
+RULES_FILE = "rules.json"
+RULES_PATH = f"{RULES_FOLDER}/{RULES_FILE}"
+
+
+def measure(fn: Callable[[int], object], repeat: int, warmup: int = 1,
+            setup: Optional[Callable[[], object]] = None) -> dict:
+    """執行 fn(n) repeat 次（setup 不計入時間），回傳毫秒統計"""
+    for n in range(warmup):
+        if setup is not None:
+            setup()
+        fn(-1 - n)
+    samples = []
+    for n in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        fn(n)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+    }
+
+
+def deepest_path(fields: List[Field]) -> str:
+    """每一層都取最後一個欄位，得到最深、查找時走最遠的路徑"""
+    parts = []
+    while fields:
+        parts.append(fields[-1].key)
+        fields = fields[-1].children
+    return ".".join(parts)
+
+
+# ===== 函式 =====
+def run_library(folder: str, repeat: int) -> Dict[str, dict]:
+    rules_folder = os.path.join(folder, RULES_FOLDER)
+    file_path = os.path.join(rules_folder, RULES_FILE)
+    loader = FieldLoader(rules_folder, RULES_FILE)
+    fields = loader.load_fields_to_dict()
+    path = deepest_path(fields)
+    all_fields = FieldLoader.get_all_fields(fields)
+
+    results = {
+        "load_fields_to_dict.cold": measure(lambda n: loader.load_fields_to_dict(), repeat, setup=field_cache.clear),
+        "load_fields_to_dict.warm": measure(lambda n: loader.load_fields_to_dict(), repeat),
+        "load_field.warm": measure(lambda n: loader.load_field(path), repeat),
+        "find_field_by_path": measure(lambda n: FieldLoader.find_field_by_path(fields, path), repeat),
+        "get_all_fields": measure(lambda n: FieldLoader.get_all_fields(fields), repeat),
+        "get_available_parent_fields": measure(lambda n: FieldLoader.get_available_parent_fields(all_fields), repeat),
+        "save_json": measure(lambda n: save_json(file_path, fields), repeat),
+    }
+    field_cache.clear()
+    return results
+
+
+# ===== endpoint =====
+def _request(client, method: str, url: str, expected: int = 200, **kwargs):
+    response = client.request(method, url, **kwargs)
+    if response.status_code != expected:
+        raise RuntimeError(f"{method} {url}: expected {expected}, got {response.status_code} {response.text[:200]}")
+    return response
+
+
+def run_endpoints(folder: str, repeat: int, batch_size: int) -> Dict[str, dict]:
+    from fastapi.testclient import TestClient
+
+    import main
+
+    base_path = main.BASE_PATH
+    main.BASE_PATH = folder
+    try:
+        with TestClient(main.app) as client:
+            return _run_endpoints(client, folder, repeat, batch_size)
+    finally:
+        main.BASE_PATH = base_path
+        field_cache.clear()
+
+
+def _run_endpoints(client, folder: str, repeat: int, batch_size: int) -> Dict[str, dict]:
+    fields = FieldLoader(os.path.join(folder, RULES_FOLDER), RULES_FILE).load_fields_to_dict()
+    path = deepest_path(fields)
+    parent = fields[0].key
+    file_params = {"path": RULES_PATH}
+    etag = _request(client, "GET", "/api/fields", params=file_params).headers["etag"]
+    batch = "\n".join(json.dumps({"n": n}) for n in range(batch_size))
+
+    def new_field(key: str, description: str = "") -> dict:
+        return {"key": key, "description": description, "multi_type": ["string"], "item_multi_type": []}
+
+    def key(n: int) -> str:
+        return f"bench_{n + repeat}"
+
+    write_params = {"path": RULES_PATH, "parent_path": parent}
+    reads = [
+        ("GET /api/files", lambda n: _request(client, "GET", "/api/files", params={"path": RULES_FOLDER})),
+        ("GET /api/files/tree", lambda n: _request(client, "GET", "/api/files/tree")),
+        ("GET /api/fields", lambda n: _request(client, "GET", "/api/fields", params=file_params)),
+        ("GET /api/fields 304", lambda n: _request(client, "GET", "/api/fields", 304, params=file_params,
+                                                   headers={"If-None-Match": etag})),
+        ("GET /api/fields paged", lambda n: _request(client, "GET", "/api/fields",
+                                                    params={**file_params, "depth": 1, "limit": 50})),
+        ("GET /api/field", lambda n: _request(client, "GET", "/api/field",
+                                              params={**file_params, "field_path": path})),
+        ("GET /api/field/dependents", lambda n: _request(client, "GET", "/api/field/dependents",
+                                                         params={**file_params, "field_path": parent,
+                                                                 "include_children": True})),
+        ("GET /api/fields/parents", lambda n: _request(client, "GET", "/api/fields/parents", params=file_params)),
+        ("GET /api/search", lambda n: _request(client, "GET", "/api/search", params={"q": "f1 generated"})),
+        ("GET /api/dependencies", lambda n: _request(client, "GET", "/api/dependencies")),
+        ("POST /api/validate", lambda n: _request(client, "POST", "/api/validate", params=file_params, json={})),
+        ("POST /api/validate/batch", lambda n: _request(client, "POST", "/api/validate/batch", params=file_params,
+                                                        content=batch)),
+        ("GET /api/stats", lambda n: _request(client, "GET", "/api/stats")),
+    ]
+    # 寫入依序執行：新增的欄位 / 檔案在後面的項目被修改與刪除，跑完後檔案回到原本的內容
+    writes = [
+        ("POST /api/field", lambda n: _request(client, "POST", "/api/field", params=write_params,
+                                               json=new_field(key(n)))),
+        ("PUT /api/field", lambda n: _request(client, "PUT", "/api/field", params=write_params,
+                                              json=new_field(key(n), "updated"))),
+        ("PATCH /api/fields", lambda n: _request(client, "PATCH", "/api/fields", params=file_params, json=[
+            {"op": "add", "path": f"{parent}.{key(n)}_patch", "value": new_field(f"{key(n)}_patch")},
+            {"op": "remove", "path": f"{parent}.{key(n)}_patch"},
+        ])),
+        ("DELETE /api/field", lambda n: _request(client, "DELETE", "/api/field", params=write_params,
+                                                 json=new_field(key(n)))),
+        ("POST /api/bulk", lambda n: _request(client, "POST", "/api/bulk", json={"operations": [
+            {"op": "create", "path": RULES_PATH, "parent_path": parent, "field": new_field(f"{key(n)}_bulk")},
+            {"op": "delete", "path": RULES_PATH, "parent_path": parent, "key": f"{key(n)}_bulk"},
+        ]})),
+        ("POST /api/file", lambda n: _request(client, "POST", "/api/file", 201, params={"path": RULES_FOLDER},
+                                              json={"name": key(n), "file_type": "file"})),
+        ("DELETE /api/file", lambda n: _request(client, "DELETE", "/api/file",
+                                                params={"path": f"{RULES_FOLDER}/{key(n)}.json"})),
+    ]
+    return {name: measure(fn, repeat) for name, fn in reads + writes}
+
+
+# ===== 執行與比較 =====
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(depth: int, breadth: int, conditions: float, regexes: float, repeat: int,
+        batch_size: int = 100, endpoints: bool = True) -> dict:
+    params = {"depth": depth, "breadth": breadth, "conditions": conditions, "regexes": regexes}
+    with tempfile.TemporaryDirectory() as folder:
+        write_rules(os.path.join(folder, RULES_FOLDER), RULES_FILE, **params)
+        # ConditionField 建立時會 print，避免輸出影響計時
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results = run_library(folder, repeat)
+            if endpoints:
+                results.update(run_endpoints(folder, repeat, batch_size))
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "nodes": count_nodes(generate_rules(**params)),
+            "compact_min_nodes": field_cache.compact_min_nodes,
+            "repeat": repeat,
+            **params,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[dict]:
+    """以 median 比較，ratio > threshold 視為變慢"""
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None or not before["median_ms"]:
+            continue
+        ratio = result["median_ms"] / before["median_ms"]
+        rows.append({"name": name, "baseline_ms": before["median_ms"], "current_ms": result["median_ms"],
+                     "ratio": round(ratio, 3), "regression": ratio > threshold})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--breadth", type=int, default=20)
+    parser.add_argument("--conditions", type=float, default=0.1, help="ratio of fields with a condition")
+    parser.add_argument("--regexes", type=float, default=0.2, help="ratio of string fields with a regex")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=100, help="documents per /api/validate/batch request")
+    parser.add_argument("--no-endpoints", action="store_true", help="only benchmark library functions")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="median ratio counted as a regression")
+    args = parser.parse_args()
+
+    report = run(args.depth, args.breadth, args.conditions, args.regexes, args.repeat,
+                 args.batch_size, not args.no_endpoints)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(json.load(f), report, args.threshold)
+        print(json.dumps(rows, indent=2))
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
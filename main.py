@@ -2,16 +2,34 @@
 import json
 import os
 import shutil
-from fastapi import FastAPI, Query, Request, HTTPException
+from typing import List
+from fastapi import FastAPI, Query, Request, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 
-from src.models import CustomEncoder, Field
-from src.models.api_response import APIResponse
+from src.models import BulkRequest, Field, Condition, PatchOperation
 from src.models.fileType import PrecheckFile, FileType
 from src.utils import FieldLoader
-from src.utils.directory_scanner import DirectoryScanner
-from src.utils.json_loader import check_folder, save_json
+from src.utils.async_storage import bulk_executor, executor_stats, parse_executor, read_executor, write_executor
+from src.utils.batch_validator import shutdown_pool, stream_validation_results
+from src.utils.bulk import BulkError, apply_bulk
+from src.utils.dependency_graph import DependencyGraph, field_paths, get_dependency_graph
+from src.utils.directory_tree import get_tree_index
+from src.utils.field_cache import field_cache
+from src.utils.field_pages import (DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, InvalidCursor, StaleCursor, decode_cursor,
+                                  page_etag)
+from src.utils.field_patch import PatchError, apply_patch
+from src.utils.field_index import FieldIndex
+from src.utils.file_events import CREATED, DELETED, file_events
+from src.utils.file_version import etag_matches, make_etag, signature_from_stat
+from src.utils.json_loader import check_folder, is_valid_json_file
+from src.utils.metrics import MetricsMiddleware, metrics
+from src.utils.prewarm import prewarmer
+from src.utils.regex_registry import find_regex_error, regex_registry
+from src.utils.search_index import KIND_WEIGHTS, get_search_index
+from src.utils.serializer import dumps_compact
+from src.utils.snapshot import snapshot_store
+from src.utils.write_coordinator import FileMissing, Mutation, PreconditionFailed, write_coordinator
 
 app = FastAPI()
 
@@ -28,10 +46,35 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 停用時不加 middleware，request 不會經過任何計時程式
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware)
 
 BASE_PATH = "./assets"  # 使用者不能離開這個根目錄
 
 
+class ModelJSONResponse(Response):
+    """直接回傳模型（或含有模型的 list / dict），略過 FastAPI 的 jsonable_encoder，輸出與原本相同"""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps_compact(content)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """一邊讀取 request body 一邊輸出的串流回應
+
+    StreamingResponse 會另外呼叫 receive() 監聽斷線，會搶走尚未讀取的 body，
+    這裡改由 request.stream() 在讀到 http.disconnect 時結束。
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
 def file_load_check(target_path: str, is_file: bool = True) -> str:
     abs_target = os.path.abspath(target_path)
     abs_base = os.path.abspath(BASE_PATH)
@@ -46,18 +89,70 @@ def file_load_check(target_path: str, is_file: bool = True) -> str:
     return abs_target
 
 def get_abs_path(path, is_file: bool = True):
-    relative_path = path.strip("/")
-    target_path = os.path.join(BASE_PATH, relative_path)
-    return file_load_check(target_path, is_file)
+    with metrics.span("path_check"):
+        relative_path = path.strip("/")
+        target_path = os.path.join(BASE_PATH, relative_path)
+        return file_load_check(target_path, is_file)
+
+def check_regexes(field: Field, path: str = ""):
+    """儲存前檢查欄位（含子欄位）的 regex 是否可編譯且沒有回溯風險"""
+    error = find_regex_error(field, path)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+def require_parent(index: FieldIndex, parent_path: str):
+    if index.siblings(parent_path) is None:
+        raise HTTPException(status_code=404, detail=f"Parent field '{parent_path}' not found")
+
+async def load_dependency_graph() -> DependencyGraph:
+    graph = get_dependency_graph(BASE_PATH)
+    await parse_executor.run(graph.sync)
+    return graph
+
+def relative_file(abs_path: str) -> str:
+    return os.path.relpath(abs_path, os.path.abspath(BASE_PATH)).replace(os.sep, "/")
+
+def check_references(graph: DependencyGraph, rel_path: str, removed_paths, force: bool, broken: list):
+    """移除欄位會讓其他 condition 失去目標時回傳 409，force 時改為記錄在 broken 中"""
+    broken[:] = graph.breaking_dependents(rel_path, removed_paths)
+    if broken and not force:
+        raise HTTPException(status_code=409, detail={
+            "message": "Field is referenced by conditions, use force=true to remove it anyway",
+            "dependents": broken,
+        })
+
+def warn_broken_references(response: Response, broken: list):
+    if broken:
+        response.headers["Warning"] = f'199 - "{len(broken)} condition reference(s) left dangling"'
+
+async def commit_write(abs_path: str, mutation: Mutation, request: Request, response: Response):
+    """交給 write coordinator 寫入（同檔案序列化、If-Match 檢查、group commit），並回傳新的 ETag"""
+    try:
+        etag = await write_coordinator.submit(abs_path, mutation, request.headers.get("if-match"))
+    except PreconditionFailed as e:
+        headers = {"ETag": e.current_etag} if e.current_etag else None
+        raise HTTPException(status_code=412, detail=str(e), headers=headers)
+    except FileMissing:
+        raise HTTPException(status_code=404, detail="File not found")
+    if etag:
+        response.headers["ETag"] = etag
+
+def model_response(content, response: Response | None = None) -> Response:
+    """模型直接序列化成 bytes 回傳；直接回傳 Response 時 FastAPI 不會帶上 response 參數設定的 header，這裡補上"""
+    with metrics.span("encode"):
+        result = ModelJSONResponse(content)
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
 
 @app.get("/api/files")
-def list_files(
+async def list_files(
     path: str = Query("", description="Relative path"),
     show_type: str | None = Query(None, description="file / folder / all")
 ):
     abs_path = get_abs_path(path, False)
-    scanner = DirectoryScanner(abs_path)
-    all_items = scanner.list_items()
+    tree = get_tree_index(BASE_PATH)
+    all_items = await read_executor.run(tree.list_dir, os.path.relpath(abs_path, tree.root)) or []
 
     if show_type in ("file", "folder"):
         filtered = [item for item in all_items if item.file_type.value == show_type]
@@ -66,128 +161,354 @@ def list_files(
 
     filtered.sort(key=lambda item: (item.file_type != FileType.FOLDER, item.name.lower()))
 
-    return JSONResponse(
-        content=json.loads(json.dumps(filtered, cls=CustomEncoder)),
-        media_type="application/json"
-    )
+    return model_response(filtered)
+
+
+@app.get("/api/files/tree")
+async def list_file_tree(
+    path: str = Query("", description="Relative folder path"),
+    depth: int | None = Query(None, ge=1, description="How many levels to expand, all when omitted"),
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=5000),
+    metadata: bool = Query(True, description="Include size / mtime / field_count of files")
+):
+    """以前序展開的目錄樹（資料夾優先），每個項目帶有 depth，可分頁"""
+    abs_path = get_abs_path(path, False)
+    tree = get_tree_index(BASE_PATH)
+    result = await read_executor.run(tree.walk, os.path.relpath(abs_path, tree.root), depth, offset, limit, metadata)
+    if result is None:
+        raise HTTPException(status_code=400, detail="Not a folder")
+    return result
 
 
 @app.get("/api/fields")
-def list_fields(path: str = Query(..., description="Path to JSON file")):
+async def list_fields(
+    request: Request,
+    path: str = Query(..., description="Path to JSON file"),
+    depth: int | None = Query(None, ge=1, description="Levels to expand; returns a paged tree when set"),
+    cursor: str | None = Query(None, description="next_cursor / children_cursor from a previous page"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Max fields per sibling list")
+):
     abs_path = get_abs_path(path)
+    if_none_match = request.headers.get("if-none-match")
+
+    # 帶分頁參數時只回傳需要的部分，不傳整個檔案
+    if depth is not None or cursor is not None or limit is not None:
+        return await list_field_page(abs_path, if_none_match, depth or 1, cursor, limit or DEFAULT_PAGE_LIMIT)
+
+    def prepare():
+        try:
+            signature = signature_from_stat(os.stat(abs_path))
+        except OSError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        # 內容沒變就不再傳一次
+        etag = make_etag(signature)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        if not is_valid_json_file(abs_path, signature):
+            raise HTTPException(status_code=400, detail="Invalid JSON")
+
+        # 檔案本身就是 JSON，直接回傳原始內容，不再解析與重新序列化
+        return FileResponse(abs_path, media_type="application/json", headers={"ETag": etag})
+
+    return await read_executor.run(prepare)
+
+
+async def list_field_page(abs_path: str, if_none_match: str | None, depth: int, cursor: str | None, limit: int):
+    parent_path, offset, version = "", 0, None
+    if cursor is not None:
+        try:
+            version, parent_path, offset = decode_cursor(cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
     try:
-        with open(abs_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON")
-    except Exception as e:
+        etag = make_etag(signature_from_stat(os.stat(abs_path)))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    except OSError as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # 同一個檔案版本的不同頁面各有自己的 ETag；cursor 過期時不回 304，交給 load_page 回 409
+    if version is None or version == etag:
+        tag = page_etag(etag, parent_path, offset, depth, limit)
+        if etag_matches(if_none_match, tag):
+            return Response(status_code=304, headers={"ETag": tag})
 
-    return JSONResponse(
-        content=json.loads(json.dumps(data, cls=CustomEncoder)),
-        media_type="application/json"
-    )
+    try:
+        page = await FieldLoader(BASE_PATH, abs_path).aload_page(parent_path, offset, depth, limit, version)
+    except StaleCursor as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"ETag": e.current_version})
+    if page is None:
+        if not os.path.isfile(abs_path):
+            raise HTTPException(status_code=404, detail="File not found")
+        raise HTTPException(status_code=404, detail=f"Field '{parent_path}' not found.")
+    tag = page_etag(page["version"], parent_path, offset, depth, limit)
+    return JSONResponse(content=page, headers={"ETag": tag})
 
 
 @app.post("/api/field")
-def create_field(added_field: Field,
+async def create_field(added_field: Field,
+                 request: Request,
+                 response: Response,
                  path: str = Query(..., description="Path to JSON file"),
                  parent_path: str = Query(..., description="field belong to which parent field")
     ):
     abs_path = get_abs_path(path)
-    field_loader = FieldLoader(BASE_PATH, abs_path)
-    fields = field_loader.load_fields_to_dict()
-    parent = field_loader.find_field_by_path(fields, parent_path)
-    if parent is None:
-        if field_loader.is_key_exists(fields, added_field.key):
-            raise HTTPException(status_code=409, detail=f'{added_field.key} already exists')
-        fields.append(added_field)
-    else:
-        if field_loader.is_key_exists2(parent.children, added_field.key):
+    check_regexes(added_field, parent_path)
+
+    def mutation(index: FieldIndex) -> bool:
+        require_parent(index, parent_path)
+        if index.has_child(parent_path, added_field.key):
             raise HTTPException(status_code=409, detail=f'{added_field.key} already exists')
-        parent.children.append(added_field)
-    save_json(abs_path, fields)
-    return added_field
+        index.add(parent_path, added_field.clone())
+        return True
+
+    await commit_write(abs_path, mutation, request, response)
+    return model_response(added_field, response)
 
 @app.put("/api/field")
-def update_field(
+async def update_field(
     updated_field: Field,
+    request: Request,
+    response: Response,
     path: str = Query(..., description="Path to JSON file"),
-    parent_path: str = Query(..., description="Field belongs to which parent field")
+    parent_path: str = Query(..., description="Field belongs to which parent field"),
+    force: bool = Query(False, description="Save even if conditions referencing removed children break")
 ):
     abs_path = get_abs_path(path)
-    field_loader = FieldLoader(BASE_PATH, abs_path)
-    fields = field_loader.load_fields_to_dict()
-
-    # 找出 parent
-    parent = field_loader.find_field_by_path(fields, parent_path)
-
-    # 找到要更新的欄位
-    target_list = parent.children if parent else fields
-    target_index = next((i for i, f in enumerate(target_list) if f.key == updated_field.key), None)
-
-    if target_index is None:
-        raise HTTPException(status_code=404, detail=f"Field '{updated_field.key}' not found")
-
-    # 執行更新（整個物件覆蓋）
-    target_list[target_index] = updated_field
-
-    # 寫回檔案
-    save_json(abs_path, fields)
-
-    return updated_field
+    check_regexes(updated_field, parent_path)
+
+    graph = await load_dependency_graph()
+    rel_path = relative_file(abs_path)
+    broken = []
+
+    def mutation(index: FieldIndex) -> bool:
+        require_parent(index, parent_path)
+        old = index.child(parent_path, updated_field.key)
+        if old is None:
+            raise HTTPException(status_code=404, detail=f"Field '{updated_field.key}' not found")
+        # 覆蓋後不再存在的子欄位可能被其他 condition 引用
+        field_path = index.join(parent_path, updated_field.key)
+        removed = set(field_paths(old, field_path)) - set(field_paths(updated_field, field_path))
+        check_references(graph, rel_path, removed, force, broken)
+        # 執行更新（整個物件覆蓋）
+        index.replace(parent_path, updated_field.clone())
+        return True
+
+    await commit_write(abs_path, mutation, request, response)
+    warn_broken_references(response, broken)
+    return model_response(updated_field, response)
 
 @app.get("/api/field")
-def get_field(
+async def get_field(
     field_path: str = Query(..., description="Path to field"),
      path: str = Query(..., description="Path to JSON file"),
 ):
     abs_path = get_abs_path(path)
-    field_loader = FieldLoader(BASE_PATH, abs_path)
-    fields = field_loader.load_fields_to_dict()
-    target_field = field_loader.find_field_by_path(fields, field_path)
+    target_field = await FieldLoader(BASE_PATH, abs_path).aload_field(field_path)
 
     if not target_field:
         raise HTTPException(status_code=404, detail=f"Field '{field_path}' not found.")
 
-    return target_field
+    # 快取中的欄位是共用的，補上預設 condition 時使用複本
+    if target_field.condition is None:
+        target_field = target_field.model_copy(update={"condition": Condition(logical='and', conditions=[])})
+
+    return model_response(target_field)
 
 @app.delete("/api/field")
-def delete_field(target: Field,
+async def delete_field(target: Field,
+                 request: Request,
+                 response: Response,
                  path: str = Query(..., description="Path to JSON file"),
-                 parent_path: str = Query(..., description="field belong to which parent field")
+                 parent_path: str = Query(..., description="field belong to which parent field"),
+                 force: bool = Query(False, description="Delete even if other conditions reference the field")
                  ):
     abs_path = get_abs_path(path)
-    field_loader = FieldLoader(BASE_PATH, abs_path)
-    fields = field_loader.load_fields_to_dict()
-    parent = field_loader.find_field_by_path(fields, parent_path)
-    if parent is None:
-        parent_field = fields
-    else:
-        parent_field = field_loader.find_field_by_path(fields, parent_path)
+    graph = await load_dependency_graph()
+    rel_path = relative_file(abs_path)
+    broken = []
+
+    def mutation(index: FieldIndex) -> bool:
+        require_parent(index, parent_path)
+        existing = index.child(parent_path, target.key)
+        if existing is None:
+            return False
+        check_references(graph, rel_path, field_paths(existing, index.join(parent_path, target.key)), force, broken)
+        index.remove(parent_path, target.key)
+        return True
+
+    await commit_write(abs_path, mutation, request, response)
+    warn_broken_references(response, broken)
+    return model_response(target, response)
+
+
+@app.get("/api/field/dependents")
+async def get_field_dependents(
+    path: str = Query(..., description="Path to JSON file"),
+    field_path: str = Query(..., description="Path to field"),
+    include_children: bool = Query(False, description="Also list conditions referencing child fields")
+):
+    """列出引用這個欄位的 condition（同檔案或同資料夾的其他檔案）"""
+    abs_path = get_abs_path(path)
+    graph = await load_dependency_graph()
+    rel_path = relative_file(abs_path)
+    paths = [field_path]
+    if include_children:
+        field = await FieldLoader(BASE_PATH, abs_path).aload_field(field_path)
+        if field is None:
+            raise HTTPException(status_code=404, detail=f"Field '{field_path}' not found.")
+        paths = field_paths(field, field_path)
+    return [dependent for p in paths for dependent in graph.dependents(rel_path, p)]
+
+
+@app.get("/api/dependencies")
+async def get_dependency_report(path: str = Query("", description="Relative folder path")):
+    """找不到目標的 condition 引用以及互相引用的循環"""
+    abs_path = get_abs_path(path, False)
+    graph = await load_dependency_graph()
+    folder = relative_file(abs_path)
+    dangling, cycles = await parse_executor.run(lambda: (graph.dangling(folder), graph.cycles(folder)))
+    return {"dangling": dangling, "cycles": cycles}
 
-    if isinstance(parent_field, list):
-        parent_field[:] = [f for f in parent_field if f.key != target.key]
-    else:
-        parent_field.children = [f for f in parent_field.children if f.key != target.key]
 
-    save_json(abs_path, fields)
-    return target
+@app.post("/api/dependencies/resync")
+async def resync_indexes():
+    """重新 stat 所有規則檔，讓直接在磁碟上修改（未經過 API）的檔案反映到依賴圖與搜尋索引"""
+    def resync():
+        graph = get_dependency_graph(BASE_PATH)
+        graph.sync(rescan=True)
+        # 樹狀索引中的檔案版本已更新，搜尋索引不必再 stat 一次
+        index = get_search_index(BASE_PATH)
+        index.sync()
+        return {"dependencies": graph.stats(), "search": index.stats()}
+    return await bulk_executor.run(resync)
+
+
+PATCH_ERROR_STATUS = {"invalid": 400, "not_found": 404, "conflict": 409, "test_failed": 409}
+
+
+@app.patch("/api/fields")
+async def patch_fields(
+    operations: List[PatchOperation],
+    request: Request,
+    response: Response,
+    path: str = Query(..., description="Path to JSON file"),
+    force: bool = Query(False, description="Apply even if conditions referencing removed fields break")
+):
+    """一次套用多個操作；任一操作失敗則這次請求的操作完全不寫入"""
+    abs_path = get_abs_path(path)
+    graph = await load_dependency_graph()
+    rel_path = relative_file(abs_path)
+    broken = []
+
+    def mutation(index: FieldIndex) -> bool:
+        # remove / move / 改名的 replace 與 DELETE、PUT 相同，不能讓其他 condition 失去目標
+        removed = apply_patch(index, operations)
+        check_references(graph, rel_path, removed, force, broken)
+        return bool(operations)
+
+    try:
+        await commit_write(abs_path, mutation, request, response)
+    except PatchError as e:
+        raise HTTPException(status_code=PATCH_ERROR_STATUS[e.reason], detail=f"operation {e.op_index}: {e}")
+    warn_broken_references(response, broken)
+    return {"applied": len(operations)}
+
+
+BULK_ERROR_STATUS = {"invalid": 400, "forbidden": 403, "not_found": 404, "conflict": 409, "referenced": 409,
+                     "precondition_failed": 412}
+# get_abs_path 的錯誤轉為對應的 reason
+BULK_PATH_REASONS = {400: "invalid", 403: "forbidden", 404: "not_found"}
+
+
+@app.post("/api/bulk")
+async def bulk_mutate(bulk: BulkRequest):
+    """跨多個檔案依序套用 create / update / delete，任一操作失敗則所有檔案都不寫入
+
+    每個檔案只載入與寫入一次；回傳每個操作的結果與寫入後各檔案的 ETag。
+    """
+    def resolve(path: str) -> str:
+        try:
+            return get_abs_path(path)
+        except HTTPException as e:
+            raise BulkError(None, BULK_PATH_REASONS.get(e.status_code, "invalid"), e.detail)
+
+    graph = await load_dependency_graph()
+    report = await write_executor.run(apply_bulk, BASE_PATH, bulk.operations, resolve, bulk.if_match, graph)
+    status = 200 if report["committed"] else BULK_ERROR_STATUS[report["error"]["reason"]]
+    return JSONResponse(content=report, status_code=status)
 
 
 @app.get("/api/fields/parents")
-def get_parent_fields(path: str = Query(..., description="Path to JSON file")):
+async def get_parent_fields(path: str = Query(..., description="Path to JSON file")):
     abs_path = get_abs_path(path)
-    field_loader = FieldLoader(BASE_PATH, abs_path)
-    fields = field_loader.load_fields_to_dict()
-    all_expends_field = field_loader.get_all_fields(fields)
-    available_parent_fields = FieldLoader.get_available_parent_fields(all_expends_field)
-    return available_parent_fields
+    views = await FieldLoader(BASE_PATH, abs_path).aload_views()
+    return views.parent_fields
+
+
+@app.get("/api/search")
+async def search_fields(
+    q: str = Query(..., min_length=1, description="Terms separated by spaces, all must match"),
+    type: str | None = Query(None, description="Comma separated: key / path / description / type / condition"),
+    substring: bool = Query(True, description="Also match terms in the middle of words"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200)
+):
+    kinds = None
+    if type:
+        kinds = [kind.strip() for kind in type.split(",") if kind.strip()]
+        unknown = [kind for kind in kinds if kind not in KIND_WEIGHTS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown search type: {', '.join(unknown)}")
+    index = get_search_index(BASE_PATH)
+    return await parse_executor.run(index.search, q, kinds, substring, offset, limit)
+
+
+@app.post("/api/validate")
+async def validate_document(
+    document: dict = Body(..., description="Config document to validate"),
+    path: str = Query(..., description="Path to rule file")
+):
+    abs_path = get_abs_path(path)
+    plan = await FieldLoader(BASE_PATH, abs_path).aload_validation_plan()
+    def validate():
+        with metrics.span("validate"):
+            return plan.validate(document)
+
+    violations = await parse_executor.run(validate)
+    return {
+        "valid": not violations,
+        "violations": violations,
+        "rule_errors": plan.errors,
+    }
+
+
+@app.post("/api/validate/batch")
+async def validate_batch(request: Request, path: str = Query(..., description="Path to rule file")):
+    """Body 為 NDJSON 或 JSON array，每份文件完成後輸出一行 NDJSON 結果（含 index）"""
+    abs_path = get_abs_path(path)
+    return DuplexStreamingResponse(
+        stream_validation_results(BASE_PATH, abs_path, request.stream()),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.on_event("startup")
+async def start_prewarm():
+    # FIELD_PREWARM 未開啟時什麼都不做
+    prewarmer.start(BASE_PATH)
+
+
+@app.on_event("shutdown")
+def close_validation_pool():
+    shutdown_pool()
 
 
 @app.post("/api/file")
-def create_file_or_folder(file: PrecheckFile, path: str = Query("", description="Relative folder path")):
+async def create_file_or_folder(file: PrecheckFile, path: str = Query("", description="Relative folder path")):
     safe_path = os.path.abspath(os.path.join(BASE_PATH, path.strip("/")))
 
     if not safe_path.startswith(os.path.abspath(BASE_PATH)):
@@ -198,7 +519,7 @@ def create_file_or_folder(file: PrecheckFile, path: str = Query("", description=
         f"{file.name}.json" if file.file_type == FileType.FILE else file.name
     )
 
-    try:
+    def create():
         if os.path.exists(full_path):
             raise HTTPException(status_code=409, detail=f'{file.file_type} ({file.name}) already exists')
 
@@ -210,14 +531,17 @@ def create_file_or_folder(file: PrecheckFile, path: str = Query("", description=
         else:
             raise HTTPException(status_code=400, detail="Invalid file type")
 
+    try:
+        await write_executor.run(create)
+        file_events.publish(CREATED, full_path)
         return JSONResponse(content={"message": "Created"}, status_code=201)
 
     except Exception as e:
-        return APIResponse.internal_error(str(e))
+        return JSONResponse(content={"message": str(e)}, status_code=500)
 
 
 @app.delete("/api/file")
-def delete_file_or_folder(path: str = Query(..., description="Path to delete")):
+async def delete_file_or_folder(path: str = Query(..., description="Path to delete")):
     abs_path = get_abs_path(path)
     # 檔案是否存在
     if not os.path.exists(abs_path):
@@ -225,9 +549,17 @@ def delete_file_or_folder(path: str = Query(..., description="Path to delete")):
 
     try:
         if os.path.isfile(abs_path):
-            os.remove(abs_path)
+            def remove_file():
+                with write_coordinator.lock(abs_path):
+                    os.remove(abs_path)
+                    field_cache.invalidate(abs_path)
+            await write_executor.run(remove_file)
+            file_events.publish(DELETED, abs_path)
         elif os.path.isdir(abs_path):
-            shutil.rmtree(abs_path)
+            # 大型資料夾可能刪很久，放在獨立的 bulk executor
+            await bulk_executor.run(shutil.rmtree, abs_path)
+            field_cache.invalidate_folder(abs_path)
+            file_events.publish(DELETED, abs_path)
         else:
             raise HTTPException(status_code=404, detail="Unknown file type")
 
@@ -239,6 +571,37 @@ def delete_file_or_folder(path: str = Query(..., description="Path to delete")):
         # 其他未預期錯誤統一 500
         raise HTTPException(status_code=500, detail=f"Failed to delete: {str(e)}")
 
+def collect_stats():
+    return {
+        "field_cache": field_cache.stats(),
+        "snapshots": snapshot_store.stats(),
+        "regex_registry": regex_registry.stats(),
+        "executors": executor_stats(),
+        "writes": write_coordinator.stats(),
+        "search": get_search_index(BASE_PATH).stats(),
+        "dependencies": get_dependency_graph(BASE_PATH).stats(),
+        "prewarm": prewarmer.stats(),
+    }
+
+
+@app.get("/api/stats")
+def get_stats():
+    return collect_stats()
+
+
+@app.get("/healthz/ready")
+def readiness():
+    """背景預熱（FIELD_PREWARM）結束前回傳 503，未開啟預熱時一律 200"""
+    status = prewarmer.stats()
+    return JSONResponse(content=status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus 文字格式：各 endpoint / stage 的耗時 histogram、規則檔大小與節點數，以及 /api/stats 的數值"""
+    return PlainTextResponse(metrics.render(collect_stats()), media_type="text/plain; version=0.0.4")
+
+
 # uvicorn main:app --reload --host 0.0.0.0 --port 5000
 if __name__ == "__main__":
     import uvicorn
@@ -4,3 +4,6 @@ from .field import Field
 from .custom_encoder import CustomEncoder, ObjectToJsonFile
 from .type import FieldTypes, OperationTypes
 from .condition import Condition
+from .violation import Violation
+from .patch import PatchOperation
+from .bulk import BulkOperation, BulkRequest
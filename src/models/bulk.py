@@ -0,0 +1,35 @@
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, model_validator
+
+from src.models.field import Field
+
+
+class BulkOperation(BaseModel):
+    """POST /api/bulk 的單一操作，語意與 POST / PUT / DELETE /api/field 相同"""
+
+    op: Literal["create", "update", "delete"]
+    path: str                           # 規則檔的相對路徑
+    parent_path: str = ""               # 父欄位的 dotted path，"" 代表第一層
+    field: Optional[Field] = None       # create / update 的欄位內容
+    key: Optional[str] = None           # delete 的欄位 key（也可以給 field）
+    force: bool = False                 # 與單一 API 相同：忽略 condition 引用檢查
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if self.op in ("create", "update") and self.field is None:
+            raise ValueError(f"'{self.op}' requires 'field'")
+        if self.op == "delete" and self.key is None:
+            if self.field is None:
+                raise ValueError("'delete' requires 'key' or 'field'")
+            self.key = self.field.key
+        return self
+
+    @property
+    def target_key(self) -> str:
+        return self.key if self.op == "delete" else self.field.key
+
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation]
+    # 檔案相對路徑 -> ETag，與 If-Match 相同，版本不符時整個請求不寫入
+    if_match: Dict[str, str] = {}
@@ -55,6 +55,20 @@ class Field(BaseModel):
         """获取子字段"""
         return self.children
 
+    def clone(self) -> Field:
+        """複製整棵子樹（不重新驗證），修改共用的快取資料前使用"""
+        condition = self.condition
+        if condition is not None:
+            condition = condition.model_copy(update={
+                "conditions": [c.model_copy() for c in condition.conditions]
+            })
+        return self.model_copy(update={
+            "multi_type": list(self.multi_type),
+            "item_multi_type": list(self.item_multi_type),
+            "condition": condition,
+            "children": [child.clone() for child in self.children],
+        })
+
     def update(
         self,
         description: Optional[str] = None,
@@ -110,3 +124,31 @@ class Field(BaseModel):
             condition=condition,
             children=children,
         )
+
+    @classmethod
+    def from_dict_trusted(cls, data: dict) -> Field:
+        """從本服務寫出、內容未被修改的字典建立 Field，以 model_construct 略過 pydantic 驗證"""
+        condition_data = data.get("condition")
+        condition = None
+        if condition_data:
+            condition = Condition.model_construct(
+                logical=condition_data.get("logical"),
+                conditions=[
+                    ConditionField.model_construct(key=con["key"], operator=con["operator"], value=con["value"])
+                    for con in condition_data.get("conditions", [])
+                ],
+            )
+
+        return cls.model_construct(
+            key=data["key"],
+            description=data.get("description", ""),
+            field_type=None,
+            multi_type=list(data.get("multi_type", ())),
+            item_type=None,
+            item_multi_type=list(data.get("item_multi_type", ())),
+            regex=data.get("regex"),
+            regex_enabled=data.get("regex_enabled", False),
+            required=data.get("required", False),
+            condition=condition,
+            children=[cls.from_dict_trusted(child) for child in data.get("children", ())],
+        )
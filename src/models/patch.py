@@ -0,0 +1,13 @@
+from typing import Any, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field as PydanticField
+
+
+class PatchOperation(BaseModel):
+    """RFC 6902 風格的單一操作，path / from 為欄位的 dotted path"""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    from_path: Optional[str] = PydanticField(default=None, alias="from")
+    value: Any = None
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class Violation(BaseModel):
+    """驗證設定檔時發現的單一問題"""
+    path: str
+    code: str
+    message: str
+
+    def __repr__(self):
+        return f"<Violation path='{self.path}' code='{self.code}'>"
@@ -0,0 +1,254 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from src.utils.batch_validator import shutdown_pool
+from src.utils.field_pages import encode_cursor
+from src.utils.prewarm import Prewarmer
+
+
+def _rule(key, **kwargs):
+    return {"key": key, "description": "", "multi_type": ["string"], "item_multi_type": [], **kwargs}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    (tmp_path / "gen").mkdir()
+    (tmp_path / "gen" / "rules.json").write_text(json.dumps([_rule("a"), _rule("b", multi_type=["object"])]))
+    monkeypatch.setattr(main, "BASE_PATH", str(tmp_path))
+    return TestClient(main.app)
+
+
+class TestFieldsApi:
+
+    def test_list_fields_serves_file_with_etag(self, client):
+        response = client.get("/api/fields", params={"path": "gen/rules.json"})
+        etag = response.headers["etag"]
+
+        assert response.status_code == 200
+        assert [f["key"] for f in response.json()] == ["a", "b"]
+        assert client.get("/api/fields", params={"path": "gen/rules.json"},
+                          headers={"If-None-Match": etag}).status_code == 304
+
+    def test_etag_changes_after_write(self, client):
+        etag = client.get("/api/fields", params={"path": "gen/rules.json"}).headers["etag"]
+
+        created = client.post("/api/field", params={"path": "gen/rules.json", "parent_path": "b"}, json=_rule("c"))
+        response = client.get("/api/fields", params={"path": "gen/rules.json"}, headers={"If-None-Match": etag})
+
+        assert created.status_code == 200
+        assert response.status_code == 200
+        assert response.json()[1]["children"][0]["key"] == "c"
+
+    def test_if_match_rejects_stale_version(self, client):
+        etag = client.get("/api/fields", params={"path": "gen/rules.json"}).headers["etag"]
+
+        first = client.post("/api/field", params={"path": "gen/rules.json", "parent_path": ""},
+                            json=_rule("c"), headers={"If-Match": etag})
+        second = client.post("/api/field", params={"path": "gen/rules.json", "parent_path": ""},
+                             json=_rule("d"), headers={"If-Match": etag})
+
+        assert first.status_code == 200
+        assert first.headers["etag"] != etag
+        assert second.status_code == 412
+        assert second.headers["etag"] == first.headers["etag"]
+
+    def test_paged_fields(self, client):
+        client.post("/api/field", params={"path": "gen/rules.json", "parent_path": "b"}, json=_rule("c"))
+
+        response = client.get("/api/fields", params={"path": "gen/rules.json", "limit": 1})
+        page = response.json()
+        assert [item["key"] for item in page["items"]] == ["a"]
+        etag = response.headers["etag"]
+        assert etag != page["version"]
+        assert client.get("/api/fields", params={"path": "gen/rules.json", "limit": 1},
+                          headers={"If-None-Match": etag}).status_code == 304
+
+        # 同一個檔案版本的其他頁面不能用這一頁的 ETag 回 304
+        response = client.get("/api/fields", params={"path": "gen/rules.json", "cursor": page["next_cursor"]},
+                              headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        page = response.json()
+        assert [(item["key"], item["child_count"]) for item in page["items"]] == [("b", 1)]
+
+        children = client.get("/api/fields", params={"path": "gen/rules.json",
+                                                     "cursor": page["items"][0]["children_cursor"]}).json()
+        assert [item["path"] for item in children["items"]] == ["b.c"]
+
+    def test_paged_fields_rejects_stale_cursor(self, client):
+        page = client.get("/api/fields", params={"path": "gen/rules.json", "limit": 1}).json()
+        client.post("/api/field", params={"path": "gen/rules.json", "parent_path": ""}, json=_rule("c"))
+
+        stale = client.get("/api/fields", params={"path": "gen/rules.json", "cursor": page["next_cursor"]})
+        malformed = client.get("/api/fields", params={"path": "gen/rules.json", "cursor": "x"})
+
+        assert stale.status_code == 409
+        assert stale.headers["etag"] != page["version"]
+        assert malformed.status_code == 400
+
+    def test_paged_fields_not_found(self, client, monkeypatch):
+        version = client.get("/api/fields", params={"path": "gen/rules.json", "limit": 1}).json()["version"]
+        missing_parent = client.get("/api/fields", params={"path": "gen/rules.json",
+                                                           "cursor": encode_cursor(version, "zzz", 0)})
+
+        # 檔案在檢查路徑之後才被刪除
+        aload_page = main.FieldLoader.aload_page
+
+        async def delete_then_load(self, *args):
+            os.remove(os.path.join(main.BASE_PATH, "gen", "rules.json"))
+            return await aload_page(self, *args)
+
+        monkeypatch.setattr(main.FieldLoader, "aload_page", delete_then_load)
+        missing_file = client.get("/api/fields", params={"path": "gen/rules.json", "limit": 1})
+
+        assert missing_parent.status_code == 404
+        assert missing_parent.json()["detail"] == "Field 'zzz' not found."
+        assert missing_file.status_code == 404
+        assert missing_file.json()["detail"] == "File not found"
+
+
+class TestFilesApi:
+
+    def test_tree_tracks_created_files(self, client):
+        client.post("/api/file", params={"path": "gen"}, json={"name": "more", "file_type": "file"})
+        response = client.get("/api/files/tree", params={"depth": 2})
+
+        assert response.status_code == 200
+        assert [item["path"] for item in response.json()["items"]] == ["gen", "gen/more.json", "gen/rules.json"]
+        assert response.json()["items"][2]["field_count"] == 2
+        assert [item["name"] for item in client.get("/api/files", params={"path": "gen"}).json()] == \
+            ["more.json", "rules.json"]
+
+
+class TestDependenciesApi:
+
+    def test_delete_referenced_field_requires_force(self, client):
+        condition = {"logical": "and", "conditions": [{"key": "a", "operator": "eq", "value": "x"}]}
+        with open(os.path.join(main.BASE_PATH, "gen", "rules.json"), "w") as f:
+            json.dump([_rule("a"), _rule("c", condition=condition)], f)
+        params = {"path": "gen/rules.json", "parent_path": ""}
+
+        dependents = client.get("/api/field/dependents", params={"path": "gen/rules.json", "field_path": "a"})
+        blocked = client.request("DELETE", "/api/field", params=params, json=_rule("a"))
+        forced = client.request("DELETE", "/api/field", params={**params, "force": True}, json=_rule("a"))
+        report = client.get("/api/dependencies")
+
+        assert dependents.json() == [{"file": "gen/rules.json", "path": "c", "key": "a"}]
+        assert blocked.status_code == 409
+        assert blocked.json()["detail"]["dependents"] == dependents.json()
+        assert forced.status_code == 200
+        assert "dangling" in forced.headers["warning"]
+        assert report.json()["dangling"] == [{"file": "gen/rules.json", "path": "c", "key": "a"}]
+
+
+    def test_patch_removing_referenced_field_requires_force(self, client):
+        condition = {"logical": "and", "conditions": [{"key": "b", "operator": "eq", "value": "x"}]}
+        with open(os.path.join(main.BASE_PATH, "gen", "rules.json"), "w") as f:
+            json.dump([_rule("a", condition=condition), _rule("b")], f)
+        params = {"path": "gen/rules.json"}
+        move = [{"op": "move", "from": "b", "path": "c"}]
+
+        blocked = client.patch("/api/fields", params=params, json=[{"op": "remove", "path": "b"}])
+        renamed = client.patch("/api/fields", params=params, json=move)
+        forced = client.patch("/api/fields", params={**params, "force": True}, json=move)
+        together = client.patch("/api/fields", params=params, json=[{"op": "remove", "path": "a"},
+                                                                     {"op": "remove", "path": "c"}])
+
+        assert blocked.status_code == 409
+        assert blocked.json()["detail"]["dependents"] == [{"file": "gen/rules.json", "path": "a", "key": "b"}]
+        assert renamed.status_code == 409
+        assert forced.status_code == 200
+        assert "dangling" in forced.headers["warning"]
+        assert together.status_code == 200
+
+    def test_resync_picks_up_external_edits(self, client):
+        client.get("/api/dependencies")
+        condition = {"logical": "and", "conditions": [{"key": "zzz", "operator": "eq", "value": "x"}]}
+        with open(os.path.join(main.BASE_PATH, "gen", "rules.json"), "r+") as f:
+            f.write(json.dumps([_rule("a"), _rule("c", condition=condition)]))
+            f.truncate()
+
+        assert client.get("/api/dependencies").json()["dangling"] == []
+        assert client.post("/api/dependencies/resync").json()["dependencies"]["files"] == 1
+        assert client.get("/api/dependencies").json()["dangling"] == [{"file": "gen/rules.json", "path": "c", "key": "zzz"}]
+
+
+class TestValidateBatchApi:
+
+    @pytest.fixture(autouse=True)
+    def pool(self):
+        yield
+        shutdown_pool()
+
+    @staticmethod
+    def _validate(client, chunks):
+        response = client.post("/api/validate/batch", params={"path": "gen/rules.json"}, content=iter(chunks))
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        return sorted((json.loads(line) for line in response.text.splitlines()), key=lambda r: r["index"])
+
+    def test_ndjson_with_invalid_document(self, client):
+        results = self._validate(client, [b'{"a": "x"}\nnot json\n', b'{"a": 1}\n[]\n'])
+
+        assert [r.get("valid") for r in results] == [True, None, False, None]
+        assert "Invalid JSON" in results[1]["error"]
+        assert results[2]["violations"][0]["path"] == "a"
+        assert results[3]["error"] == "document must be a JSON object"
+
+    def test_json_array(self, client):
+        results = self._validate(client, [b'[{"a": "x"}, {"a"', b': 1}]'])
+
+        assert [r["valid"] for r in results] == [True, False]
+
+    def test_malformed_array_fails_fast(self, client):
+        results = self._validate(client, [b'[{"a": "x"}, {"a" 1}, ', b'{"a": "y"}' * 1000, b']'])
+
+        assert [r.get("valid") for r in results] == [True, None]
+        assert "Invalid JSON" in results[1]["error"]
+
+
+class TestBulkApi:
+
+    def test_applies_across_files_or_nothing(self, client):
+        with open(os.path.join(main.BASE_PATH, "gen", "more.json"), "w") as f:
+            json.dump([_rule("b", multi_type=["object"])], f)
+        create = {"op": "create", "parent_path": "b", "field": _rule("c")}
+        operations = [{**create, "path": "gen/rules.json"}, {**create, "path": "gen/more.json"}]
+
+        committed = client.post("/api/bulk", json={"operations": operations})
+        repeated = client.post("/api/bulk", json={"operations": [{**create, "path": "gen/rules.json", "field": _rule("d")},
+                                                                 {**create, "path": "gen/more.json"}]})
+        field = client.get("/api/field", params={"path": "gen/more.json", "field_path": "b.c"})
+
+        assert committed.status_code == 200
+        assert committed.json()["files"]["gen/more.json"] == client.get(
+            "/api/fields", params={"path": "gen/more.json"}).headers["etag"]
+        assert repeated.status_code == 409
+        assert [r["status"] for r in repeated.json()["results"]] == ["ok", "failed"]
+        assert field.status_code == 200
+        assert client.get("/api/field", params={"path": "gen/rules.json", "field_path": "b.d"}).status_code == 404
+
+    def test_rejects_invalid_operation(self, client):
+        response = client.post("/api/bulk", json={"operations": [{"op": "create", "path": "gen/rules.json"}]})
+        missing = client.post("/api/bulk", json={"operations": [{"op": "delete", "path": "gen/nope.json", "key": "a"}]})
+
+        assert response.status_code == 422
+        assert missing.status_code == 404
+        assert missing.json()["error"]["reason"] == "not_found"
+
+
+class TestHealthApi:
+
+    def test_ready_follows_prewarm(self, client, monkeypatch):
+        prewarmer = Prewarmer(enabled=True)
+        monkeypatch.setattr(main, "prewarmer", prewarmer)
+
+        assert client.get("/healthz/ready").status_code == 503
+        prewarmer.run(main.BASE_PATH)
+        response = client.get("/healthz/ready")
+
+        assert response.status_code == 200
+        assert response.json()["loaded"] == 1
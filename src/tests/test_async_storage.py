@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from src.utils.async_storage import BoundedExecutor
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class TestBoundedExecutor:
+
+    def test_runs_in_worker_thread(self):
+        executor = BoundedExecutor("test", max_workers=1, max_pending=1)
+
+        async def main():
+            return await executor.run(threading.get_ident)
+
+        assert asyncio.run(main()) != threading.get_ident()
+        assert executor.stats()["completed"] == 1
+
+    def test_propagates_context_and_errors(self):
+        executor = BoundedExecutor("test", max_workers=1, max_pending=1)
+
+        def fail():
+            raise ValueError(request_id.get())
+
+        async def main():
+            request_id.set("abc")
+            await executor.run(fail)
+
+        with pytest.raises(ValueError, match="abc"):
+            asyncio.run(main())
+        assert executor.stats()["failed"] == 1
+
+    def test_bounds_concurrency(self):
+        executor = BoundedExecutor("test", max_workers=2, max_pending=1)
+        release = threading.Event()
+        active = []
+        peak = []
+
+        def work():
+            active.append(1)
+            peak.append(len(active))
+            release.wait(5)
+            active.pop()
+
+        async def main():
+            tasks = [asyncio.create_task(executor.run(work)) for _ in range(6)]
+            await asyncio.sleep(0.05)
+            stats = executor.stats()
+            release.set()
+            await asyncio.gather(*tasks)
+            return stats
+
+        stats = asyncio.run(main())
+        assert stats["running"] == 2
+        assert stats["queued"] == 1
+        assert stats["backpressure_waits"] == 3
+        assert max(peak) == 2
+        assert executor.stats()["completed"] == 6
+
+    def test_submit_skips_when_queue_is_full(self):
+        executor = BoundedExecutor("test", max_workers=1, max_pending=1)
+        started, release, done = threading.Event(), threading.Event(), threading.Event()
+
+        assert executor.submit(lambda: started.set() or release.wait())
+        assert started.wait(5)
+        assert executor.submit(done.set)
+        assert not executor.submit(done.set)
+        release.set()
+
+        assert done.wait(5)
@@ -0,0 +1,68 @@
+import pytest
+
+from src.utils.batch_validator import DocumentStreamParser
+
+
+def _parse(chunks):
+    parser = DocumentStreamParser()
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    items.extend(parser.finish())
+    return items
+
+
+class TestDocumentStreamParser:
+
+    @pytest.mark.parametrize(
+        "chunks",
+        [
+            [b'{"a": 1}\n{"a": 2}\n', b'{"a": 3}'],
+            [b'{"a"', b': 1}\n{"a": 2', b'}\n\n{"a": 3}\n'],
+            [b' [{"a": 1},', b' {"a": 2}, {"a"', b': 3}]'],
+        ]
+    )
+    def test_documents_across_chunks(self, chunks):
+        items = _parse(chunks)
+
+        assert [(index, document) for index, document, _ in items] == [(0, {"a": 1}), (1, {"a": 2}), (2, {"a": 3})]
+
+    def test_invalid_line_does_not_stop_ndjson(self):
+        items = _parse([b'{"a": 1}\nnot json\n{"a": 3}\n'])
+
+        assert [error is None for _, _, error in items] == [True, False, True]
+
+    def test_scalar_split_between_chunks(self):
+        items = _parse([b'[12', b'3, 4]'])
+
+        assert [document for _, document, _ in items] == [123, 4]
+
+    def test_malformed_array_fails_without_waiting_for_finish(self):
+        parser = DocumentStreamParser()
+
+        items = parser.feed(b'[{"a": 1}, {"a" 1}, {"a": 3}')
+
+        assert [error is None for _, _, error in items] == [True, False]
+        assert parser.feed(b', {"a": 4}]') == []
+        assert parser.finish() == []
+
+    def test_oversized_array_document_is_rejected(self):
+        parser = DocumentStreamParser(max_document_size=64)
+
+        items = parser.feed(b'[{"a": "' + b"x" * 100)
+
+        assert len(items) == 1
+        assert "exceeds 64" in items[0][2]
+
+    def test_oversized_ndjson_line_is_skipped(self):
+        parser = DocumentStreamParser(max_document_size=64)
+
+        items = parser.feed(b'{"a": 1}\n{"a": "' + b"x" * 100)
+        items += parser.feed(b"x" * 100)
+        items += parser.feed(b'"}\n{"a": 3}\n' + b'{"a": "' + b"y" * 100 + b'"}\n')
+        items += parser.finish()
+
+        assert [(index, document) for index, document, _ in items] == [(0, {"a": 1}), (1, None), (2, {"a": 3}),
+                                                                      (3, None)]
+        assert "exceeds 64" in items[1][2] and "exceeds 64" in items[3][2]
+        assert parser._buffer == ""
@@ -0,0 +1,59 @@
+from benchmarks import import_time, stores, suite
+from benchmarks.generator import generate_rules
+from src.utils.compact_tree import CompactTree
+
+
+class TestGenerator:
+
+    def test_conditions_reference_existing_fields(self):
+        tree = CompactTree.from_json(generate_rules(depth=3, breadth=4, conditions=0.5, regexes=0.5))
+        paths = {path for _, path in tree.iter_paths()}
+        references = [key for _, items in tree.conditions.values() for key, _, _ in items]
+
+        assert references
+        assert all(key in paths for key in references)
+        assert any(regex for regex in tree.regexes)
+
+    def test_ratios_do_not_change_shape(self):
+        plain = CompactTree.from_json(generate_rules(depth=2, breadth=5))
+        rich = CompactTree.from_json(generate_rules(depth=2, breadth=5, conditions=1.0, regexes=1.0))
+
+        assert plain.get_all_fields() == rich.get_all_fields()
+
+
+class TestSuite:
+
+    def test_run_covers_functions_and_endpoints(self):
+        report = suite.run(depth=2, breadth=3, conditions=0.5, regexes=0.5, repeat=1, batch_size=3)
+
+        assert report["meta"]["nodes"] == 12
+        assert {"load_fields_to_dict.cold", "find_field_by_path", "save_json",
+                "GET /api/fields", "POST /api/validate/batch", "POST /api/bulk", "DELETE /api/file"} <= set(report["results"])
+        assert all(result["runs"] == 1 for result in report["results"].values())
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}}}
+        current = {"results": {"a": {"median_ms": 11.0}, "b": {"median_ms": 20.0}, "c": {"median_ms": 1.0}}}
+
+        rows = suite.compare(baseline, current, threshold=1.2)
+
+        assert [(row["name"], row["regression"]) for row in rows] == [("a", False), ("b", True)]
+
+
+class TestStores:
+
+    def test_run_compares_both_stores(self):
+        report = stores.run(depth=2, breadth=3, conditions=0.5, regexes=0.5, repeat=1)
+
+        assert set(report["results"]) == {"json", "sqlite"}
+        assert report["results"]["json"].keys() == report["results"]["sqlite"].keys()
+
+
+class TestImportTime:
+
+    def test_main_does_not_load_flask(self):
+        report = import_time.run(["main"], repeat=1, top=3)["results"]["main"]
+
+        assert report["median_ms"] > 0
+        assert "fastapi" in report["slowest_imports_ms"]
+        assert not {"flask", "sqlite3"} & set(report["loaded"])
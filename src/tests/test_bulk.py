@@ -0,0 +1,122 @@
+import json
+import os
+
+import pytest
+
+from src.models import BulkOperation, Field
+from src.utils import json_loader
+from src.utils.bulk import BulkError, apply_bulk
+from src.utils.dependency_graph import DependencyGraph
+from src.utils.field_cache import field_cache
+
+
+def _rule(key, **kwargs):
+    return {"key": key, "description": "", "multi_type": ["string"], "item_multi_type": [], **kwargs}
+
+
+def _create(path, key, parent_path="ids"):
+    return BulkOperation(op="create", path=path, parent_path=parent_path, field=Field.from_dict(_rule(key)))
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "gen2").mkdir()
+    for name in ("a.json", "b.json"):
+        (tmp_path / "gen2" / name).write_text(json.dumps([_rule("ids", multi_type=["object"]), _rule("other")]))
+    field_cache.clear()
+    yield tmp_path
+    field_cache.clear()
+
+
+def _resolve_in(root):
+    def resolve(path):
+        abs_path = os.path.abspath(os.path.join(str(root), path.strip("/")))
+        if not abs_path.startswith(str(root)):
+            raise BulkError(None, "forbidden", "Access denied")
+        return abs_path
+    return resolve
+
+
+def _keys(root, name, parent="ids"):
+    data = json.loads((root / "gen2" / name).read_text())
+    return [child["key"] for child in next(item for item in data if item["key"] == parent).get("children", [])]
+
+
+class TestApplyBulk:
+
+    def test_writes_each_file_once(self, root, monkeypatch):
+        writes = []
+        stage = json_loader.stage_json
+        monkeypatch.setattr(json_loader, "stage_json", lambda path, data: writes.append(path) or stage(path, data))
+        operations = [_create("gen2/a.json", "x"), _create("gen2/b.json", "x"), _create("/gen2/a.json", "y"),
+                      BulkOperation(op="delete", path="gen2/b.json", key="other")]
+
+        report = apply_bulk(str(root), operations, _resolve_in(root))
+
+        assert report["committed"]
+        assert [r["status"] for r in report["results"]] == ["ok"] * 4
+        assert sorted(report["files"]) == ["gen2/a.json", "gen2/b.json"]
+        assert sorted(os.path.basename(path) for path in writes) == ["a.json", "b.json"]
+        assert _keys(root, "a.json") == ["x", "y"]
+        assert _keys(root, "b.json") == ["x"]
+
+    def test_failure_writes_nothing(self, root):
+        before = (root / "gen2" / "a.json").read_text()
+        operations = [_create("gen2/a.json", "x"), _create("gen2/b.json", "x", parent_path="missing"),
+                      _create("gen2/b.json", "y")]
+
+        report = apply_bulk(str(root), operations, _resolve_in(root))
+
+        assert not report["committed"]
+        assert report["error"]["index"] == 1 and report["error"]["reason"] == "not_found"
+        assert [r["status"] for r in report["results"]] == ["ok", "failed", "skipped"]
+        assert (root / "gen2" / "a.json").read_text() == before
+
+    def test_conflict_and_precondition(self, root):
+        conflict = apply_bulk(str(root), [_create("gen2/a.json", "x"), _create("gen2/a.json", "x")],
+                              _resolve_in(root))
+        stale = apply_bulk(str(root), [_create("gen2/a.json", "x")], _resolve_in(root),
+                           if_match={"gen2/a.json": '"stale"'})
+
+        assert conflict["error"]["reason"] == "conflict"
+        assert stale["error"]["reason"] == "precondition_failed"
+        assert _keys(root, "a.json") == []
+
+    def test_forbidden_path(self, root):
+        report = apply_bulk(str(root), [_create("gen2/a.json", "x"), _create("../outside.json", "x")],
+                            _resolve_in(root))
+
+        assert report["error"] == {"index": 1, "reason": "forbidden", "detail": "Access denied"}
+        assert _keys(root, "a.json") == []
+
+    def test_referenced_field_requires_force(self, root):
+        condition = {"logical": "and", "conditions": [{"key": "other", "operator": "eq", "value": "x"}]}
+        (root / "gen2" / "b.json").write_text(json.dumps([_rule("ids", condition=condition)]))
+        graph = DependencyGraph(str(root))
+        graph.sync()
+        delete = {"op": "delete", "path": "gen2/a.json", "key": "other"}
+
+        blocked = apply_bulk(str(root), [BulkOperation(**delete)], _resolve_in(root), graph=graph)
+        forced = apply_bulk(str(root), [BulkOperation(**delete, force=True)], _resolve_in(root), graph=graph)
+
+        assert blocked["error"]["reason"] == "referenced"
+        assert blocked["results"][0]["dependents"] == [{"file": "gen2/b.json", "path": "ids", "key": "other"}]
+        assert forced["committed"]
+        assert forced["results"][0]["dangling"] == blocked["results"][0]["dependents"]
+
+    def test_staging_failure_leaves_files_untouched(self, root, monkeypatch):
+        before = {name: (root / "gen2" / name).read_text() for name in ("a.json", "b.json")}
+        stage = json_loader.stage_json
+
+        def fail_on_b(path, data):
+            if path.endswith("b.json"):
+                raise OSError("disk full")
+            return stage(path, data)
+
+        monkeypatch.setattr(json_loader, "stage_json", fail_on_b)
+
+        with pytest.raises(OSError):
+            apply_bulk(str(root), [_create("gen2/a.json", "x"), _create("gen2/b.json", "x")], _resolve_in(root))
+
+        assert {name: (root / "gen2" / name).read_text() for name in before} == before
+        assert sorted(os.listdir(root / "gen2")) == ["a.json", "b.json"]
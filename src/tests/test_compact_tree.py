@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from benchmarks.generator import generate_rules
+from src.models import CustomEncoder, Field
+from src.utils import FieldLoader
+from src.utils.compact_tree import CompactTree, NotCompactable
+from src.utils.field_cache import field_cache
+
+
+def _with_condition(rules):
+    rules[1]["condition"] = {"logical": "or", "conditions": [{"key": "f0", "operator": "eq", "value": 1}]}
+    rules[1]["regex"] = "^a"
+    rules[1]["regex_enabled"] = True
+    return rules
+
+
+class TestCompactTree:
+
+    def test_round_trip_matches_pydantic(self):
+        data = _with_condition(generate_rules(depth=3, breadth=3))
+        fields = [Field.from_dict(item) for item in data]
+        tree = CompactTree.from_json(data)
+
+        assert len(tree) == 39
+        assert json.dumps(tree.to_fields(), cls=CustomEncoder) == json.dumps(fields, cls=CustomEncoder)
+        assert tree.get_all_fields() == FieldLoader.get_all_fields(fields)
+        assert CompactTree.from_fields(fields).get_all_fields() == tree.get_all_fields()
+
+    def test_find(self):
+        tree = CompactTree.from_json(generate_rules(depth=3, breadth=3))
+
+        assert tree.to_field(tree.find("f1.f1_f2")).key == "f1_f2"
+        assert tree.find("f1.missing") == -1
+        assert tree.find("f0.f0_f0.f0_f0_f0.deeper") == -1
+
+    def test_rejects_loosely_typed_input(self):
+        data = generate_rules(depth=1, breadth=2)
+        data[0]["required"] = "yes"
+
+        with pytest.raises(NotCompactable):
+            CompactTree.from_json(data)
+
+
+class TestCompactCache:
+
+    @pytest.fixture(autouse=True)
+    def small_threshold(self, monkeypatch):
+        monkeypatch.setattr(field_cache, "compact_min_nodes", 10)
+
+    def test_large_files_are_cached_compact(self, tmp_path):
+        (tmp_path / "rules.json").write_text(json.dumps(generate_rules(depth=2, breadth=4)))
+        loader = FieldLoader(str(tmp_path), "rules.json")
+
+        assert loader.load_field("f2.f2_f3").key == "f2_f3"
+        assert loader.load_all_fields()[1]["key"] == "f0.f0_f0"
+        entry = field_cache.get_entry(str(tmp_path / "rules.json"))
+        assert entry.compact is not None and entry._fields is None
+
+        fields = loader.load_fields_to_dict()
+        fields[0].children.clear()
+        assert len(loader.load_fields_to_dict()[0].children) == 4
+
+    def test_shared_reads_do_not_keep_field_trees(self, tmp_path):
+        (tmp_path / "rules.json").write_text(json.dumps(generate_rules(depth=2, breadth=4)))
+        loader = FieldLoader(str(tmp_path), "rules.json")
+
+        assert [field.key for field in loader.load_fields_shared()] == ["f0", "f1", "f2", "f3"]
+        entry = field_cache.get_entry(str(tmp_path / "rules.json"))
+        assert entry.fields is not entry.fields
+        assert entry._fields is None and "index" not in entry.derived
+
+    def test_invalid_shape_falls_back_to_pydantic(self, tmp_path):
+        data = generate_rules(depth=2, breadth=4)
+        data[0]["regex_enabled"] = "true"
+        (tmp_path / "rules.json").write_text(json.dumps(data))
+
+        fields = FieldLoader(str(tmp_path), "rules.json").load_fields_to_dict()
+
+        assert fields[0].regex_enabled is True
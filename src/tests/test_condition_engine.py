@@ -0,0 +1,62 @@
+import pytest
+
+from src.models import Condition, Field
+from src.models.condition import ConditionField
+from src.utils.condition_engine import ConditionCompiler
+from src.utils.field_index import FieldIndex
+
+
+def _field(key, multi_type, children=None):
+    return Field(key=key, description="", multi_type=multi_type, item_multi_type=[], children=children or [])
+
+
+RULES = [
+    _field("enabled", ["bool"]),
+    _field("replicas", ["number"]),
+    _field("net", ["object"], [_field("vip", ["ip"]), _field("name", ["string"])]),
+]
+
+
+def _evaluate(logical, conditions, document):
+    compiler = ConditionCompiler(FieldIndex(RULES))
+    condition = Condition(logical=logical, conditions=[ConditionField(*c) for c in conditions])
+    compiler.register(condition)
+    resolver = compiler.build_resolver()
+    evaluate = compiler.compile(condition)
+    return evaluate(*resolver.resolve(document))
+
+
+class TestConditionCompiler:
+
+    @pytest.mark.parametrize(
+        "conditions, document, expected",
+        [
+            ([("enabled", "eq", "True")], {"enabled": True}, True),
+            ([("enabled", "eq", "True")], {"enabled": "true"}, True),
+            ([("enabled", "ne", "True")], {"enabled": False}, True),
+            ([("replicas", "gt", "9")], {"replicas": 10}, True),
+            ([("replicas", "lt", "9")], {"replicas": "abc"}, False),
+            ([("net.vip", "gt", "10.0.0.9")], {"net": {"vip": "10.0.0.10"}}, True),
+            ([("net.vip", "eq", "10.0.0.1")], {"net": {"vip": "10.0.0.1/16"}}, True),
+            ([("net.name", "empty", "")], {"net": {}}, True),
+            ([("net.name", "not_empty", "")], {"net": "flat"}, False),
+        ]
+    )
+    def test_typed_comparisons(self, conditions, document, expected):
+        assert _evaluate("and", conditions, document) is expected
+
+    def test_logical_groups(self):
+        conditions = [("enabled", "eq", "True"), ("replicas", "gt", "1")]
+
+        assert _evaluate("and", conditions, {"enabled": True, "replicas": 0}) is False
+        assert _evaluate("or", conditions, {"enabled": True, "replicas": 0}) is True
+
+    def test_parent_keys_resolve_before_children(self):
+        compiler = ConditionCompiler(FieldIndex(RULES))
+        compiler.register(Condition(logical="and", conditions=[ConditionField("net.vip", "eq", "10.0.0.1")]))
+
+        resolver = compiler.build_resolver()
+        raw, coerced = resolver.resolve({"net": {"vip": "10.0.0.1"}})
+
+        assert raw == [{"vip": "10.0.0.1"}, "10.0.0.1"]
+        assert coerced[1] == 167772161
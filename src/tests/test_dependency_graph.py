@@ -0,0 +1,79 @@
+import json
+
+from src.models import Field
+from src.utils.dependency_graph import DependencyGraph
+from src.utils.json_loader import save_json
+
+
+def _rule(key, refs=(), children=()):
+    rule = {"key": key, "description": "", "multi_type": ["string"], "item_multi_type": [], "children": list(children)}
+    if refs:
+        rule["condition"] = {"logical": "and", "conditions": [{"key": r, "operator": "eq", "value": "1"} for r in refs]}
+    return rule
+
+
+def _write(path, rules):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(rules))
+
+
+class TestDependencyGraph:
+
+    def test_resolves_same_file_before_sibling_files(self, tmp_path):
+        _write(tmp_path / "gen" / "a.json", [_rule("mode"), _rule("x", refs=["mode"])])
+        _write(tmp_path / "gen" / "b.json", [_rule("mode"), _rule("y", refs=["mode", "net.cidr"])])
+        _write(tmp_path / "gen" / "c.json", [_rule("net", children=[_rule("cidr")]), _rule("z", refs=["mode"])])
+        graph = DependencyGraph(tmp_path)
+        graph.sync()
+
+        assert graph.dependents("gen/a.json", "mode") == [
+            {"file": "gen/a.json", "path": "x", "key": "mode"},
+            {"file": "gen/c.json", "path": "z", "key": "mode"},
+        ]
+        assert graph.dependents("gen/c.json", "net.cidr") == [{"file": "gen/b.json", "path": "y", "key": "net.cidr"}]
+        # c.json 的 z 還能解析到 b.json 的 mode，只有 a.json 自己的 x 會壞掉
+        assert graph.breaking_dependents("gen/a.json", ["mode"]) == [{"file": "gen/a.json", "path": "x", "key": "mode"}]
+        assert graph.breaking_dependents("gen/c.json", ["net", "net.cidr"]) == [
+            {"file": "gen/b.json", "path": "y", "key": "net.cidr"}]
+
+    def test_dangling_and_cycles(self, tmp_path):
+        _write(tmp_path / "gen" / "a.json", [
+            _rule("a", refs=["b"]), _rule("b", refs=["a"]), _rule("c", refs=["c"]), _rule("d", refs=["missing"])])
+        graph = DependencyGraph(tmp_path)
+        graph.sync()
+
+        assert graph.dangling() == [{"file": "gen/a.json", "path": "d", "key": "missing"}]
+        assert graph.cycles("gen") == [
+            [{"file": "gen/a.json", "path": "a"}, {"file": "gen/a.json", "path": "b"}],
+            [{"file": "gen/a.json", "path": "c"}],
+        ]
+        assert graph.cycles("other") == []
+
+    def test_only_changed_files_are_reindexed(self, tmp_path):
+        _write(tmp_path / "gen" / "a.json", [_rule("mode")])
+        _write(tmp_path / "gen" / "b.json", [_rule("y", refs=["mode"])])
+        graph = DependencyGraph(tmp_path)
+        graph.sync()
+        reindexed = graph.reindexed
+
+        save_json(str(tmp_path / "gen" / "a.json"), [Field.from_dict(_rule("other"))])
+        graph.sync()
+
+        assert graph.reindexed == reindexed + 1
+        assert graph.dangling() == [{"file": "gen/b.json", "path": "y", "key": "mode"}]
+
+    def test_external_rewrite_needs_rescan(self, tmp_path):
+        _write(tmp_path / "gen" / "a.json", [_rule("mode")])
+        _write(tmp_path / "gen" / "b.json", [_rule("y", refs=["mode"])])
+        graph = DependencyGraph(tmp_path)
+        graph.sync()
+
+        # 直接覆寫內容：資料夾 mtime 不變，也沒有 file event
+        with open(tmp_path / "gen" / "a.json", "r+") as f:
+            f.write(json.dumps([_rule("zzzz")]))
+            f.truncate()
+        graph.sync()
+        assert graph.dangling() == []
+
+        graph.sync(rescan=True)
+        assert graph.dangling() == [{"file": "gen/b.json", "path": "y", "key": "mode"}]
@@ -0,0 +1,86 @@
+import json
+
+from src.models.fileType import FileType
+from src.utils.directory_tree import DirectoryTreeIndex
+from src.utils.field_cache import field_cache
+from src.utils.file_events import WRITTEN, file_events
+
+
+def _rules(*keys):
+    return json.dumps([{"key": key, "description": "", "multi_type": ["object"], "item_multi_type": [],
+                        "children": [{"key": "c", "description": "", "multi_type": [], "item_multi_type": []}]}
+                       for key in keys])
+
+
+def _make_tree(root):
+    (root / "gen1").mkdir()
+    (root / "gen1" / "a.json").write_text(_rules("x", "y"))
+    (root / "gen1" / ".a.json.tmp").write_text("")
+    (root / "gen2").mkdir()
+    (root / "gen2" / "sub").mkdir()
+    (root / "gen2" / "sub" / "b.json").write_text("not json")
+    (root / "top.json").write_text("[]")
+
+
+class TestDirectoryTreeIndex:
+
+    def test_list_dir_sorts_folders_first(self, tmp_path):
+        _make_tree(tmp_path)
+        items = DirectoryTreeIndex(tmp_path).list_dir("")
+
+        assert [(item.name, item.file_type) for item in items] == [
+            ("gen1", FileType.FOLDER), ("gen2", FileType.FOLDER), ("top.json", FileType.FILE)]
+
+    def test_walk_depth_pagination_and_metadata(self, tmp_path):
+        _make_tree(tmp_path)
+        tree = DirectoryTreeIndex(tmp_path)
+
+        full = tree.walk("")
+        assert [item["path"] for item in full["items"]] == [
+            "gen1", "gen1/a.json", "gen2", "gen2/sub", "gen2/sub/b.json", "top.json"]
+        assert full["items"][1]["field_count"] == 4
+        assert full["items"][4]["field_count"] is None
+
+        shallow = tree.walk("", depth=1, offset=1, limit=1)
+        assert shallow["total"] == 3
+        assert [item["path"] for item in shallow["items"]] == ["gen2"]
+        assert tree.walk("gen1/a.json") is None
+
+    def test_detects_changes(self, tmp_path):
+        _make_tree(tmp_path)
+        tree = DirectoryTreeIndex(tmp_path)
+        tree.walk("")
+        scans = tree.scans
+
+        tree.walk("")
+        assert tree.scans == scans
+
+        (tmp_path / "gen1" / "a.json").write_text(_rules("x"))
+        file_events.publish(WRITTEN, tmp_path / "gen1" / "a.json")
+        items = tree.walk("gen1")["items"]
+        assert items[0]["field_count"] == 2
+
+        (tmp_path / "gen2" / "new.json").write_text("[]")
+        assert "new.json" in [item.name for item in tree.list_dir("gen2")]
+
+    def test_in_place_edit_refreshes_metadata(self, tmp_path):
+        _make_tree(tmp_path)
+        tree = DirectoryTreeIndex(tmp_path)
+        tree.walk("")
+        stats = field_cache.stats()
+
+        # 沒有發佈事件，資料夾 mtime 也不會改變
+        (tmp_path / "gen1" / "a.json").write_text(_rules("x", "y", "z"))
+        item = tree.walk("gen1")["items"][0]
+
+        assert item["field_count"] == 6
+        assert item["size"] == len(_rules("x", "y", "z"))
+        assert (field_cache.stats()["hits"], field_cache.stats()["misses"]) == (stats["hits"], stats["misses"])
+
+    def test_discarded_index_stops_listening(self, tmp_path):
+        listeners = file_events.listener_count()
+        tree = DirectoryTreeIndex(tmp_path)
+        assert file_events.listener_count() == listeners + 1
+
+        del tree
+        assert file_events.listener_count() == listeners
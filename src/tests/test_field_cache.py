@@ -0,0 +1,91 @@
+import json
+
+from src.models import Field
+from src.utils import FieldLoader
+from src.utils.field_cache import FieldCache, field_cache
+from src.utils import json_loader
+from src.utils.file_events import DELETED, file_events
+from src.utils.file_version import stat_signature
+from src.utils.json_loader import _ValidityCache, is_valid_json_file, save_json
+
+
+def _write_rules(file_path, keys):
+    rules = [{"key": key, "description": "", "multi_type": ["string"], "item_multi_type": []} for key in keys]
+    file_path.write_text(json.dumps(rules))
+
+
+class TestFieldCache:
+
+    def test_hit_after_first_load(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        _write_rules(rule_file, ["a", "b"])
+        loader = FieldLoader(str(tmp_path), "rules.json")
+
+        first = loader.load_fields_shared()
+        hits = field_cache.hits
+        second = loader.load_fields_shared()
+
+        assert first is second
+        assert field_cache.hits == hits + 1
+
+    def test_mutable_load_does_not_touch_cache(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        _write_rules(rule_file, ["a"])
+        loader = FieldLoader(str(tmp_path), "rules.json")
+
+        fields = loader.load_fields_to_dict()
+        fields[0].children.append(Field(key="child", description="", multi_type=[], item_multi_type=[]))
+
+        assert loader.load_fields_shared()[0].children == []
+
+    def test_external_change_is_detected(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        _write_rules(rule_file, ["a"])
+        loader = FieldLoader(str(tmp_path), "rules.json")
+        loader.load_fields_shared()
+
+        _write_rules(rule_file, ["a", "b", "c"])
+
+        assert [f.key for f in loader.load_fields_shared()] == ["a", "b", "c"]
+
+    def test_save_json_updates_entry(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        _write_rules(rule_file, ["a"])
+        loader = FieldLoader(str(tmp_path), "rules.json")
+
+        fields = loader.load_fields_to_dict()
+        fields.append(Field(key="b", description="", multi_type=[], item_multi_type=[]))
+        save_json(str(rule_file), fields)
+
+        assert loader.load_fields_shared() is fields
+
+    def test_lru_eviction_by_bytes(self, tmp_path):
+        cache = FieldCache(max_bytes=100)
+        for name in ("a", "b", "c"):
+            rule_file = tmp_path / f"{name}.json"
+            rule_file.write_text(" " * 40)
+            cache.put(str(rule_file), [])
+
+        assert cache.get(str(tmp_path / "a.json")) is None
+        assert cache.get(str(tmp_path / "c.json")) == []
+        assert cache.stats()["evictions"] == 1
+
+
+class TestJsonValidity:
+
+    def test_result_is_bounded_and_forgotten_on_delete(self, tmp_path, monkeypatch):
+        cache = _ValidityCache(max_entries=2)
+        monkeypatch.setattr(json_loader, "_json_validity", cache)
+        file_events.subscribe(cache._on_file_event)
+        paths = []
+        for name in ("a", "b", "c"):
+            rule_file = tmp_path / f"{name}.json"
+            rule_file.write_text("not json")
+            paths.append(str(rule_file))
+            assert not is_valid_json_file(paths[-1], stat_signature(paths[-1]))
+        file_events.publish(DELETED, paths[2])
+        file_events.unsubscribe(cache._on_file_event)
+
+        assert cache.get(paths[0], stat_signature(paths[0])) is None
+        assert cache.get(paths[1], stat_signature(paths[1])) is False
+        assert cache.get(paths[2], stat_signature(paths[2])) is None
@@ -0,0 +1,37 @@
+from src.models import Field
+from src.utils.field_index import FieldIndex
+
+
+def _field(key, children=None):
+    return Field(key=key, description="", multi_type=["object"], item_multi_type=[], children=children or [])
+
+
+class TestFieldIndex:
+
+    def _tree(self):
+        return [_field("a", [_field("b", [_field("c")])]), _field("d")]
+
+    def test_lookup_by_path(self):
+        index = FieldIndex(self._tree())
+
+        assert index.get("a.b.c").key == "c"
+        assert index.get("a.x") is None
+        assert index.has_child("a", "b")
+        assert not index.has_child("", "b")
+        assert len(index) == 4
+
+    def test_add_replace_remove_keep_tree_in_sync(self):
+        fields = self._tree()
+        index = FieldIndex(fields)
+
+        index.add("a.b", _field("e"))
+        assert [f.key for f in fields[0].children[0].children] == ["c", "e"]
+        assert index.get("a.b.e") is not None
+
+        index.replace("a", _field("b", [_field("f")]))
+        assert index.get("a.b.c") is None
+        assert index.get("a.b.f") is fields[0].children[0].children[0]
+
+        index.remove("", "a")
+        assert [f.key for f in fields] == ["d"]
+        assert index.get("a") is None and index.get("a.b.f") is None
@@ -0,0 +1,78 @@
+import pytest
+
+from benchmarks.generator import generate_rules
+from src.models import Field
+from src.utils.compact_tree import CompactTree
+from src.utils.field_cache import CacheEntry
+from src.utils.field_pages import InvalidCursor, build_page, decode_cursor, encode_cursor
+from src.utils.file_version import FileSignature
+
+SIGNATURE = FileSignature(1, 1, 1)
+
+
+def _entries():
+    data = generate_rules(depth=3, breadth=4, conditions=0.5, regexes=0.5)
+    fields = [Field.from_dict(item) for item in data]
+    return CacheEntry(fields, SIGNATURE), CacheEntry(None, SIGNATURE, compact=CompactTree.from_json(data))
+
+
+def _walk(entry, parent_path="", cursor_offset=0, limit=3):
+    """依 cursor 讀完整棵樹，回傳前序的 (path, child_count)"""
+    result = []
+    page = build_page(entry, parent_path, cursor_offset, 1, limit, "v")
+    while True:
+        for item in page["items"]:
+            result.append((item["path"], item["child_count"]))
+            if item["children_cursor"]:
+                _, path, offset = decode_cursor(item["children_cursor"])
+                result.extend(_walk(entry, path, offset, limit))
+        if page["next_cursor"] is None:
+            return result
+        _, path, offset = decode_cursor(page["next_cursor"])
+        page = build_page(entry, path, offset, 1, limit, "v")
+
+
+class TestBuildPage:
+
+    def test_compact_and_fields_agree(self):
+        fields_entry, compact_entry = _entries()
+
+        for args in [("", 0, 1, 2), ("", 2, 3, 3), ("f1", 0, 2, 10), ("f3.f3_f2", 1, 1, 1)]:
+            assert build_page(fields_entry, *args, "v") == build_page(compact_entry, *args, "v")
+
+    def test_depth_and_limit(self):
+        _, entry = _entries()
+
+        page = build_page(entry, "", 1, 2, 2, "v")
+
+        assert page["total"] == 4
+        assert [item["path"] for item in page["items"]] == ["f1", "f2"]
+        first = page["items"][0]
+        assert first["child_count"] == 4
+        assert [child["path"] for child in first["children"]] == ["f1.f1_f0", "f1.f1_f1"]
+        assert decode_cursor(first["children_cursor"]) == ("v", "f1", 2)
+        # 超過 depth 的欄位不展開，只給 child_count 與 cursor
+        assert "children" not in first["children"][0]
+        assert decode_cursor(first["children"][0]["children_cursor"]) == ("v", "f1.f1_f0", 0)
+        assert decode_cursor(page["next_cursor"]) == ("v", "", 3)
+
+    def test_cursors_cover_whole_tree(self):
+        fields_entry, _ = _entries()
+        expected = []
+
+        def collect(fields, prefix=""):
+            for field in fields:
+                expected.append((prefix + field.key, len(field.children)))
+                collect(field.children, prefix + field.key + ".")
+
+        collect(fields_entry.fields)
+        assert _walk(fields_entry) == expected
+
+    def test_missing_parent(self):
+        for entry in _entries():
+            assert build_page(entry, "f1.missing", 0, 1, 10, "v") is None
+
+    @pytest.mark.parametrize("token", ["", "not base64!", encode_cursor("v", "", -1)[:-2], "WzEsMiwzXQ"])
+    def test_malformed_cursor(self, token):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(token)
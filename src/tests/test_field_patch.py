@@ -0,0 +1,65 @@
+import pytest
+
+from src.models import Field, PatchOperation
+from src.utils.field_index import FieldIndex
+from src.utils.field_patch import PatchError, apply_patch
+
+
+def _value(key, **kwargs):
+    return {"key": key, "description": "", "multi_type": ["object"], "item_multi_type": [], **kwargs}
+
+
+def _index():
+    return FieldIndex([Field.from_dict(_value("a", children=[_value("b")])), Field.from_dict(_value("c"))])
+
+
+def _keys(fields, prefix=""):
+    keys = []
+    for field in fields:
+        keys.append(prefix + field.key)
+        keys.extend(_keys(field.children, prefix + field.key + "."))
+    return keys
+
+
+class TestApplyPatch:
+
+    def test_operations_apply_in_order(self):
+        index = _index()
+
+        apply_patch(index, [
+            PatchOperation(op="add", path="a.d", value=_value("d")),
+            PatchOperation.model_validate({"op": "copy", "from": "a.b", "path": "c.b"}),
+            PatchOperation.model_validate({"op": "move", "from": "a.d", "path": "c.e"}),
+            PatchOperation(op="replace", path="a.b", value=_value("b", description="changed")),
+            PatchOperation(op="test", path="a.b", value={"description": "changed"}),
+            PatchOperation(op="remove", path="a"),
+        ])
+
+        assert _keys(index.fields) == ["c", "c.b", "c.e"]
+        assert index.get("c.e") is index.fields[0].children[1]
+
+    def test_returns_removed_paths(self):
+        removed = apply_patch(_index(), [
+            PatchOperation.model_validate({"op": "move", "from": "a", "path": "c.a"}),
+            PatchOperation(op="add", path="a", value=_value("a")),
+        ])
+
+        # a 又被加回，a.b 則搬到了 c.a.b
+        assert removed == {"a.b"}
+
+    @pytest.mark.parametrize(
+        "operation, reason",
+        [
+            (PatchOperation(op="add", path="a.b", value=_value("b")), "conflict"),
+            (PatchOperation(op="add", path="x.y", value=_value("y")), "not_found"),
+            (PatchOperation(op="remove", path="a.x"), "not_found"),
+            (PatchOperation(op="test", path="a", value={"description": "x"}), "test_failed"),
+            (PatchOperation.model_validate({"op": "move", "from": "a", "path": "a.b.a"}), "invalid"),
+            (PatchOperation(op="add", path="a.r", value=_value("r", regex="*/16$")), "invalid"),
+        ]
+    )
+    def test_failures(self, operation, reason):
+        with pytest.raises(PatchError) as error:
+            apply_patch(_index(), [operation])
+
+        assert error.value.reason == reason
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+from benchmarks.generator import generate_rules
+from src.models import Field, PatchOperation
+from src.utils import FieldLoader
+from src.utils.compact_tree import CompactTree
+from src.utils.field_cache import field_cache
+from src.utils.field_index import FieldIndex
+from src.utils.field_patch import apply_patch
+from src.utils.fields_service import FieldViews
+from src.utils.write_coordinator import WriteCoordinator
+
+
+def _fields(**kwargs):
+    return [Field.from_dict(item) for item in generate_rules(**kwargs)]
+
+
+def _field(key, multi_type=("string",)):
+    return Field(key=key, description="", multi_type=list(multi_type), item_multi_type=[])
+
+
+def _assert_same(views, fields):
+    all_fields = FieldLoader.get_all_fields(fields)
+    assert views.all_fields == all_fields
+    assert views.parent_fields == FieldLoader.get_available_parent_fields(all_fields)
+    assert views.child_fields == FieldLoader.get_available_child_fields(all_fields)
+
+
+class TestFieldViews:
+
+    def test_matches_loader_functions(self):
+        fields = _fields(depth=3, breadth=3)
+        views = FieldViews.from_fields(fields)
+
+        _assert_same(views, fields)
+        assert views.all_fields is views.all_fields
+        assert FieldViews.from_compact(CompactTree.from_fields(fields)).all_fields == views.all_fields
+
+    def test_child_fields_skip_containers(self):
+        views = FieldViews.from_fields([_field("s"), _field("o", ["object"]), _field("n", ["number", "string"])])
+
+        assert [f["key"] for f in views.child_fields] == ["s", "n"]
+        assert [op["value"] for op in views.child_fields[1]["operators"]] == ["eq", "ne", "gt", "lt", "not_empty", "empty"]
+
+    def test_update_rebuilds_only_touched_roots(self):
+        fields = _fields(depth=3, breadth=3)
+        views = FieldViews.from_fields(fields)
+        index = FieldIndex([field.clone() for field in fields])
+
+        index.add("f1.f1_f0", _field("new"))
+        index.remove("", "f2")
+        index.add("", _field("tail", ["object"]))
+        updated = views.updated(index.fields, index.touched)
+
+        _assert_same(updated, index.fields)
+        assert updated._segments[0] is views._segments[0]
+        assert updated._segments[1] is not views._segments[1]
+
+    def test_update_after_patch_rename_keeps_order(self):
+        fields = _fields(depth=2, breadth=3)
+        views = FieldViews.from_fields(fields)
+        index = FieldIndex([field.clone() for field in fields])
+
+        value = {"key": "renamed", "description": "", "multi_type": ["object"], "item_multi_type": []}
+        apply_patch(index, [PatchOperation(op="replace", path="f1", value=value)])
+        updated = views.updated(index.fields, index.touched)
+
+        _assert_same(updated, index.fields)
+        assert [f["key"] for f in updated.all_fields if "." not in f["key"]] == ["f0", "renamed", "f2"]
+
+
+class TestFieldViewsCache:
+
+    def test_write_carries_views_forward(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        rule_file.write_text(json.dumps(generate_rules(depth=2, breadth=3)))
+        loader = FieldLoader(str(tmp_path), "rules.json")
+        before = loader.load_views()
+
+        def mutation(index):
+            index.add("f2", _field("added"))
+            return True
+
+        asyncio.run(WriteCoordinator(window=0).submit(str(rule_file), mutation))
+        after = loader.load_views()
+
+        assert after is not before
+        assert "f2.added" in [f["key"] for f in after.all_fields]
+        assert after._segments[0] is before._segments[0]
+        field_cache.invalidate(str(rule_file))
+        assert loader.load_views().all_fields == after.all_fields
+
+    def test_views_survive_compaction(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        rule_file.write_text(json.dumps(generate_rules(depth=2, breadth=3)))
+        views = FieldViews.from_fields(FieldLoader(str(tmp_path), "rules.json").load_fields_shared())
+
+        entry = field_cache.put(str(rule_file), None, compact=CompactTree.from_json(generate_rules(depth=2, breadth=3)),
+                                derived={"views": views, "index": object()})
+
+        assert entry.derived == {"views": views}
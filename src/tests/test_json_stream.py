@@ -0,0 +1,121 @@
+import json
+import time
+
+import pytest
+
+from benchmarks.generator import generate_rules
+from src.utils import FieldLoader, fields_service, json_stream
+from src.utils.async_storage import parse_executor
+from src.utils.compact_tree import CompactTree
+from src.utils.field_cache import field_cache
+from src.utils.json_loader import load_cache_entry
+from src.utils.json_stream import read_subtree
+
+
+def _reference(data, field_path):
+    node = None
+    for part in field_path.split("."):
+        node = next((item for item in data if item["key"] == part), None)
+        if node is None:
+            return None
+        data = node.get("children", [])
+    return node
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def rules():
+    data = generate_rules(depth=3, breadth=3, conditions=0.5, regexes=0.5)
+    data[0]["description"] = 'brackets [{ "quoted" }] and \\ escapes \\"'
+    # key 出現在 children 之後
+    data[1] = {name: data[1][name] for name in reversed(list(data[1]))}
+    return data
+
+
+class TestReadSubtree:
+
+    @pytest.mark.parametrize("indent", [None, 4])
+    @pytest.mark.parametrize("chunk_size", [1, 3, 64, json_stream.CHUNK_SIZE])
+    def test_matches_full_parse(self, tmp_path, rules, indent, chunk_size):
+        file_path = tmp_path / "rules.json"
+        file_path.write_text(json.dumps(rules, indent=indent, ensure_ascii=False))
+
+        for _, path in CompactTree.from_json(rules).iter_paths():
+            assert read_subtree(file_path, path, chunk_size) == _reference(rules, path)
+
+    def test_missing_paths(self, tmp_path, rules):
+        file_path = tmp_path / "rules.json"
+        file_path.write_text(json.dumps(rules))
+
+        for path in ["missing", "f0.missing", "f0.f0_f0.f0_f0_f0.deeper", "", "f0..f0_f0"]:
+            assert read_subtree(file_path, path) is None
+
+    def test_first_match_without_children_stops(self, tmp_path):
+        file_path = tmp_path / "rules.json"
+        file_path.write_text(json.dumps([{"key": "a"}, {"key": "a", "children": [{"key": "b"}]}]))
+
+        assert read_subtree(file_path, "a.b") is None
+        assert read_subtree(file_path, "a") == {"key": "a"}
+
+
+class TestLoadFieldStreaming:
+
+    def test_large_uncached_file_is_streamed(self, tmp_path, rules, monkeypatch):
+        monkeypatch.setattr(json_stream, "STREAM_MIN_BYTES", 0)
+        (tmp_path / "rules.json").write_text(json.dumps(rules, indent=4))
+        loader = FieldLoader(str(tmp_path), "rules.json")
+        field_cache.clear()
+        streamed, parsed, submitted = [], [], []
+        monkeypatch.setattr(json_stream, "read_subtree", lambda *args: streamed.append(args) or read_subtree(*args))
+        monkeypatch.setattr(fields_service, "load_cache_entry",
+                            lambda *args: parsed.append(args) or load_cache_entry(*args))
+        monkeypatch.setattr(parse_executor, "submit", lambda *args: submitted.append(args) or True)
+
+        field = loader.load_field("f2.f2_f1")
+        again = loader.load_field("f2.f2_f1")
+
+        # 預設不在背景載入整個檔案
+        assert submitted == []
+        assert parsed == []
+        assert field_cache.stats()["entries"] == 0
+        assert len(streamed) == 2
+        assert again.model_dump() == field.model_dump()
+        assert field.model_dump() == loader.load_fields_to_dict()[2].children[1].model_dump()
+        field_cache.clear()
+
+    def test_streamed_read_warms_cache_when_enabled(self, tmp_path, rules, monkeypatch):
+        monkeypatch.setattr(json_stream, "STREAM_MIN_BYTES", 0)
+        monkeypatch.setattr(json_stream, "WARM_AFTER_STREAM", True)
+        (tmp_path / "rules.json").write_text(json.dumps(rules, indent=4))
+        loader = FieldLoader(str(tmp_path), "rules.json")
+        field_cache.clear()
+        streamed = []
+        monkeypatch.setattr(json_stream, "read_subtree", lambda *args: streamed.append(args) or read_subtree(*args))
+
+        field = loader.load_field("f2.f2_f1")
+        # 串流讀取後在背景放入快取，之後改用快取
+        assert _wait_for(lambda: field_cache.stats()["entries"] == 1)
+        assert loader.load_field("f2.f2_f1").model_dump() == field.model_dump()
+        assert len(streamed) == 1
+        field_cache.clear()
+
+    def test_malformed_file_falls_back_to_full_load(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(json_stream, "STREAM_MIN_BYTES", 0)
+        (tmp_path / "rules.json").write_text('[{"key": "a", "children": [')
+        loader = FieldLoader(str(tmp_path), "rules.json")
+        field_cache.clear()
+
+        with pytest.raises(Exception) as streamed:
+            loader.load_field("a.b")
+        monkeypatch.setattr(json_stream, "STREAM_MIN_BYTES", float("inf"))
+        with pytest.raises(Exception) as full:
+            loader.load_field("a.b")
+        assert type(streamed.value) is type(full.value)
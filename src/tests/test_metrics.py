@@ -0,0 +1,67 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+from src.utils.metrics import NO_ENDPOINT, Metrics, metrics
+
+
+class TestMetrics:
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Metrics(enabled=True)
+        registry.requests.observe(("GET", "/x", "200"), 0.003)
+        registry.requests.observe(("GET", "/x", "200"), 20)
+
+        lines = registry.render().splitlines()
+
+        assert 'precheck_request_duration_seconds_bucket{method="GET",endpoint="/x",status="200",le="0.0025"} 0' in lines
+        assert 'precheck_request_duration_seconds_bucket{method="GET",endpoint="/x",status="200",le="0.005"} 1' in lines
+        assert 'precheck_request_duration_seconds_bucket{method="GET",endpoint="/x",status="200",le="+Inf"} 2' in lines
+        assert 'precheck_request_duration_seconds_count{method="GET",endpoint="/x",status="200"} 2' in lines
+
+    def test_disabled_records_nothing(self):
+        registry = Metrics(enabled=False)
+        with registry.span("json_parse"):
+            pass
+        registry.observe_file(100, 10)
+
+        assert "_count" not in registry.render()
+
+    def test_span_outside_request(self):
+        registry = Metrics(enabled=True)
+        with registry.span("json_parse"):
+            pass
+
+        assert f'precheck_stage_duration_seconds_count{{endpoint="{NO_ENDPOINT}",stage="json_parse"}} 1' \
+               in registry.render()
+
+    def test_stats_become_gauges(self):
+        text = Metrics(enabled=True).render({"cache": {"hits": 3, "ratio": 0.5}, "pool": {"read": {"queued": 2}}})
+
+        assert "precheck_cache_hits 3" in text
+        assert "precheck_cache_ratio 0.5" in text
+        assert 'precheck_pool_queued{name="read"} 2' in text
+
+
+class TestMetricsApi:
+
+    def test_stages_are_grouped_by_route(self, tmp_path, monkeypatch):
+        (tmp_path / "gen").mkdir()
+        rule = {"key": "a", "description": "", "multi_type": ["string"], "item_multi_type": []}
+        (tmp_path / "gen" / "rules.json").write_text(json.dumps([rule]))
+        monkeypatch.setattr(main, "BASE_PATH", str(tmp_path))
+        metrics.clear()
+        client = TestClient(main.app)
+
+        client.get("/api/field", params={"path": "gen/rules.json", "field_path": "a"})
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert 'precheck_request_duration_seconds_count{method="GET",endpoint="/api/field",status="200"} 1' in text
+        for stage in ("path_check", "file_read", "json_parse", "build_fields", "path_walk"):
+            assert f'precheck_stage_duration_seconds_count{{endpoint="/api/field",stage="{stage}"}} 1' in text
+        assert "precheck_rule_file_nodes_count 1" in text
+        assert "precheck_field_cache_misses" in text
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.generator import generate_rules
+from src.utils.field_cache import field_cache
+from src.utils.file_version import stat_signature
+from src.utils.prewarm import DISABLED, FAILED, PENDING, READY, RUNNING, Prewarmer
+
+
+@pytest.fixture
+def rules_root(tmp_path):
+    (tmp_path / "gen").mkdir()
+    (tmp_path / "gen" / "a.json").write_text(json.dumps(generate_rules(depth=2, breadth=3)))
+    (tmp_path / "gen" / "b.json").write_text(json.dumps(generate_rules(depth=1, breadth=2)))
+    (tmp_path / "gen" / "broken.json").write_text("[{")
+    field_cache.clear()
+    yield tmp_path
+    field_cache.clear()
+
+
+def _cached(path) -> bool:
+    return field_cache.contains(str(path), stat_signature(str(path)))
+
+
+class TestPrewarm:
+
+    def test_disabled_is_ready(self):
+        prewarmer = Prewarmer(enabled=False)
+
+        assert prewarmer.state == DISABLED
+        assert prewarmer.stats()["ready"]
+
+    def test_run_loads_every_file(self, rules_root):
+        prewarmer = Prewarmer(enabled=True)
+        assert not prewarmer.stats()["ready"]
+
+        prewarmer.run(str(rules_root))
+        stats = prewarmer.stats()
+
+        assert stats["state"] == READY and stats["ready"]
+        assert (stats["files"], stats["loaded"], stats["failed"]) == (3, 2, 1)
+        assert _cached(rules_root / "gen" / "a.json")
+        assert _cached(rules_root / "gen" / "b.json")
+
+    def test_stops_loading_when_cache_is_full(self, rules_root, monkeypatch):
+        monkeypatch.setattr(field_cache, "max_bytes", 0)
+        prewarmer = Prewarmer(enabled=True)
+
+        prewarmer.run(str(rules_root))
+
+        assert prewarmer.stats()["skipped"] == 3
+        assert not _cached(rules_root / "gen" / "a.json")
+
+    def test_failure_still_finishes(self, tmp_path, monkeypatch):
+        def fail(root):
+            raise OSError("boom")
+
+        monkeypatch.setattr("src.utils.prewarm.get_tree_index", fail)
+        prewarmer = Prewarmer(enabled=True)
+
+        prewarmer.run(str(tmp_path))
+
+        assert prewarmer.stats()["state"] == FAILED
+        assert prewarmer.stats()["ready"]
+        assert "boom" in prewarmer.stats()["error"]
+
+    def test_start_runs_in_background(self, rules_root):
+        prewarmer = Prewarmer(enabled=True)
+
+        async def start_and_wait():
+            prewarmer.start(str(rules_root))
+            assert prewarmer.state in (PENDING, RUNNING)
+            await prewarmer._task
+
+        asyncio.run(start_and_wait())
+
+        assert prewarmer.state == READY
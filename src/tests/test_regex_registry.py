@@ -0,0 +1,51 @@
+import pytest
+
+from src.utils.regex_registry import InvalidRegexError, RegexRegistry, RISKY_MAX_INPUT, analyze
+
+
+class TestRegexRegistry:
+
+    @pytest.mark.parametrize(
+        "pattern, risky",
+        [
+            (r"^\d+$", False),
+            (r"^(\d{1,3}\.){3}\d{1,3}$", False),
+            (r"(a|b)*c", False),
+            (r"(a+)+$", True),
+            (r"(\w+\s?)*$", True),
+            (r"(.*)*x", True),
+        ]
+    )
+    def test_static_analysis(self, pattern, risky):
+        assert (analyze(pattern) is not None) is risky
+
+    def test_pattern_is_compiled_once(self):
+        registry = RegexRegistry()
+
+        first = registry.compile(r"^n\d+$")
+        second = registry.compile(r"^n\d+$")
+
+        assert first is second
+        assert registry.stats()["misses"] == 1 and registry.stats()["hits"] == 1
+
+    def test_invalid_pattern(self):
+        registry = RegexRegistry()
+
+        with pytest.raises(InvalidRegexError):
+            registry.compile("*/16$")
+        assert registry.check("*/16$") is not None
+        assert registry.check("/16$") is None
+
+    def test_lru_eviction(self):
+        registry = RegexRegistry(max_patterns=2)
+        for pattern in ("a", "b", "c"):
+            registry.compile(pattern)
+
+        assert registry.stats()["patterns"] == 2
+        assert registry.stats()["evictions"] == 1
+
+    def test_risky_pattern_has_input_budget(self):
+        compiled = RegexRegistry().compile(r"^(a+)+$")
+
+        assert compiled.search("aaaa") is True
+        assert compiled.search("a" * (RISKY_MAX_INPUT + 1) + "!") is None
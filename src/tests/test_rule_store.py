@@ -0,0 +1,151 @@
+import json
+
+import pytest
+
+from benchmarks.generator import write_rules
+from src.models import CustomEncoder, Field
+from src.utils.field_cache import field_cache
+from src.utils.rule_store import JsonDirectoryStore, ReferencedError, copy_rules
+from src.utils.sqlite_store import SqliteRuleStore
+
+FILE = "gen/rules.json"
+
+
+def _field(key, children=(), condition_key=None):
+    condition = None
+    if condition_key:
+        condition = {"logical": "and", "conditions": [{"key": condition_key, "operator": "eq", "value": 1}]}
+    return Field.from_dict({"key": key, "description": "", "multi_type": ["string"], "item_multi_type": [],
+                            "condition": condition, "children": list(children)})
+
+
+def _referencing_paths(fields, key, prefix=""):
+    for field in fields:
+        path = prefix + field.key
+        if field.condition is not None and any(c.key == key for c in field.condition.conditions):
+            yield path
+        yield from _referencing_paths(field.children, key, path + ".")
+
+
+def _dump(fields):
+    return json.dumps(fields, cls=CustomEncoder, indent=4)
+
+
+@pytest.fixture
+def source(tmp_path):
+    write_rules(str(tmp_path / "json" / "gen"), "rules.json", depth=3, breadth=3, conditions=0.5, regexes=0.5)
+    store = JsonDirectoryStore(tmp_path / "json")
+    # 產生的檔案先以 save_json 的格式重寫，匯出時才能逐位元組比較
+    copy_rules(store, store)
+    return store
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, source, tmp_path):
+    if request.param == "json":
+        yield source
+        return
+    store = SqliteRuleStore(str(tmp_path / "rules.db"))
+    copy_rules(source, store)
+    yield store
+    store.close()
+
+
+class TestRuleStore:
+
+    def test_mutations(self, store):
+        store.add_field(FILE, "f1.f1_f2", _field("new", condition_key="f0"))
+        assert store.replace_field(FILE, "", _field("f2", [_field("c").model_dump()]))
+        assert store.remove_field(FILE, "f0", "f0_f1")
+        assert not store.remove_field(FILE, "f0", "missing")
+        assert not store.replace_field(FILE, "", _field("missing"))
+
+        with pytest.raises(ValueError):
+            store.add_field(FILE, "f1", _field("f1_f0"))
+        with pytest.raises(KeyError):
+            store.add_field(FILE, "missing", _field("x"))
+
+        fields = store.load(FILE)
+        assert fields[1].children[2].children[-1].key == "new"
+        assert [child.key for child in fields[2].children] == ["c"]
+        assert [child.key for child in fields[0].children] == ["f0_f0", "f0_f2"]
+        assert store.get_field(FILE, "f2.c").key == "c"
+        assert store.get_field(FILE, "f0.f0_f1") is None
+        assert ("gen/rules.json", "f1.f1_f2.new") in store.references("f0")
+
+    def test_get_field_matches_load(self, store):
+        fields = store.load(FILE)
+
+        assert _dump(store.get_field(FILE, "f1")) == _dump(fields[1])
+        assert _dump(store.get_field(FILE, "f2.f2_f0.f2_f0_f1")) == _dump(fields[2].children[0].children[1])
+
+    def test_files_and_delete(self, store):
+        store.save("other/empty.json", [])
+
+        assert store.files() == ["gen/rules.json", "other/empty.json"]
+        assert store.load("other/empty.json") == []
+        assert store.delete("other/empty.json")
+        assert not store.delete("other/empty.json")
+        assert store.load("other/empty.json") is None
+
+    def test_breaking_dependents(self, store):
+        store.add_field(FILE, "f1", _field("uses_f0", condition_key="f0.f0_f1"))
+        store.save("gen/other.json", [_field("x", condition_key="f0.f0_f1")])
+        store.save("elsewhere/more.json", [_field("y", condition_key="f0.f0_f1")])
+
+        assert store.breaking_dependents(FILE, ["f0.f0_f1"]) == [
+            {"file": "gen/other.json", "path": "x", "key": "f0.f0_f1"},
+            {"file": FILE, "path": "f1.uses_f0", "key": "f0.f0_f1"},
+        ]
+        # 一起被移除的 condition 不算
+        assert store.breaking_dependents(FILE, ["f0.f0_f1", "f1.uses_f0"]) == [
+            {"file": "gen/other.json", "path": "x", "key": "f0.f0_f1"},
+        ]
+
+    def test_removal_checks_references(self, store):
+        store.add_field(FILE, "f1", _field("uses_f0", condition_key="f0.f0_f1"))
+
+        with pytest.raises(ReferencedError) as error:
+            store.remove_field(FILE, "", "f0", force=False)
+        with pytest.raises(ReferencedError):
+            store.replace_field(FILE, "", _field("f0"), force=False)
+
+        assert error.value.dependents == [{"file": FILE, "path": "f1.uses_f0", "key": "f0.f0_f1"}]
+        assert store.get_field(FILE, "f0.f0_f1") is not None
+        # 引用者一起被覆蓋時不算
+        assert store.replace_field(FILE, "", _field("f1"), force=False)
+        assert store.remove_field(FILE, "", "f0", force=False)
+
+    def test_compact_references(self, source, monkeypatch):
+        monkeypatch.setattr(field_cache, "compact_min_nodes", 10)
+        field_cache.clear()
+        expected = sorted((FILE, path) for path in _referencing_paths(source.load(FILE), "f1.f1_f0"))
+
+        assert expected
+        assert source.references("f1.f1_f0") == expected
+        assert field_cache.stats()["compact_entries"] == 1
+        field_cache.clear()
+
+
+class TestCopyRules:
+
+    def test_round_trip_is_lossless(self, source, tmp_path):
+        sqlite = SqliteRuleStore(str(tmp_path / "rules.db"))
+        exported = JsonDirectoryStore(tmp_path / "exported")
+
+        copy_rules(source, sqlite)
+        copy_rules(sqlite, exported)
+        sqlite.close()
+
+        assert (tmp_path / "exported" / FILE).read_bytes() == (tmp_path / "json" / FILE).read_bytes()
+
+    def test_duplicate_keys_are_kept(self, tmp_path):
+        sqlite = SqliteRuleStore(str(tmp_path / "rules.db"))
+        fields = [_field("a", [_field("x").model_dump()]), _field("a", [_field("y").model_dump()])]
+
+        sqlite.save(FILE, fields)
+
+        assert _dump(sqlite.load(FILE)) == _dump(fields)
+        assert sqlite.get_field(FILE, "a.x") is not None
+        assert sqlite.get_field(FILE, "a.y") is None
+        sqlite.close()
@@ -0,0 +1,84 @@
+import json
+
+from src.models import Field
+from src.utils.json_loader import save_json
+from src.utils.search_index import SearchIndex
+
+
+def _rule(key, description="", multi_type=("string",), children=(), condition_keys=()):
+    rule = {"key": key, "description": description, "multi_type": list(multi_type), "item_multi_type": [],
+            "children": list(children)}
+    if condition_keys:
+        rule["condition"] = {"logical": "and",
+                             "conditions": [{"key": k, "operator": "eq", "value": "1"} for k in condition_keys]}
+    return rule
+
+
+def _write(path, rules):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(rules))
+
+
+class TestSearchIndex:
+
+    def test_ranks_exact_key_before_prefix_and_description(self, tmp_path):
+        _write(tmp_path / "gen1" / "a.json", [
+            _rule("storage", multi_type=["object"], children=[_rule("trident_ssd", "SSD backend")]),
+            _rule("trident_ssd_size", "size", multi_type=["number"]),
+        ])
+        _write(tmp_path / "gen2" / "b.json", [_rule("note", "uses trident_ssd when enabled")])
+        index = SearchIndex(tmp_path)
+
+        result = index.search("trident_ssd")
+
+        assert [(item["file"], item["path"]) for item in result["items"]] == [
+            ("gen1/a.json", "storage.trident_ssd"),
+            ("gen1/a.json", "trident_ssd_size"),
+            ("gen2/b.json", "note"),
+        ]
+        assert index.search("ssd", kinds=["description"], substring=False)["total"] == 1
+        assert index.search("ssd", kinds=["description"])["total"] == 2
+        assert index.search("number", kinds=["type"])["items"][0]["key"] == "trident_ssd_size"
+
+    def test_substring_condition_and_pagination(self, tmp_path):
+        _write(tmp_path / "a.json", [_rule(f"key{n}", condition_keys=["network.mode"]) for n in range(5)])
+        index = SearchIndex(tmp_path)
+
+        assert index.search("etwor", substring=False)["total"] == 0
+        page = index.search("etwor", kinds=["condition"], offset=3, limit=10)
+        assert page["total"] == 5
+        assert [item["key"] for item in page["items"]] == ["key3", "key4"]
+        assert index.search("key1 mode")["total"] == 1
+
+    def test_only_changed_files_are_reindexed(self, tmp_path):
+        _write(tmp_path / "a.json", [_rule("alpha")])
+        _write(tmp_path / "b.json", [_rule("beta")])
+        index = SearchIndex(tmp_path)
+        index.search("alpha")
+        reindexed = index.reindexed
+
+        _write(tmp_path / "a.json", [_rule("gamma")])
+        (tmp_path / "b.json").unlink()
+
+        assert index.search("alpha")["total"] == 0
+        assert index.search("gamma")["total"] == 1
+        assert index.search("beta")["total"] == 0
+        assert index.reindexed == reindexed + 1
+        assert index.stats()["files"] == 1
+
+    def test_rewritten_content_is_reindexed(self, tmp_path):
+        _write(tmp_path / "a.json", [_rule("alpha")])
+        index = SearchIndex(tmp_path)
+        index.search("alpha")
+
+        # 只改寫內容：透過 save_json 會發佈 WRITTEN，直接覆寫則要等 rescan
+        save_json(str(tmp_path / "a.json"), [Field.from_dict(_rule("gamma"))])
+        assert index.search("gamma")["total"] == 1
+        assert index.search("alpha")["total"] == 0
+
+        with open(tmp_path / "a.json", "r+") as f:
+            f.write(json.dumps([_rule("delta")]))
+            f.truncate()
+        index.sync(rescan=True)
+        assert index.search("delta")["total"] == 1
+        assert index.search("gamma")["total"] == 0
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.generator import generate_rules
+from src.models import CustomEncoder, Field
+from src.models.fileType import FileType, PrecheckFile
+from src.utils.compact_tree import CompactTree
+from src.utils.serializer import dumps_compact, dumps_pretty
+
+
+def _fields():
+    data = generate_rules(depth=2, breadth=4, conditions=0.5, regexes=0.5)
+    data[0]["description"] = "中文 \"引號\" \n\t é"
+    data[1]["condition"] = {"logical": "or", "conditions": [
+        {"key": "f0", "operator": "in", "value": ["é", 1, 2.5, None, True, {"nested": {}}]},
+        {"key": "f2", "operator": "eq", "value": []},
+    ]}
+    fields = [Field.from_dict(item) for item in data]
+    fields[2].field_type = "string"
+    return fields
+
+
+def _pretty_reference(data) -> bytes:
+    return json.dumps(data, cls=CustomEncoder, indent=4).encode("utf-8")
+
+
+def _compact_reference(data) -> bytes:
+    return json.dumps(jsonable_encoder(data), ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class TestSerializer:
+
+    def test_pretty_matches_custom_encoder(self):
+        fields = _fields()
+        assert dumps_pretty(fields) == _pretty_reference(fields)
+        assert dumps_pretty(fields[1]) == _pretty_reference(fields[1])
+
+    def test_pretty_matches_for_compact_tree(self):
+        fields = CompactTree.from_fields(_fields()).to_fields()
+        assert dumps_pretty(fields) == _pretty_reference(fields)
+
+    def test_compact_matches_fastapi_response(self):
+        fields = _fields()
+        assert dumps_compact(fields) == _compact_reference(fields)
+        assert dumps_compact({"field": fields[1]}) == _compact_reference({"field": fields[1]})
+
+    @pytest.mark.parametrize("data", [
+        [], {}, "x", 1.5, {1: "a"},
+        [PrecheckFile("a.json", FileType.FILE), PrecheckFile("資料夾", FileType.FOLDER)],
+    ])
+    def test_other_values_fall_back(self, data):
+        assert dumps_pretty(data) == _pretty_reference(data)
+        assert dumps_compact(data) == _compact_reference(data)
+
+    def test_nan_only_allowed_in_files(self):
+        assert dumps_pretty([float("nan")]) == b"[\n    NaN\n]"
+        with pytest.raises(ValueError):
+            dumps_compact([float("nan")])
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.generator import generate_rules
+from src.models import CustomEncoder
+from src.utils.field_cache import field_cache
+from src.utils.file_events import DELETED, file_events
+from src.utils.json_loader import load_cache_entry
+from src.utils.snapshot import SNAPSHOT_SUFFIX, snapshot_store
+from src.utils.trusted_content import sidecar_path
+
+
+@pytest.fixture
+def rule_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_store, "enabled", True)
+    monkeypatch.setattr(snapshot_store, "min_nodes", 1)
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(generate_rules(depth=2, breadth=4, conditions=0.5, regexes=0.5)))
+    field_cache.clear()
+    yield path
+    field_cache.clear()
+
+
+def _load(path):
+    field_cache.clear()
+    entry = load_cache_entry(str(path.parent), path.name)
+    return json.dumps(entry.fields, cls=CustomEncoder)
+
+
+def _counts():
+    stats = snapshot_store.stats()
+    return stats["hits"], stats["writes"]
+
+
+class TestSnapshot:
+
+    def test_written_on_miss_and_used_next_time(self, rule_file, monkeypatch):
+        hits, writes = _counts()
+        expected = _load(rule_file)
+        assert os.path.exists(sidecar_path(str(rule_file), SNAPSHOT_SUFFIX))
+        assert _counts() == (hits, writes + 1)
+
+        # 由快照載入時不會讀取原始檔
+        monkeypatch.setattr("builtins.open", _fail_on(str(rule_file), open))
+        assert _load(rule_file) == expected
+        assert _counts() == (hits + 1, writes + 1)
+
+    def test_same_content_with_new_mtime_is_reused(self, rule_file):
+        expected = _load(rule_file)
+        stat = os.stat(rule_file)
+        os.utime(rule_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        hits, writes = _counts()
+
+        assert _load(rule_file) == expected
+        assert _load(rule_file) == expected
+        # 第一次比對內容 hash 並更新快照的版本，第二次只比對版本
+        assert _counts() == (hits + 2, writes)
+
+    def test_changed_content_falls_back_to_json(self, rule_file):
+        _load(rule_file)
+        data = json.loads(rule_file.read_text())
+        data[0]["description"] = "changed"
+        rule_file.write_text(json.dumps(data))
+        hits, writes = _counts()
+
+        assert json.loads(_load(rule_file))[0]["description"] == "changed"
+        assert _counts() == (hits, writes + 1)
+
+    def test_corrupted_snapshot_is_ignored(self, rule_file):
+        expected = _load(rule_file)
+        with open(sidecar_path(str(rule_file), SNAPSHOT_SUFFIX), "r+b") as f:
+            f.seek(-16, os.SEEK_END)
+            f.write(b"\xff" * 16)
+
+        assert _load(rule_file) == expected
+
+    def test_removed_with_rule_file(self, rule_file):
+        _load(rule_file)
+        rule_file.unlink()
+        file_events.publish(DELETED, str(rule_file))
+
+        assert not os.path.exists(sidecar_path(str(rule_file), SNAPSHOT_SUFFIX))
+
+
+def _fail_on(path, real_open):
+    def fake_open(file, *args, **kwargs):
+        if os.path.abspath(str(file)) == os.path.abspath(path):
+            raise AssertionError("rule file should not be read")
+        return real_open(file, *args, **kwargs)
+    return fake_open
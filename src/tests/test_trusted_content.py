@@ -0,0 +1,106 @@
+import json
+
+from src.models import CustomEncoder, Field
+from src.utils import FieldLoader
+from src.utils.field_cache import field_cache
+from src.utils.file_events import DELETED, file_events
+from src.utils.json_loader import save_json
+from src.utils.trusted_content import TRUST_SUFFIX, sidecar_path, trust_store
+
+
+def _fields(keys):
+    return [Field(key=key, description="", multi_type=["object"], item_multi_type=[],
+                  children=[Field(key="child", description="", multi_type=["string"], item_multi_type=[])])
+            for key in keys]
+
+
+def _spy(monkeypatch):
+    calls = {"trusted": 0, "validated": 0}
+    trusted, validated = Field.from_dict_trusted.__func__, Field.from_dict.__func__
+
+    def from_dict_trusted(cls, data):
+        calls["trusted"] += 1
+        return trusted(cls, data)
+
+    def from_dict(cls, data):
+        calls["validated"] += 1
+        return validated(cls, data)
+
+    monkeypatch.setattr(Field, "from_dict_trusted", classmethod(from_dict_trusted))
+    monkeypatch.setattr(Field, "from_dict", classmethod(from_dict))
+    return calls
+
+
+class TestTrustedContent:
+
+    def test_saved_file_loads_without_validation(self, tmp_path, monkeypatch):
+        rule_file = tmp_path / "rules.json"
+        fields = _fields(["a", "b"])
+        save_json(str(rule_file), fields)
+        assert (tmp_path / ".cache" / ("rules.json" + TRUST_SUFFIX)).exists()
+
+        calls = _spy(monkeypatch)
+        field_cache.invalidate(str(rule_file))
+        loaded = FieldLoader(str(tmp_path), "rules.json").load_fields_shared()
+
+        assert calls["validated"] == 0 and calls["trusted"] > 0
+        assert loaded == fields
+        assert json.dumps(loaded, cls=CustomEncoder) == json.dumps(fields, cls=CustomEncoder)
+
+    def test_trusted_construction_matches_validation(self):
+        data = json.loads(json.dumps(_fields(["a"]), cls=CustomEncoder))
+        data[0]["regex"] = "^x"
+        data[0]["condition"] = {"logical": "or", "conditions": [{"key": "b", "operator": "in", "value": [1, "x"]}]}
+
+        trusted, validated = Field.from_dict_trusted(data[0]), Field.from_dict(data[0])
+
+        assert trusted == validated
+        assert trusted.condition.conditions[0] == validated.condition.conditions[0]
+        assert trusted.model_dump() == validated.model_dump()
+
+    def test_trusted_fields_are_mutable(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        save_json(str(rule_file), _fields(["a"]))
+        field_cache.invalidate(str(rule_file))
+
+        fields = FieldLoader(str(tmp_path), "rules.json").load_fields_to_dict()
+        fields[0].description = "changed"
+        fields[0].children.append(Field(key="new", description="", multi_type=[], item_multi_type=[]))
+
+        assert fields[0].model_dump()["description"] == "changed"
+        assert [c.key for c in fields[0].children] == ["child", "new"]
+
+    def test_external_edit_is_validated(self, tmp_path, monkeypatch):
+        rule_file = tmp_path / "rules.json"
+        save_json(str(rule_file), _fields(["a"]))
+        data = json.loads(rule_file.read_text())
+        data[0]["description"] = "edited by hand"
+        rule_file.write_text(json.dumps(data, indent=4))
+
+        calls = _spy(monkeypatch)
+        field_cache.invalidate(str(rule_file))
+        loaded = FieldLoader(str(tmp_path), "rules.json").load_fields_shared()
+
+        assert calls["trusted"] == 0 and calls["validated"] > 0
+        assert loaded[0].description == "edited by hand"
+
+    def test_digest_survives_restart(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        save_json(str(rule_file), _fields(["a"]))
+        digest = trust_store._digests.pop(str(rule_file))
+
+        assert trust_store.is_trusted(str(rule_file), digest)
+
+    def test_raw_data_and_delete_forget_digest(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        save_json(str(rule_file), _fields(["a"]))
+        save_json(str(rule_file), [{"key": "a", "description": "", "multi_type": [], "item_multi_type": []}])
+        assert not (tmp_path / ".cache" / ("rules.json" + TRUST_SUFFIX)).exists()
+
+        save_json(str(rule_file), _fields(["a"]))
+        rule_file.unlink()
+        file_events.publish(DELETED, str(rule_file))
+
+        assert str(rule_file) not in trust_store._digests
+        assert not (tmp_path / ".cache" / ("rules.json" + TRUST_SUFFIX)).exists()
+        assert sidecar_path(str(rule_file), TRUST_SUFFIX) == str(tmp_path / ".cache" / ("rules.json" + TRUST_SUFFIX))
@@ -0,0 +1,49 @@
+import pytest
+
+from src.models import Condition, Field
+from src.models.condition import ConditionField
+from src.utils.validator import ValidationPlan
+
+
+def _field(key, multi_type, **kwargs):
+    return Field(key=key, description="", multi_type=multi_type, item_multi_type=kwargs.pop("item_multi_type", []),
+                 **kwargs)
+
+
+RULES = [
+    _field("enabled", ["bool"], required=True),
+    _field("nodes", ["list"], item_multi_type=["object"],
+           condition=Condition(logical="and", conditions=[ConditionField("enabled", "eq", "True")]),
+           children=[
+               _field("ip", ["ip"], required=True),
+               _field("name", ["string"], regex="^n[0-9]+$", regex_enabled=True),
+           ]),
+    _field("broken", ["string"], regex="*/16$", regex_enabled=True),
+]
+
+
+class TestValidationPlan:
+
+    @pytest.mark.parametrize(
+        "document, expected",
+        [
+            ({"enabled": False}, []),
+            ({}, [("enabled", "required")]),
+            ({"enabled": True}, [("nodes", "required")]),
+            ({"enabled": "yes"}, [("enabled", "type")]),
+            ({"enabled": True, "nodes": [{"ip": "10.0.0.1/16", "name": "n1"}, {"name": "x"}, 3]},
+             [("nodes[2]", "item_type"), ("nodes[1].ip", "required"), ("nodes[1].name", "regex")]),
+        ]
+    )
+    def test_validate(self, document, expected):
+        plan = ValidationPlan(RULES)
+
+        violations = plan.validate(document)
+
+        assert [(v.path, v.code) for v in violations] == expected
+
+    def test_invalid_regex_is_reported_once(self):
+        plan = ValidationPlan(RULES)
+
+        assert [(e.path, e.code) for e in plan.errors] == [("broken", "invalid_regex")]
+        assert plan.validate({"enabled": False, "broken": "anything"}) == []
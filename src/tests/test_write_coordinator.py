@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+from src.models import Field
+from src.utils import FieldLoader
+from src.utils.write_coordinator import FileMissing, PreconditionFailed, WriteCoordinator
+
+
+def _field(key):
+    return Field(key=key, description="", multi_type=["string"], item_multi_type=[])
+
+
+def _add(key):
+    def mutation(index):
+        index.add(index.ROOT, _field(key))
+        return True
+    return mutation
+
+
+@pytest.fixture
+def rule_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{"key": "a", "description": "", "multi_type": ["string"], "item_multi_type": []}]))
+    return path
+
+
+def _keys(path):
+    return [field.key for field in FieldLoader(str(path.parent), path.name).load_fields_shared()]
+
+
+class TestWriteCoordinator:
+
+    def test_concurrent_mutations_are_grouped(self, rule_file):
+        coordinator = WriteCoordinator(window=0.01)
+
+        async def main():
+            return await asyncio.gather(*(coordinator.submit(str(rule_file), _add(key)) for key in "bcd"))
+
+        etags = asyncio.run(main())
+
+        assert _keys(rule_file) == ["a", "b", "c", "d"]
+        assert len(set(etags)) == 1
+        assert coordinator.stats()["commits"] == 1
+
+    def test_failed_mutation_is_rolled_back(self, rule_file):
+        coordinator = WriteCoordinator(window=0.01)
+
+        def half_done(index):
+            index.add(index.ROOT, _field("partial"))
+            raise ValueError("boom")
+
+        async def main():
+            return await asyncio.gather(
+                coordinator.submit(str(rule_file), _add("b")),
+                coordinator.submit(str(rule_file), half_done),
+                coordinator.submit(str(rule_file), _add("c")),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(main())
+
+        assert isinstance(results[1], ValueError)
+        assert _keys(rule_file) == ["a", "b", "c"]
+
+    def test_stale_if_match_is_rejected(self, rule_file):
+        coordinator = WriteCoordinator(window=0)
+
+        async def main():
+            etag = await coordinator.submit(str(rule_file), lambda index: False)
+            await coordinator.submit(str(rule_file), _add("b"), if_match=etag)
+            await coordinator.submit(str(rule_file), _add("c"), if_match=etag)
+
+        with pytest.raises(PreconditionFailed):
+            asyncio.run(main())
+        assert _keys(rule_file) == ["a", "b"]
+
+    def test_weak_if_match_is_rejected(self, rule_file):
+        coordinator = WriteCoordinator(window=0)
+
+        async def main():
+            etag = await coordinator.submit(str(rule_file), lambda index: False)
+            await coordinator.submit(str(rule_file), _add("b"), if_match=f"W/{etag}")
+
+        with pytest.raises(PreconditionFailed):
+            asyncio.run(main())
+        assert _keys(rule_file) == ["a"]
+
+    def test_deleted_file_is_not_recreated(self, rule_file):
+        coordinator = WriteCoordinator(window=0)
+        rule_file.unlink()
+
+        with pytest.raises(FileMissing):
+            asyncio.run(coordinator.submit(str(rule_file), _add("b")))
+        assert not rule_file.exists()
+
+    def test_unused_locks_are_released(self, rule_file):
+        coordinator = WriteCoordinator(window=0)
+
+        asyncio.run(coordinator.submit(str(rule_file), _add("b")))
+        with coordinator.lock(rule_file) as lock:
+            assert coordinator.lock(rule_file) is lock
+        del lock
+
+        assert len(coordinator._locks) == 0
@@ -0,0 +1,132 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """有上限的 thread pool
+
+    同時最多 max_workers 個工作在執行、max_pending 個工作在等待，
+    超過時呼叫端在 event loop 上等待（不佔用任何 thread）。
+    每個 executor 各自統計排隊數量與等待時間，方便依負載調整大小。
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"storage-{name}")
+        # asyncio.Semaphore 綁定 event loop，每個 loop 各自建立一個
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.backpressure_waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_workers + self.max_pending)
+        return semaphore
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """在這個 executor 執行阻塞的函式，contextvars 會一併傳入 worker thread"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(loop)
+        if semaphore.locked():
+            with self._lock:
+                self.backpressure_waits += 1
+        async with semaphore:
+            task = self._task(fn, args, kwargs)
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._executor, context.run, task)
+
+    def submit(self, fn: Callable[..., object], *args, **kwargs) -> bool:
+        """送出不等待結果的背景工作（可在 worker thread 中呼叫）；等待中的工作已達上限時不送出，回傳是否送出"""
+        with self._lock:
+            if self.queued >= self.max_pending:
+                return False
+        task = self._task(fn, args, kwargs)
+        self._executor.submit(contextvars.copy_context().run, task)
+        return True
+
+    def _task(self, fn: Callable[..., T], args, kwargs) -> Callable[[], T]:
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+
+        def task():
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    if not ok:
+                        self.failed += 1
+
+        return task
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self.completed + self.running
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "backpressure_waits": self.backpressure_waits,
+                "wait_avg_ms": round(self.wait_total / started * 1000, 3) if started else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+_CPUS = os.cpu_count() or 1
+
+# read：stat、列目錄、讀取原始檔案等短工作
+read_executor = BoundedExecutor("read", _env_int("STORAGE_READ_WORKERS", 8),
+                                _env_int("STORAGE_READ_PENDING", 256))
+# parse：解析規則檔、編譯驗證計畫等 CPU 較重的工作
+parse_executor = BoundedExecutor("parse", _env_int("STORAGE_PARSE_WORKERS", min(4, _CPUS)),
+                                 _env_int("STORAGE_PARSE_PENDING", 64))
+# write：寫回規則檔、建立檔案
+write_executor = BoundedExecutor("write", _env_int("STORAGE_WRITE_WORKERS", 4),
+                                 _env_int("STORAGE_WRITE_PENDING", 64))
+# bulk：刪除整個資料夾等可能很慢的工作，不影響其他 executor
+bulk_executor = BoundedExecutor("bulk", _env_int("STORAGE_BULK_WORKERS", 1),
+                                _env_int("STORAGE_BULK_PENDING", 16))
+
+EXECUTORS: Dict[str, BoundedExecutor] = {
+    executor.name: executor for executor in (read_executor, parse_executor, write_executor, bulk_executor)
+}
+
+
+def executor_stats() -> Dict[str, dict]:
+    return {name: executor.stats() for name, executor in EXECUTORS.items()}
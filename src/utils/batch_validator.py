@@ -0,0 +1,251 @@
+import asyncio
+import codecs
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from src.utils.fields_service import FieldLoader
+
+# 每個送進 process pool 的工作最多包含幾份文件，用來攤平跨 process 傳遞的成本
+CHUNK_SIZE = 64
+# 單一份文件（NDJSON 的一行或 JSON array 的一個元素）最多可暫存的字元數，超過時視為格式錯誤
+MAX_DOCUMENT_SIZE = int(os.environ.get("BATCH_MAX_DOCUMENT_SIZE", 1024 * 1024))
+# 錯誤位置之後只剩下未完成的數字、true / false / null 或 \u 跳脫時，可能只是文件被切在兩段資料之間
+_PARTIAL_TOKEN = re.compile(r"\s*[^\s,:\[\]{}\"]{0,9}")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def pool_size() -> int:
+    return os.cpu_count() or 1
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """取得共用的 process pool，大小等於主機的 CPU 數"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=pool_size(), mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def validate_chunk(filepath, filename, chunk: List[Tuple[int, Any]]) -> List[dict]:
+    """在 worker process 中執行
+
+    每個 worker 都透過 FieldLoader 載入同一份規則檔，驗證計畫依檔案版本快取在 worker 內，
+    因此只有第一批文件或規則檔改變時才需要重新解析。
+    """
+    plan = FieldLoader(filepath, filename).load_validation_plan()
+    results = []
+    for index, document in chunk:
+        if not isinstance(document, dict):
+            results.append({"index": index, "error": "document must be a JSON object"})
+            continue
+        violations = plan.validate(document)
+        results.append({
+            "index": index,
+            "valid": not violations,
+            "violations": [v.model_dump() for v in violations],
+        })
+    return results
+
+
+class DocumentStreamParser:
+    """把分段收到的 request body 解析成一份份文件
+
+    支援 NDJSON（一行一份）以及 JSON array 兩種格式，依第一個非空白字元判斷。
+    每次 feed 只回傳已經完整的文件，不會保留整個輸入。
+    JSON array 中出現格式錯誤（或單一文件超過 max_document_size）時立即回報錯誤，
+    之後的資料直接丟棄，不會等到 finish 才發現。
+    NDJSON 的一行超過 max_document_size 時回報同樣的錯誤，略過這一行剩下的部分後繼續解析下一行。
+    回傳值為 (index, document, error)。
+    """
+
+    NDJSON = "ndjson"
+    ARRAY = "array"
+
+    def __init__(self, max_document_size: int = MAX_DOCUMENT_SIZE):
+        self.max_document_size = max_document_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._mode: Optional[str] = None
+        self._closed = False
+        # NDJSON 中正在略過超過上限的一行
+        self._skipping = False
+        self._index = 0
+
+    def feed(self, data: bytes) -> List[Tuple[int, Any, Optional[str]]]:
+        if self._closed:
+            return []
+        self._buffer += self._decoder.decode(data)
+        return self._parse(final=False)
+
+    def finish(self) -> List[Tuple[int, Any, Optional[str]]]:
+        if self._closed:
+            return []
+        self._buffer += self._decoder.decode(b"", final=True)
+        return self._parse(final=True)
+
+    def _parse(self, final: bool):
+        if self._mode is None:
+            stripped = self._buffer.lstrip()
+            if not stripped:
+                return []
+            self._mode = self.ARRAY if stripped[0] == "[" else self.NDJSON
+            self._buffer = stripped[1:] if self._mode == self.ARRAY else stripped
+        if self._mode == self.ARRAY:
+            return self._parse_array(final)
+        return self._parse_lines(final)
+
+    def _next(self, document=None, error: Optional[str] = None):
+        item = (self._index, document, error)
+        self._index += 1
+        return item
+
+    def _too_large(self):
+        return self._next(error=f"Invalid JSON: document exceeds {self.max_document_size} characters")
+
+    def _parse_lines(self, final: bool):
+        items = []
+        if self._skipping:
+            end = self._buffer.find("\n")
+            if end < 0:
+                self._buffer = ""
+                return items
+            self._buffer = self._buffer[end + 1:]
+            self._skipping = False
+        *lines, self._buffer = self._buffer.split("\n")
+        if final:
+            lines.append(self._buffer)
+            self._buffer = ""
+        for line in lines:
+            if not line.strip():
+                continue
+            if len(line) > self.max_document_size:
+                items.append(self._too_large())
+                continue
+            try:
+                items.append(self._next(json.loads(line)))
+            except json.JSONDecodeError as e:
+                items.append(self._next(error=f"Invalid JSON: {e}"))
+        # 還沒收到換行的一行已經超過上限時不再暫存
+        if len(self._buffer) > self.max_document_size:
+            items.append(self._too_large())
+            self._buffer = ""
+            self._skipping = True
+        return items
+
+    def _parse_array(self, final: bool):
+        items = []
+        buffer = self._buffer
+        pos = 0
+        while not self._closed:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self._closed = True
+                pos += 1
+                break
+            try:
+                document, end = self._json.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if final or not self._truncated(buffer, e):
+                    items.append(self._next(error=f"Invalid JSON: {e}"))
+                    self._closed = True
+                break
+            # 數字等純量可能被切在兩段資料之間，後面還沒有分隔字元時先等待
+            if not final and (end >= len(buffer) or (
+                    isinstance(document, (int, float)) and buffer[end] in ".eE")):
+                break
+            items.append(self._next(document))
+            pos = end
+
+        if not self._closed and len(buffer) - pos > self.max_document_size:
+            items.append(self._too_large())
+            self._closed = True
+        self._buffer = buffer[pos:] if not self._closed else ""
+        if final and not self._closed:
+            items.append(self._next(error="Invalid JSON: array is not closed"))
+            self._closed = True
+        return items
+
+    @staticmethod
+    def _truncated(buffer: str, error: json.JSONDecodeError) -> bool:
+        """錯誤是否可能只是資料還沒收完（未結束的字串，或錯誤之後只剩下半個 token）"""
+        return error.msg.startswith("Unterminated string") or _PARTIAL_TOKEN.fullmatch(buffer, error.pos) is not None
+
+
+def _encode(result: dict) -> bytes:
+    return (json.dumps(result) + "\n").encode("utf-8")
+
+
+async def stream_validation_results(filepath, filename, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """一邊讀取 request body 一邊把文件分批送進 process pool，完成一批就輸出一批結果"""
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    workers = pool_size()
+    parser = DocumentStreamParser()
+    pending = {}
+    chunk: List[Tuple[int, Any]] = []
+
+    def submit():
+        nonlocal chunk
+        future = loop.run_in_executor(pool, validate_chunk, filepath, filename, chunk)
+        pending[future] = [index for index, _ in chunk]
+        chunk = []
+
+    def collect(futures) -> bytes:
+        output = []
+        for future in futures:
+            indexes = pending.pop(future)
+            try:
+                output.extend(_encode(result) for result in future.result())
+            except Exception as e:
+                output.extend(_encode({"index": index, "error": str(e)}) for index in indexes)
+        return b"".join(output)
+
+    def accept(items) -> bytes:
+        errors = []
+        for index, document, error in items:
+            if error is not None:
+                errors.append(_encode({"index": index, "error": error}))
+                continue
+            chunk.append((index, document))
+            if len(chunk) >= CHUNK_SIZE:
+                submit()
+        return b"".join(errors)
+
+    async for data in body:
+        output = accept(parser.feed(data))
+        # worker 有空時不等湊滿一批，先送出去降低延遲
+        if chunk and len(pending) < workers:
+            submit()
+        # 限制同時處理中的批次數量，避免把整個輸入讀進記憶體
+        if len(pending) >= workers * 2:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            done = [future for future in pending if future.done()]
+        output += collect(done)
+        if output:
+            yield output
+
+    output = accept(parser.finish())
+    if output:
+        yield output
+    if chunk:
+        submit()
+    while pending:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        yield collect(done)
@@ -0,0 +1,196 @@
+import contextlib
+import os
+from typing import Callable, Dict, List, Optional
+
+from src.models import BulkOperation
+from src.utils.dependency_graph import DependencyGraph, field_paths
+from src.utils.field_index import FieldIndex
+from src.utils.file_version import etag_matches_strong, make_etag
+from src.utils.json_loader import load_cache_entry, save_json_many
+from src.utils.metrics import metrics
+from src.utils.regex_registry import find_regex_error
+from src.utils.write_coordinator import write_coordinator
+
+
+class BulkError(ValueError):
+    """操作失敗，reason 為 invalid / forbidden / not_found / conflict / referenced / precondition_failed 其中之一"""
+
+    def __init__(self, op_index: Optional[int], reason: str, message: str, dependents: Optional[List[dict]] = None):
+        super().__init__(message)
+        self.op_index = op_index
+        self.reason = reason
+        # reason 為 referenced 時，會失去引用目標的 condition
+        self.dependents = dependents
+
+
+class _File:
+    __slots__ = ("abs_path", "entry", "index", "changed")
+
+    def __init__(self, abs_path: str, entry, index: FieldIndex):
+        self.abs_path = abs_path
+        self.entry = entry
+        self.index = index
+        self.changed = False
+
+
+def apply_bulk(root, operations: List[BulkOperation], resolve: Callable[[str], str],
+               if_match: Optional[Dict[str, str]] = None, graph: Optional[DependencyGraph] = None) -> dict:
+    """依序套用跨檔案的 create / update / delete，全部成功才寫入（在 write executor 中執行）
+
+    resolve 把相對路徑轉成絕對路徑，不允許時拋出 BulkError（op_index 為 None）；
+    同一個檔案的不同寫法（例如開頭的 /）視為同一個檔案，回傳結果中的檔案為相對 root 的正規路徑。
+    依絕對路徑排序取得所有檔案的 write lock（與 write coordinator 同一組，不會死鎖），
+    每個檔案只載入一次，全部操作成功後以 save_json_many 一起寫入，每個檔案寫一次。
+    condition 引用檢查使用請求開始前的 graph，同一請求中其他操作造成的引用變化不列入。
+
+    回傳 {"committed", "files": {相對路徑: 新 ETag}, "results": [...]}，失敗時另有 "error"。
+    """
+    results = [_result(n, operation) for n, operation in enumerate(operations)]
+    root = os.path.abspath(root)
+    expected = {_relative(root, os.path.join(root, path.strip("/"))): etag for path, etag in (if_match or {}).items()}
+    try:
+        # 每個操作對應的檔案（正規化後的相對路徑）與其絕對路徑
+        targets = []
+        abs_paths: Dict[str, str] = {}
+        for n, operation in enumerate(operations):
+            abs_path = _resolve(resolve, n, operation.path)
+            rel_path = _relative(root, abs_path)
+            targets.append(rel_path)
+            abs_paths[rel_path] = abs_path
+        with contextlib.ExitStack() as stack:
+            with metrics.span("lock_wait"):
+                for abs_path in sorted(abs_paths.values()):
+                    stack.enter_context(write_coordinator.lock(abs_path))
+            files = _load(targets, abs_paths, expected)
+            with metrics.span("mutation"):
+                for n, operation in enumerate(operations):
+                    _apply(n, operation, targets[n], files[targets[n]], graph, results[n])
+            etags = _write(files)
+    except BulkError as e:
+        for result in results[e.op_index + 1 if e.op_index is not None else 0:]:
+            result["status"] = "skipped"
+        if e.op_index is not None:
+            results[e.op_index].update(status="failed", reason=e.reason, detail=str(e))
+            if e.dependents:
+                results[e.op_index]["dependents"] = e.dependents
+        return {
+            "committed": False,
+            "error": {"index": e.op_index, "reason": e.reason, "detail": str(e)},
+            "files": {},
+            "results": results,
+        }
+    return {"committed": True, "files": etags, "results": results}
+
+
+def _result(n: int, operation: BulkOperation) -> dict:
+    return {
+        "index": n,
+        "op": operation.op,
+        "path": operation.path,
+        "field_path": FieldIndex.join(operation.parent_path, operation.target_key),
+        "status": "pending",
+    }
+
+
+def _relative(root: str, abs_path: str) -> str:
+    return os.path.relpath(os.path.abspath(abs_path), root).replace(os.sep, "/")
+
+
+def _resolve(resolve: Callable[[str], str], n: int, path: str) -> str:
+    try:
+        return resolve(path)
+    except BulkError as e:
+        raise BulkError(n, e.reason, str(e))
+
+
+def _load(targets: List[str], abs_paths: Dict[str, str], if_match: Dict[str, str]) -> Dict[str, _File]:
+    files = {}
+    for n, rel_path in enumerate(targets):
+        if rel_path in files:
+            continue
+        abs_path = abs_paths[rel_path]
+        entry = load_cache_entry(os.path.dirname(abs_path), os.path.basename(abs_path))
+        if entry is None:
+            raise BulkError(n, "not_found", f"file '{rel_path}' not found")
+        expected = if_match.get(rel_path)
+        current = make_etag(entry.signature)
+        if expected is not None and not etag_matches_strong(expected, current):
+            raise BulkError(n, "precondition_failed",
+                            f"file '{rel_path}' has been modified (current version {current})")
+        files[rel_path] = _File(abs_path, entry, FieldIndex(entry.fresh_fields()))
+    return files
+
+
+def _apply(n: int, operation: BulkOperation, rel_path: str, file: _File, graph: Optional[DependencyGraph],
+           result: dict) -> None:
+    index = file.index
+    parent_path = operation.parent_path
+    if index.siblings(parent_path) is None:
+        raise BulkError(n, "not_found", f"parent field '{parent_path}' not found")
+
+    broken = []
+    if operation.op == "create":
+        _check_regexes(n, operation)
+        if index.has_child(parent_path, operation.field.key):
+            raise BulkError(n, "conflict", f"{operation.field.key} already exists")
+        index.add(parent_path, operation.field.clone())
+        changed = True
+
+    elif operation.op == "update":
+        _check_regexes(n, operation)
+        old = index.child(parent_path, operation.field.key)
+        if old is None:
+            raise BulkError(n, "not_found", f"field '{operation.field.key}' not found")
+        field_path = index.join(parent_path, old.key)
+        removed = set(field_paths(old, field_path)) - set(field_paths(operation.field, field_path))
+        broken = _check_references(n, operation, rel_path, graph, removed)
+        index.replace(parent_path, operation.field.clone())
+        changed = True
+
+    else:
+        existing = index.child(parent_path, operation.key)
+        # 與 DELETE /api/field 相同，欄位不存在時不算失敗
+        changed = existing is not None
+        if changed:
+            broken = _check_references(n, operation, rel_path, graph,
+                                       field_paths(existing, index.join(parent_path, operation.key)))
+            index.remove(parent_path, operation.key)
+
+    file.changed = file.changed or changed
+    result.update(status="ok", changed=changed)
+    if broken:
+        result["dangling"] = broken
+
+
+def _check_regexes(n: int, operation: BulkOperation) -> None:
+    error = find_regex_error(operation.field, operation.parent_path)
+    if error:
+        raise BulkError(n, "invalid", error)
+
+
+def _check_references(n: int, operation: BulkOperation, rel_path: str, graph: Optional[DependencyGraph],
+                      removed) -> List[dict]:
+    """移除欄位會讓其他 condition 失去目標時失敗，force 時改為回傳失去目標的引用"""
+    if graph is None:
+        return []
+    broken = graph.breaking_dependents(rel_path, removed)
+    if broken and not operation.force:
+        raise BulkError(n, "referenced",
+                        f"field is referenced by {len(broken)} condition(s), use force=true to remove it anyway",
+                        broken)
+    return broken
+
+
+def _write(files: Dict[str, _File]) -> Dict[str, str]:
+    changed = [(rel_path, file) for rel_path, file in files.items() if file.changed]
+    writes = []
+    for _, file in changed:
+        # 上一個版本已有展開結果時，只重建被修改到的第一層欄位
+        views = file.entry.derived.get("views")
+        derived = {"views": views.updated(file.index.fields, file.index.touched)} if views is not None else None
+        writes.append((file.abs_path, file.index.fields, file.index, derived))
+    signatures = save_json_many(writes)
+    etags = {rel_path: make_etag(file.entry.signature) for rel_path, file in files.items()}
+    for (rel_path, _), signature in zip(changed, signatures):
+        etags[rel_path] = make_etag(signature) if signature is not None else None
+    return etags
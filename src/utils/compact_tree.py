@@ -0,0 +1,274 @@
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.models import Condition, Field, FieldTypes
+from src.models.condition import ConditionField
+
+_EMPTY: Tuple = ()
+_REQUIRED = 1
+_REGEX_ENABLED = 2
+
+# (logical, ((key, operator, value), ...))
+CompactCondition = Tuple[Optional[str], Tuple[Tuple[str, str, object], ...]]
+
+
+class NotCompactable(ValueError):
+    """原始資料不符合快速路徑的格式，需改用 Field.from_dict 完整驗證"""
+
+
+def count_nodes(items) -> int:
+    """計算 Field 樹（Field 或 dict 皆可）的節點總數"""
+    count = 0
+    stack = [items]
+    while stack:
+        level = stack.pop()
+        for item in level:
+            count += 1
+            children = item.get("children") if isinstance(item, dict) else getattr(item, "children", None)
+            if children:
+                stack.append(children)
+    return count
+
+
+class CompactTree:
+    """唯讀、省記憶體的 Field 樹
+
+    每個節點只是一組平行陣列中的一個 index，依層展開（BFS），
+    因此每個節點的子節點位於連續區間 [child_start, child_end)。
+    key / description / 型別 tuple 都會 intern，空的 list 與 condition 共用同一個物件，
+    condition 只存在有設定的節點上。只有在 API 邊界才轉回 pydantic Field。
+    """
+
+    __slots__ = ("keys", "descriptions", "types", "item_types", "regexes", "flags", "conditions",
+                 "parents", "child_start", "child_end", "root_end")
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.descriptions: List[str] = []
+        self.types: List[Tuple[str, ...]] = []
+        self.item_types: List[Tuple[str, ...]] = []
+        self.regexes: List[Optional[str]] = []
+        self.flags = bytearray()
+        self.conditions: Dict[int, CompactCondition] = {}
+        self.parents = array("i")
+        self.child_start = array("i")
+        self.child_end = array("i")
+        self.root_end = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    # ===== 建立 =====
+    @classmethod
+    def from_fields(cls, fields: List[Field]) -> "CompactTree":
+        return cls._build(fields, _read_field)
+
+    @classmethod
+    def from_json(cls, data) -> "CompactTree":
+        """直接由 json.load 的結果建立，不經過 pydantic；格式不符時拋出 NotCompactable"""
+        if not isinstance(data, list):
+            raise NotCompactable("root must be a list")
+        return cls._build(data, _read_dict)
+
+    @classmethod
+    def _build(cls, items, read) -> "CompactTree":
+        tree = cls()
+        interned: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        pending: List = []
+
+        def append(item, parent: int):
+            key, description, types, item_types, regex, flags, condition, children = read(item)
+            node = len(tree.keys)
+            tree.keys.append(sys.intern(key))
+            tree.descriptions.append(sys.intern(description))
+            tree.types.append(interned.setdefault(types, types))
+            tree.item_types.append(interned.setdefault(item_types, item_types))
+            tree.regexes.append(regex)
+            tree.flags.append(flags)
+            if condition is not None:
+                tree.conditions[node] = condition
+            tree.parents.append(parent)
+            tree.child_start.append(0)
+            tree.child_end.append(0)
+            pending.append(children)
+
+        for item in items:
+            append(item, -1)
+        tree.root_end = len(tree.keys)
+
+        node = 0
+        while node < len(tree.keys):
+            children = pending[node]
+            pending[node] = None
+            start = len(tree.keys)
+            for child in children:
+                append(child, node)
+            tree.child_start[node] = start
+            tree.child_end[node] = len(tree.keys)
+            node += 1
+        return tree
+
+    # ===== 快照 =====
+    def to_snapshot(self) -> tuple:
+        """轉成只含內建型別的 tuple，可直接以 marshal 寫出"""
+        return (self.keys, self.descriptions, self.types, self.item_types, self.regexes, bytes(self.flags),
+                self.conditions, self.parents.tobytes(), self.child_start.tobytes(), self.child_end.tobytes(),
+                self.root_end)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: tuple) -> "CompactTree":
+        tree = cls()
+        (tree.keys, tree.descriptions, tree.types, tree.item_types, tree.regexes, flags,
+         tree.conditions, parents, child_start, child_end, tree.root_end) = snapshot
+        tree.flags = bytearray(flags)
+        tree.parents.frombytes(parents)
+        tree.child_start.frombytes(child_start)
+        tree.child_end.frombytes(child_end)
+        return tree
+
+    # ===== 查詢 =====
+    def children(self, node: int) -> range:
+        if node < 0:
+            return range(0, self.root_end)
+        return range(self.child_start[node], self.child_end[node])
+
+    def find(self, path: str) -> int:
+        """依 dotted path 找節點，同層 key 重複時取第一個，找不到回傳 -1"""
+        node = -1
+        for part in path.split("."):
+            keys = self.keys
+            for candidate in self.children(node):
+                if keys[candidate] == part:
+                    node = candidate
+                    break
+            else:
+                return -1
+        return node
+
+    def iter_paths(self) -> Iterator[Tuple[int, str]]:
+        """以前序走訪（與 Field 樹遞迴順序相同）回傳 (節點, dotted path)"""
+        stack = [(node, "") for node in reversed(self.children(-1))]
+        while stack:
+            node, prefix = stack.pop()
+            path = prefix + self.keys[node]
+            yield node, path
+            stack.extend((child, path + ".") for child in reversed(self.children(node)))
+
+    def describe(self, node: int) -> dict:
+        """節點本身的內容（不含 children），key 順序與寫入檔案時相同"""
+        condition = self.conditions.get(node)
+        if condition is not None:
+            logical, items = condition
+            condition = {"logical": logical,
+                         "conditions": [{"key": key, "operator": operator, "value": value}
+                                        for key, operator, value in items]}
+        flags = self.flags[node]
+        return {
+            "key": self.keys[node],
+            "description": self.descriptions[node],
+            "multi_type": list(self.types[node]),
+            "item_multi_type": list(self.item_types[node]),
+            "regex": self.regexes[node],
+            "regex_enabled": bool(flags & _REGEX_ENABLED),
+            "required": bool(flags & _REQUIRED),
+            "condition": condition,
+        }
+
+    def get_all_fields(self) -> List[dict]:
+        """與 FieldLoader.get_all_fields 相同的輸出"""
+        result = []
+        for node, path in self.iter_paths():
+            types = self.types[node]
+            result.append({
+                "key": path,
+                "multi_type": list(types),
+                "item_multi_type": list(self.item_types[node])
+                if (FieldTypes.List in types or FieldTypes.Object in types) else None,
+            })
+        return result
+
+    # ===== 轉回 Field =====
+    def to_fields(self) -> List[Field]:
+        """建立一棵全新的 Field 樹，可自由修改"""
+        return [self.to_field(node) for node in self.children(-1)]
+
+    def to_field(self, node: int) -> Field:
+        """把一個節點（含子樹）轉成 Field；資料已驗證過，使用 model_construct 不再重新驗證"""
+        condition = self.conditions.get(node)
+        if condition is not None:
+            logical, items = condition
+            condition = Condition.model_construct(
+                logical=logical,
+                conditions=[ConditionField.model_construct(key=key, operator=operator, value=value)
+                            for key, operator, value in items],
+            )
+        flags = self.flags[node]
+        return Field.model_construct(
+            key=self.keys[node],
+            description=self.descriptions[node],
+            field_type=None,
+            multi_type=list(self.types[node]),
+            item_type=None,
+            item_multi_type=list(self.item_types[node]),
+            regex=self.regexes[node],
+            regex_enabled=bool(flags & _REGEX_ENABLED),
+            required=bool(flags & _REQUIRED),
+            condition=condition,
+            children=[self.to_field(child) for child in self.children(node)],
+        )
+
+
+def _read_field(field: Field):
+    condition = None
+    if field.condition is not None:
+        condition = (field.condition.logical,
+                     tuple((c.key, c.operator, c.value) for c in field.condition.conditions))
+    flags = (_REQUIRED if field.required else 0) | (_REGEX_ENABLED if field.regex_enabled else 0)
+    return (field.key, field.description, tuple(field.multi_type), tuple(field.item_multi_type),
+            field.regex, flags, condition, field.children)
+
+
+def _string_tuple(value) -> Tuple[str, ...]:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise NotCompactable("expected a list of strings")
+    return tuple(value) if value else _EMPTY
+
+
+def _read_dict(item):
+    """與 Field.from_dict 相同的預設值；只接受型別完全正確的資料，其他情況交給 pydantic"""
+    if not isinstance(item, dict):
+        raise NotCompactable("field must be an object")
+    key = item.get("key")
+    description = item.get("description", "")
+    regex = item.get("regex")
+    regex_enabled = item.get("regex_enabled", False)
+    required = item.get("required", False)
+    children = item.get("children", [])
+    if not isinstance(key, str) or not isinstance(description, str) or not isinstance(children, list):
+        raise NotCompactable("invalid key / description / children")
+    if regex is not None and not isinstance(regex, str):
+        raise NotCompactable("invalid regex")
+    if not isinstance(regex_enabled, bool) or not isinstance(required, bool):
+        raise NotCompactable("invalid flags")
+
+    condition = None
+    condition_data = item.get("condition")
+    if condition_data:
+        if not isinstance(condition_data, dict):
+            raise NotCompactable("invalid condition")
+        logical = condition_data.get("logical")
+        conditions = condition_data.get("conditions", [])
+        if (logical is not None and not isinstance(logical, str)) or not isinstance(conditions, list):
+            raise NotCompactable("invalid condition")
+        parsed = []
+        for c in conditions:
+            if not isinstance(c, dict) or not isinstance(c.get("key"), str) \
+                    or not isinstance(c.get("operator"), str) or "value" not in c:
+                raise NotCompactable("invalid condition field")
+            parsed.append((sys.intern(c["key"]), sys.intern(c["operator"]), c["value"]))
+        condition = (logical, tuple(parsed))
+
+    flags = (_REQUIRED if required else 0) | (_REGEX_ENABLED if regex_enabled else 0)
+    return (key, description, _string_tuple(item.get("multi_type", [])),
+            _string_tuple(item.get("item_multi_type", [])), regex, flags, condition, children)
@@ -0,0 +1,186 @@
+import ipaddress
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.models import Condition, FieldTypes, LogicTypes, OperationTypes
+from src.utils.field_index import FieldIndex
+
+MISSING = object()
+INVALID = object()
+
+
+# ===== 型別轉換：條件值在編譯時轉換一次，文件值在解析 key 時轉換一次 =====
+def _to_number(value):
+    if isinstance(value, bool):
+        return INVALID
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return INVALID
+
+
+def _to_ip(value):
+    if not isinstance(value, str):
+        return INVALID
+    try:
+        return int(ipaddress.ip_interface(value).ip)
+    except ValueError:
+        return INVALID
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered == "true":
+            return True
+        if lowered == "false":
+            return False
+    return INVALID
+
+
+def _to_text(value):
+    return value if isinstance(value, str) else str(value)
+
+
+COERCERS: Dict[str, Callable[[Any], Any]] = {
+    FieldTypes.Number: _to_number,
+    FieldTypes.IP: _to_ip,
+    FieldTypes.Bool: _to_bool,
+    FieldTypes.String: _to_text,
+    FieldTypes.Email: _to_text,
+}
+
+
+def _is_empty(value) -> bool:
+    return value is MISSING or value is None or value == "" or value == [] or value == {}
+
+
+class KeyResolver:
+    """每份文件只解析一次所有被條件引用的 key
+
+    key 依 dotted path 的深度排序（父路徑一定先於子路徑），
+    每個 key 都從父路徑已解析的值往下取一層，不會重複從根目錄走訪。
+    """
+
+    def __init__(self, slots: List[Tuple[int, str, Optional[Callable]]]):
+        # (parent slot, 這一層的 key, 轉換函式)；parent 為 -1 代表文件根目錄
+        self._slots = slots
+
+    def __len__(self):
+        return len(self._slots)
+
+    def resolve(self, document) -> Tuple[list, list]:
+        """回傳 (原始值, 轉換後的值)，兩者都以 slot 編號存取"""
+        raw = [MISSING] * len(self._slots)
+        coerced = [MISSING] * len(self._slots)
+        for slot, (parent, part, coerce) in enumerate(self._slots):
+            container = document if parent < 0 else raw[parent]
+            if not isinstance(container, dict):
+                continue
+            value = container.get(part, MISSING)
+            raw[slot] = value
+            if coerce is not None and value is not MISSING and value is not None:
+                coerced[slot] = coerce(value)
+        return raw, coerced
+
+
+class ConditionCompiler:
+    """把 Condition 編譯成 (raw, coerced) -> bool
+
+    使用方式分兩階段：先 register 所有條件，呼叫 build_resolver 決定解析順序，再 compile。
+    被引用欄位的型別由規則檔決定（multi_type 中第一個可比較的型別），
+    條件值在編譯時就轉成該型別，and / or 皆會短路求值。
+    """
+
+    def __init__(self, index: FieldIndex):
+        self._index = index
+        self._coercers: Dict[str, Optional[Callable]] = {}
+        self._slot_of: Optional[Dict[str, int]] = None
+        self.errors: List[Tuple[str, str]] = []
+
+    def field_type(self, key: str) -> str:
+        field = self._index.get(key)
+        if field is not None:
+            for type_name in field.multi_type:
+                if type_name in COERCERS:
+                    return type_name
+        return FieldTypes.String
+
+    def register(self, condition: Optional[Condition]) -> None:
+        if condition is None:
+            return
+        for c in condition.conditions:
+            coerce = None
+            if c.operator not in (OperationTypes.EMPTY, OperationTypes.NOT_EMPTY):
+                coerce = COERCERS[self.field_type(c.key)]
+            if coerce is not None or c.key not in self._coercers:
+                self._coercers[c.key] = coerce
+
+    def build_resolver(self) -> KeyResolver:
+        """依拓撲順序（父路徑優先）建立 KeyResolver，並補上中間層路徑"""
+        paths = set(self._coercers)
+        for key in self._coercers:
+            parts = key.split('.')
+            paths.update('.'.join(parts[:depth]) for depth in range(1, len(parts)))
+
+        ordered = sorted(paths, key=lambda path: (path.count('.'), path))
+        self._slot_of = {path: n for n, path in enumerate(ordered)}
+
+        slots = []
+        for path in ordered:
+            parent, _, part = path.rpartition('.')
+            slots.append((self._slot_of[parent] if parent else -1, part, self._coercers.get(path)))
+        return KeyResolver(slots)
+
+    def compile(self, condition: Optional[Condition]):
+        """沒有任何條件時回傳 None"""
+        if condition is None or not condition.conditions:
+            return None
+        checks = [self._compile_field(c.key, c.operator, c.value) for c in condition.conditions]
+
+        if condition.logical == LogicTypes.OR:
+            def evaluate(raw, coerced):
+                for check in checks:
+                    if check(raw, coerced):
+                        return True
+                return False
+        else:
+            def evaluate(raw, coerced):
+                for check in checks:
+                    if not check(raw, coerced):
+                        return False
+                return True
+        return evaluate
+
+    def _compile_field(self, key: str, operator: str, expected):
+        slot = self._slot_of[key]
+        if operator == OperationTypes.EMPTY:
+            return lambda raw, coerced: _is_empty(raw[slot])
+        if operator == OperationTypes.NOT_EMPTY:
+            return lambda raw, coerced: not _is_empty(raw[slot])
+
+        field_type = self.field_type(key)
+        target = COERCERS[field_type](expected)
+        if target is INVALID:
+            self.errors.append((key, f"value '{expected}' is not a valid {field_type}"))
+
+        if operator in (OperationTypes.EQ, OperationTypes.NE):
+            negate = operator == OperationTypes.NE
+            if target is INVALID:
+                return lambda raw, coerced: negate
+            return lambda raw, coerced: (coerced[slot] == target) != negate
+        if operator in (OperationTypes.GT, OperationTypes.LT):
+            if target is INVALID:
+                return lambda raw, coerced: False
+            greater = operator == OperationTypes.GT
+
+            def compare(raw, coerced):
+                actual = coerced[slot]
+                if actual is MISSING or actual is INVALID:
+                    return False
+                return actual > target if greater else actual < target
+            return compare
+        raise ValueError(f"unknown operator '{operator}'")
@@ -1,19 +1,31 @@
 from src.models import FieldTypes, LogicTypes, OperationTypes
 
-# 定義可用的類型選項
-FIELD_TYPES = FieldTypes.get_all()
+# 各表格在第一次使用時才建立（module __getattr__），import 時不做任何計算
+_TABLES = {
+    # 定義可用的類型選項
+    "FIELD_TYPES": FieldTypes.get_all,
+    # 定義可用的項目類型選項（用於 list 的 item_type）
+    "ITEM_TYPES": FieldTypes.get_item_types,
+    # 定義邏輯運算符類型
+    "LOGIC_TYPES": LogicTypes.get_all,
+    # 定義條件運算符類型
+    "OPERATOR_TYPES": OperationTypes.get_all,
+    # 定義每個字段類型對應的運算符
+    "FIELD_OPERATORS": OperationTypes.get_type_operations,
+}
 
-# 定義可用的項目類型選項（用於 list 的 item_type）
-ITEM_TYPES = FieldTypes.get_item_types()
 
-# 定義邏輯運算符類型
-LOGIC_TYPES = LogicTypes.get_all()
+def __getattr__(name):
+    factory = _TABLES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = factory()
+    return value
 
-# 定義條件運算符類型
-OPERATOR_TYPES = OperationTypes.get_all()
 
-# 定義每個字段類型對應的運算符
-FIELD_OPERATORS = OperationTypes.get_type_operations()
+def __dir__():
+    return sorted(set(globals()) | set(_TABLES))
+
 
 # FIELD_OPERATORS = {
 #     'bool': [OperationTypes.EQ, OperationTypes.NE],
@@ -0,0 +1,188 @@
+import posixpath
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+from src.utils.field_cache import NodeInfo
+from src.utils.incremental_index import IncrementalFileIndex, get_index
+
+Node = Tuple[str, str]  # (檔案相對路徑, 欄位 dotted path)
+
+
+class FileDependencies:
+    __slots__ = ("paths", "references")
+
+    def __init__(self):
+        # 檔案中定義的所有欄位路徑
+        self.paths: Set[str] = set()
+        # (擁有 condition 的欄位, 被引用的 key)
+        self.references: List[Tuple[str, str]] = []
+
+
+def field_paths(field, path: str) -> List[str]:
+    """欄位本身與所有子欄位的 dotted path"""
+    paths = []
+    stack = [(field, path)]
+    while stack:
+        current, current_path = stack.pop()
+        paths.append(current_path)
+        stack.extend((child, f"{current_path}.{child.key}") for child in current.children)
+    return paths
+
+
+class DependencyGraph(IncrementalFileIndex):
+    """所有規則檔中 condition 引用關係的圖
+
+    condition 的 key 先在同一個檔案中解析，找不到時再找同一資料夾（同一個 gen）的其他檔案。
+    以 (資料夾, key) 建立反向索引，查詢某個欄位被誰引用時不需要走訪任何檔案。
+    檔案的增量更新見 IncrementalFileIndex。
+    """
+
+    def __init__(self, root):
+        super().__init__(root, threading.RLock())
+        self._files: Dict[str, FileDependencies] = {}
+        self._definers: Dict[Tuple[str, str], Set[str]] = {}
+        self._referrers: Dict[Tuple[str, str], Set[Node]] = {}
+
+    # ===== 維護 =====
+    def _index_file(self, rel_path: str, nodes: List[NodeInfo]) -> None:
+        deps = FileDependencies()
+        for node in nodes:
+            deps.paths.add(node.path)
+            deps.references.extend((node.path, key) for key in node.references)
+
+        folder = posixpath.dirname(rel_path)
+        self._files[rel_path] = deps
+        for path in deps.paths:
+            self._definers.setdefault((folder, path), set()).add(rel_path)
+        for source, key in deps.references:
+            self._referrers.setdefault((folder, key), set()).add((rel_path, source))
+
+    def _drop_file(self, rel_path: str) -> None:
+        deps = self._files.pop(rel_path, None)
+        if deps is None:
+            return
+        folder = posixpath.dirname(rel_path)
+        for path in deps.paths:
+            self._discard(self._definers, (folder, path), rel_path)
+        for source, key in deps.references:
+            self._discard(self._referrers, (folder, key), (rel_path, source))
+
+    @staticmethod
+    def _discard(mapping: dict, key, value) -> None:
+        values = mapping.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del mapping[key]
+
+    # ===== 查詢（呼叫前先 sync）=====
+    def resolve(self, rel_path: str, key: str) -> List[str]:
+        """condition 在 rel_path 中引用 key 時實際指向的檔案"""
+        with self._lock:
+            deps = self._files.get(rel_path)
+            if deps is not None and key in deps.paths:
+                return [rel_path]
+            definers = self._definers.get((posixpath.dirname(rel_path), key), ())
+            return sorted(definer for definer in definers if definer != rel_path)
+
+    def dependents(self, rel_path: str, path: str) -> List[dict]:
+        """引用 rel_path 中 path 欄位的所有 condition"""
+        with self._lock:
+            referrers = self._referrers.get((posixpath.dirname(rel_path), path), ())
+            return [{"file": file, "path": source, "key": path}
+                    for file, source in sorted(referrers) if rel_path in self.resolve(file, path)]
+
+    def breaking_dependents(self, rel_path: str, removed_paths: Iterable[str]) -> List[dict]:
+        """移除 rel_path 中這些欄位後會失去引用目標的 condition（一起被移除的 condition 不算）"""
+        removed = set(removed_paths)
+        broken = []
+        with self._lock:
+            folder = posixpath.dirname(rel_path)
+            for path in sorted(removed):
+                for file, source in sorted(self._referrers.get((folder, path), ())):
+                    if file == rel_path and source in removed:
+                        continue
+                    if self.resolve(file, path) == [rel_path]:
+                        broken.append({"file": file, "path": source, "key": path})
+        return broken
+
+    def dangling(self, folder: str = "") -> List[dict]:
+        """找不到引用目標的 condition"""
+        with self._lock:
+            return [{"file": rel_path, "path": source, "key": key}
+                    for rel_path in sorted(self._in_folder(folder))
+                    for source, key in self._files[rel_path].references
+                    if not self.resolve(rel_path, key)]
+
+    def cycles(self, folder: str = "") -> List[List[dict]]:
+        """condition 互相引用形成的循環（Tarjan 強連通元件）"""
+        with self._lock:
+            edges: Dict[Node, List[Node]] = {}
+            for rel_path in self._in_folder(folder):
+                for source, key in self._files[rel_path].references:
+                    targets = [(target, key) for target in self.resolve(rel_path, key)]
+                    edges.setdefault((rel_path, source), []).extend(targets)
+        return [[{"file": file, "path": path} for file, path in component]
+                for component in _strongly_connected(edges)
+                if len(component) > 1 or component[0] in edges.get(component[0], ())]
+
+    def _in_folder(self, folder: str) -> List[str]:
+        folder = folder.strip("/")
+        if not folder or folder == ".":
+            return list(self._files)
+        prefix = folder + "/"
+        return [rel_path for rel_path in self._files if rel_path.startswith(prefix)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "references": sum(len(deps.references) for deps in self._files.values()),
+                "reindexed": self.reindexed,
+            }
+
+
+def _strongly_connected(edges: Dict[Node, List[Node]]) -> List[List[Node]]:
+    index_of: Dict[Node, int] = {}
+    lowlink: Dict[Node, int] = {}
+    on_stack: Set[Node] = set()
+    stack: List[Node] = []
+    components = []
+
+    for start in sorted(edges):
+        if start in index_of:
+            continue
+        work = [(start, iter(edges.get(start, ())))]
+        index_of[start] = lowlink[start] = len(index_of)
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, targets = work[-1]
+            for target in targets:
+                if target not in index_of:
+                    index_of[target] = lowlink[target] = len(index_of)
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append((target, iter(edges.get(target, ()))))
+                    break
+                if target in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+    return components
+
+
+def get_dependency_graph(root) -> DependencyGraph:
+    return get_index(DependencyGraph, root)
@@ -0,0 +1,263 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.models.fileType import FileType, PrecheckFile
+from src.utils.compact_tree import count_nodes
+from src.utils.field_cache import field_cache
+from src.utils.file_events import file_events
+from src.utils.file_version import FileSignature
+
+
+class TreeNode:
+    __slots__ = ("name", "is_dir", "size", "mtime_ns", "inode", "children", "dir_mtime_ns",
+                 "field_count", "count_signature")
+
+    def __init__(self, name: str, is_dir: bool, st: Optional[os.stat_result] = None):
+        self.name = name
+        self.is_dir = is_dir
+        self.size = st.st_size if st is not None else 0
+        self.mtime_ns = st.st_mtime_ns if st is not None else 0
+        self.inode = st.st_ino if st is not None else 0
+        # 只有資料夾使用：子項目與掃描當時的資料夾 mtime（None 代表需要重新掃描）
+        self.children: Dict[str, "TreeNode"] = {}
+        self.dir_mtime_ns: Optional[int] = None
+        # 只有檔案使用：欄位數量，依檔案版本快取
+        self.field_count: Optional[int] = None
+        self.count_signature: Optional[FileSignature] = None
+
+    @property
+    def signature(self) -> FileSignature:
+        return FileSignature(self.mtime_ns, self.size, self.inode)
+
+    def sorted_children(self) -> List["TreeNode"]:
+        # 資料夾優先，再依名稱排序（與 /api/files 相同）
+        return sorted(self.children.values(), key=lambda node: (not node.is_dir, node.name.lower()))
+
+
+# walk 中尚未計算的欄位數，釋放 lock 後才讀取檔案
+_PENDING = object()
+
+
+def _normalize(rel_path: str) -> str:
+    parts = [part for part in rel_path.replace(os.sep, "/").split("/") if part and part != "."]
+    return "/".join(parts)
+
+
+class DirectoryTreeIndex:
+    """整個 assets 目錄的樹狀索引
+
+    以 os.scandir 建立，每個資料夾記錄掃描時的 mtime；
+    讀取時只重新 stat 會用到的資料夾，mtime 改變才重新掃描那一層。
+    透過 API 的寫入、建立、刪除會經由 file_events 標記對應資料夾需要重掃。
+    以 . 開頭的項目（寫入中的暫存檔、快取資料夾）不列出。
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._lock = threading.RLock()
+        self._tree = TreeNode("", True)
+        self.scans = 0
+        file_events.subscribe(self._on_file_event, weak=True)
+
+    # ===== 查詢 =====
+    def list_dir(self, rel_path: str = "") -> Optional[List[PrecheckFile]]:
+        """列出單一層（取代 DirectoryScanner.list_items），資料夾不存在時回傳 None"""
+        with self._lock:
+            node = self._find(rel_path)
+            if node is None or not node.is_dir:
+                return None
+            return [PrecheckFile(child.name, FileType.FOLDER if child.is_dir else FileType.FILE)
+                    for child in node.sorted_children()]
+
+    def walk(self, rel_path: str = "", depth: Optional[int] = None, offset: int = 0,
+             limit: Optional[int] = None, metadata: bool = True) -> Optional[dict]:
+        """以前序展開子樹（depth 為展開的層數，None 代表全部），分頁後回傳
+
+        尚未計算欄位數的檔案在釋放 lock 後才讀取，不會擋住其他查詢。
+        """
+        counts: List[Tuple[dict, TreeNode, str]] = []
+        with self._lock:
+            node = self._find(rel_path)
+            if node is None or not node.is_dir:
+                return None
+            prefix = _normalize(rel_path)
+            entries: List[Tuple[TreeNode, str, int]] = []
+            stack = [(child, prefix, 1) for child in reversed(node.sorted_children())]
+            while stack:
+                child, parent, level = stack.pop()
+                child_path = f"{parent}/{child.name}" if parent else child.name
+                entries.append((child, child_path, level))
+                if child.is_dir and (depth is None or level < depth):
+                    self._refresh(child, os.path.join(self.root, child_path))
+                    stack.extend((grandchild, child_path, level + 1)
+                                 for grandchild in reversed(child.sorted_children()))
+
+            page = entries[offset:offset + limit if limit is not None else None]
+            items = []
+            for child, child_path, level in page:
+                item = self._describe(child, child_path, level, metadata)
+                if item.get("field_count", 0) is _PENDING:
+                    counts.append((item, child, os.path.join(self.root, child_path)))
+                items.append(item)
+
+        for item, child, abs_path in counts:
+            item["field_count"] = self._count_fields(child, abs_path)
+        return {"total": len(entries), "offset": offset, "limit": limit, "items": items}
+
+    def files(self, suffix: str = ".json", rescan: bool = False) -> Dict[str, FileSignature]:
+        """整棵樹中所有（符合副檔名的）檔案的相對路徑與版本
+
+        只重新 stat 資料夾，版本為掃描資料夾時的結果；透過 API 的寫入會經由 file_events 讓資料夾重掃。
+        直接在磁碟上覆寫檔案內容不會改變資料夾 mtime，需要時以 rescan=True 重新 stat 每個檔案（不讀取內容）。
+        """
+        with self._lock:
+            result = {}
+            if not self._refresh(self._tree, self.root):
+                return result
+            stack = [(self._tree, "")]
+            while stack:
+                node, prefix = stack.pop()
+                for child in node.children.values():
+                    child_path = f"{prefix}/{child.name}" if prefix else child.name
+                    if child.is_dir:
+                        if self._refresh(child, os.path.join(self.root, child_path)):
+                            stack.append((child, child_path))
+                    elif child.name.lower().endswith(suffix):
+                        if rescan:
+                            try:
+                                st = os.stat(os.path.join(self.root, child_path))
+                            except OSError:
+                                continue
+                            child.size, child.mtime_ns, child.inode = st.st_size, st.st_mtime_ns, st.st_ino
+                        result[child_path] = child.signature
+            return result
+
+    def _describe(self, node: TreeNode, rel_path: str, level: int, metadata: bool) -> dict:
+        item = {
+            "name": node.name,
+            "path": rel_path,
+            "file_type": FileType.FOLDER.value if node.is_dir else FileType.FILE.value,
+            "depth": level,
+        }
+        if metadata and not node.is_dir:
+            abs_path = os.path.join(self.root, rel_path)
+            # 直接覆寫檔案不會改變資料夾 mtime，回傳前重新 stat 這個檔案
+            try:
+                st = os.stat(abs_path)
+                node.size, node.mtime_ns, node.inode = st.st_size, st.st_mtime_ns, st.st_ino
+            except OSError:
+                pass
+            item["size"] = node.size
+            item["mtime"] = node.mtime_ns / 1e9
+            item["field_count"] = self._cached_field_count(node, abs_path)
+        return item
+
+    def _cached_field_count(self, node: TreeNode, abs_path: str):
+        """已知的欄位數；需要讀取檔案才能得知時回傳 _PENDING（持有 lock 時呼叫）"""
+        if not node.name.lower().endswith(".json"):
+            return None
+        signature = node.signature
+        if node.count_signature != signature:
+            # 已在快取中的檔案直接計算（不影響快取的命中統計與 LRU 順序）
+            entry = field_cache.peek(abs_path, signature)
+            if entry is None:
+                return _PENDING
+            node.field_count = entry.node_count()
+            node.count_signature = signature
+        return node.field_count
+
+    def _count_fields(self, node: TreeNode, abs_path: str) -> Optional[int]:
+        """不持有 lock：只做一次輕量的 JSON 解析，完成後依當時的檔案版本記錄結果"""
+        with self._lock:
+            signature = node.signature
+        try:
+            with open(abs_path, "rb") as f:
+                fields = json.loads(f.read())
+        except (OSError, ValueError):
+            fields = None
+        count = count_nodes(fields) if isinstance(fields, list) else None
+        with self._lock:
+            if node.signature == signature:
+                node.field_count = count
+                node.count_signature = signature
+        return count
+
+    # ===== 維護 =====
+    def _find(self, rel_path: str) -> Optional[TreeNode]:
+        """沿路徑往下找節點，經過的資料夾都會先確認是否需要重新掃描"""
+        node = self._tree
+        current = self.root
+        if not self._refresh(node, current):
+            return None
+        for part in filter(None, _normalize(rel_path).split("/")):
+            node = node.children.get(part)
+            if node is None:
+                return None
+            current = os.path.join(current, part)
+            if node.is_dir and not self._refresh(node, current):
+                return None
+        return node
+
+    def _refresh(self, node: TreeNode, abs_path: str) -> bool:
+        try:
+            mtime_ns = os.stat(abs_path).st_mtime_ns
+        except OSError:
+            node.children = {}
+            node.dir_mtime_ns = None
+            return False
+        if node.dir_mtime_ns == mtime_ns:
+            return True
+
+        children = {}
+        with os.scandir(abs_path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                    if not is_dir and not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                previous = node.children.get(entry.name)
+                if previous is not None and previous.is_dir == is_dir and (
+                        is_dir or previous.signature == (st.st_mtime_ns, st.st_size, st.st_ino)):
+                    # 子資料夾是否改變由它自己的 mtime 判斷；檔案沒變則保留已算好的欄位數
+                    children[entry.name] = previous
+                else:
+                    children[entry.name] = TreeNode(entry.name, is_dir, st)
+        node.children = children
+        node.dir_mtime_ns = mtime_ns
+        self.scans += 1
+        return True
+
+    def _on_file_event(self, event: str, path: str) -> None:
+        if path != self.root and not path.startswith(os.path.join(self.root, "")):
+            return
+        parent = os.path.relpath(os.path.dirname(path), self.root)
+        with self._lock:
+            node = self._tree
+            if parent != ".":
+                for part in parent.split(os.sep):
+                    node = node.children.get(part)
+                    if node is None:
+                        return
+            # 同一 mtime 時間粒度內的修改也要重新掃描
+            node.dir_mtime_ns = None
+
+
+_indexes: Dict[str, DirectoryTreeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_tree_index(root) -> DirectoryTreeIndex:
+    """每個根目錄共用一個索引"""
+    key = os.path.abspath(root)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = DirectoryTreeIndex(key)
+        return index
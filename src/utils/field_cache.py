@@ -0,0 +1,218 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.models import Field
+from src.utils.compact_tree import CompactTree, count_nodes
+from src.utils.file_version import FileSignature, stat_signature
+
+# 快取容量以原始 JSON 檔案大小計算
+DEFAULT_MAX_BYTES = int(os.environ.get("FIELD_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# 節點數達到這個數量的檔案改以 CompactTree 保存
+COMPACT_MIN_NODES = int(os.environ.get("FIELD_CACHE_COMPACT_MIN_NODES", 5000))
+
+
+class NodeInfo(NamedTuple):
+    """索引需要的單一欄位資訊，compact 與 Field 樹都能直接產生"""
+    path: str
+    key: str
+    description: str
+    types: Tuple[str, ...]
+    # condition 中引用的 key
+    references: Tuple[str, ...]
+
+
+class CacheEntry:
+    """一個檔案版本的快取
+
+    小檔案直接保存 pydantic Field 樹；大檔案只保存 CompactTree，
+    唯讀查詢直接使用 compact，需要 Field 時才轉換。
+    """
+
+    __slots__ = ("_fields", "compact", "signature", "cost", "derived")
+
+    def __init__(self, fields: Optional[List[Field]], signature: FileSignature, derived: Optional[dict] = None,
+                 compact: Optional[CompactTree] = None):
+        self._fields = fields
+        self.compact = compact
+        self.signature = signature
+        self.cost = signature.size
+        # 由同一版本 Field 樹推導出的資料（索引等），隨版本一起失效
+        self.derived = dict(derived) if derived else {}
+
+    @property
+    def fields(self) -> List[Field]:
+        """共用的 Field 樹，不可修改
+
+        compact 項目每次存取都建立一棵暫時的 Field 樹、不保留在快取中，
+        需要重複使用時請直接使用 compact 或 iter_nodes。
+        """
+        if self._fields is None:
+            return self.compact.to_fields()
+        return self._fields
+
+    def fresh_fields(self) -> List[Field]:
+        """可自由修改的 Field 樹"""
+        if self._fields is None:
+            return self.compact.to_fields()
+        return [field.clone() for field in self._fields]
+
+    def node_count(self) -> int:
+        if self.compact is not None:
+            return len(self.compact)
+        return count_nodes(self._fields)
+
+    def iter_nodes(self) -> Iterator[NodeInfo]:
+        """以前序走訪所有欄位，compact 項目不會建立 Field 樹"""
+        compact = self.compact
+        if compact is not None:
+            for node, path in compact.iter_paths():
+                condition = compact.conditions.get(node)
+                yield NodeInfo(path, compact.keys[node], compact.descriptions[node], compact.types[node],
+                               tuple(key for key, _, _ in condition[1]) if condition is not None else ())
+            return
+        stack = [(field, "") for field in reversed(self._fields)]
+        while stack:
+            field, prefix = stack.pop()
+            path = prefix + field.key
+            condition = field.condition
+            yield NodeInfo(path, field.key, field.description, tuple(field.multi_type),
+                           tuple(c.key for c in condition.conditions) if condition is not None else ())
+            stack.extend((child, path + ".") for child in reversed(field.children))
+
+    def derive(self, name: str, builder: Callable[[List[Field]], object]):
+        """取得（必要時建立）這個版本的推導資料
+
+        compact 項目只保留不引用 Field 物件的結果（holds_fields = False），其他每次重新建立。
+        """
+        value = self.derived.get(name)
+        if value is None:
+            value = builder(self.fields)
+            if self.compact is None or not getattr(value, "holds_fields", True):
+                self.derived[name] = value
+        return value
+
+    def derive_transient(self, name: str, builder: Callable[[List[Field]], object]):
+        """與 derive 相同，但 compact 項目只用暫時的 Field 樹建立，不會保留 pydantic 物件"""
+        value = self.derived.get(name)
+        if value is None:
+            value = builder(self._fields if self._fields is not None else self.compact.to_fields())
+            self.derived[name] = value
+        return value
+
+
+class FieldCache:
+    """解析後 Field 樹的程序層級快取
+
+    以檔案絕對路徑為 key，並用 (mtime_ns, size, inode) 驗證是否過期；
+    總容量超過 max_bytes 時淘汰最久未使用的項目。
+    快取中的 Field 樹為共用物件，呼叫端需要修改時請使用 CacheEntry.fresh_fields()。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, compact_min_nodes: int = COMPACT_MIN_NODES):
+        self.max_bytes = max_bytes
+        self.compact_min_nodes = compact_min_nodes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_path, signature: Optional[FileSignature] = None) -> Optional[List[Field]]:
+        """取得仍然有效的快取，過期或不存在時回傳 None"""
+        entry = self.get_entry(file_path, signature)
+        return entry.fields if entry is not None else None
+
+    def get_entry(self, file_path, signature: Optional[FileSignature] = None) -> Optional[CacheEntry]:
+        key = os.path.abspath(file_path)
+        if signature is None:
+            signature = stat_signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def contains(self, file_path, signature: FileSignature) -> bool:
+        """是否已有這個版本的快取（不影響命中統計與 LRU 順序）"""
+        return self.peek(file_path, signature) is not None
+
+    def peek(self, file_path, signature: FileSignature) -> Optional[CacheEntry]:
+        """與 get_entry 相同，但不影響命中統計與 LRU 順序，過期的項目也不移除"""
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(file_path))
+            return entry if entry is not None and entry.signature == signature else None
+
+    def put(self, file_path, fields: Optional[List[Field]], signature: Optional[FileSignature] = None,
+            derived: Optional[dict] = None, compact: Optional[CompactTree] = None) -> Optional[CacheEntry]:
+        """放入（或覆蓋）一個檔案的 Field 樹，回傳對應的項目（超過容量時不會被保留）
+
+        大型的 Field 樹會轉成 CompactTree 保存，原本的 Field 樹與引用它的推導資料不保留。
+        """
+        key = os.path.abspath(file_path)
+        if signature is None:
+            signature = stat_signature(key)
+        if signature is None:
+            self.invalidate(key)
+            return None
+        if compact is None and count_nodes(fields) >= self.compact_min_nodes:
+            compact = CompactTree.from_fields(fields)
+        if compact is not None:
+            # 只保留不引用 Field 物件的推導資料（holds_fields = False）
+            fields = None
+            derived = {name: value for name, value in (derived or {}).items()
+                       if not getattr(value, "holds_fields", True)}
+        with self._lock:
+            self._remove(key)
+            entry = CacheEntry(fields, signature, derived, compact)
+            if entry.cost > self.max_bytes:
+                return entry
+            self._entries[key] = entry
+            self._bytes += entry.cost
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.cost
+                self.evictions += 1
+            return entry
+
+    def invalidate(self, file_path) -> None:
+        with self._lock:
+            self._remove(os.path.abspath(file_path))
+
+    def invalidate_folder(self, folder_path) -> None:
+        prefix = os.path.join(os.path.abspath(folder_path), "")
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "compact_entries": sum(1 for entry in self._entries.values() if entry.compact is not None),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.cost
+
+
+field_cache = FieldCache()
@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional, Set
+
+from src.models import Field
+
+
+class FieldIndex:
+    """Field 樹的路徑索引
+
+    維護 dotted path → Field 以及每個 parent 底下 key → Field 兩份對照表，
+    讓查找欄位與同層 key 重複檢查都不需要逐層掃描。
+    透過 add / replace / remove 修改時，樹與索引會一起更新，
+    並在 touched 記錄被修改到的第一層欄位 key，供推導資料只重建這些部分。
+    """
+
+    ROOT = ""
+
+    def __init__(self, fields: List[Field]):
+        self.fields = fields
+        self._nodes: Dict[str, Field] = {}
+        self._children: Dict[str, Dict[str, Field]] = {}
+        self.touched: Set[str] = set()
+        self._index_level(self.ROOT, fields)
+
+    @staticmethod
+    def join(parent_path: str, key: str) -> str:
+        return f"{parent_path}.{key}" if parent_path else key
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, path: str):
+        return path in self._nodes
+
+    def get(self, path: str) -> Optional[Field]:
+        """根據 dotted path 取得欄位"""
+        return self._nodes.get(path)
+
+    def child(self, parent_path: str, key: str) -> Optional[Field]:
+        return self._children.get(parent_path, {}).get(key)
+
+    def has_child(self, parent_path: str, key: str) -> bool:
+        """檢查 key 是否已存在於 parent 這一層"""
+        return key in self._children.get(parent_path, ())
+
+    def siblings(self, parent_path: str) -> Optional[List[Field]]:
+        """回傳 parent 底下實際存放子欄位的 list，parent 不存在時回傳 None"""
+        if parent_path == self.ROOT:
+            return self.fields
+        parent = self._nodes.get(parent_path)
+        return parent.children if parent is not None else None
+
+    def add(self, parent_path: str, field: Field) -> None:
+        """在 parent 底下新增欄位"""
+        siblings = self._require_siblings(parent_path)
+        siblings.append(field)
+        self._touch(parent_path, field.key)
+        self._index_field(parent_path, field)
+
+    def replace(self, parent_path: str, field: Field) -> Optional[Field]:
+        """以 key 找到同層欄位並整個覆蓋，回傳被取代的欄位"""
+        siblings = self._require_siblings(parent_path)
+        old = self.child(parent_path, field.key)
+        if old is None:
+            return None
+
+        for i, sibling in enumerate(siblings):
+            if sibling is old:
+                siblings[i] = field
+                break
+        self._touch(parent_path, field.key)
+
+        del self._children[parent_path][field.key]
+        self._unindex(self.join(parent_path, field.key))
+        self._index_field(parent_path, field)
+        return old
+
+    def remove(self, parent_path: str, key: str) -> Optional[Field]:
+        """移除同層中所有 key 相同的欄位，回傳被移除的欄位"""
+        siblings = self._require_siblings(parent_path)
+        old = self.child(parent_path, key)
+        if old is None:
+            return None
+
+        siblings[:] = [f for f in siblings if f.key != key]
+        self._touch(parent_path, key)
+        del self._children[parent_path][key]
+        self._unindex(self.join(parent_path, key))
+        return old
+
+    def _touch(self, parent_path: str, key: str) -> None:
+        self.touched.add(parent_path.split(".", 1)[0] if parent_path else key)
+
+    def _require_siblings(self, parent_path: str) -> List[Field]:
+        siblings = self.siblings(parent_path)
+        if siblings is None:
+            raise KeyError(parent_path)
+        return siblings
+
+    def _index_level(self, parent_path: str, fields: List[Field]) -> None:
+        for field in fields:
+            self._index_field(parent_path, field)
+
+    def _index_field(self, parent_path: str, field: Field) -> None:
+        level = self._children.setdefault(parent_path, {})
+        # 同層有重複 key 時以第一個為準（與 find_field_by_path 相同）
+        if field.key in level:
+            return
+        level[field.key] = field
+        path = self.join(parent_path, field.key)
+        self._nodes[path] = field
+        if field.children:
+            self._index_level(path, field.children)
+
+    def _unindex(self, path: str) -> None:
+        self._nodes.pop(path, None)
+        for key in self._children.pop(path, {}):
+            self._unindex(self.join(path, key))
@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import json
+from typing import Optional, Sequence, Tuple
+
+from src.models import Field
+from src.utils.compact_tree import CompactTree
+from src.utils.field_cache import CacheEntry
+from src.utils.field_index import FieldIndex
+
+DEFAULT_PAGE_LIMIT = 200
+MAX_PAGE_LIMIT = 5000
+
+_ROOT = object()
+
+
+class InvalidCursor(ValueError):
+    """cursor 格式錯誤"""
+
+
+class StaleCursor(InvalidCursor):
+    """cursor 由檔案較舊的版本產生，offset 可能已經不對"""
+
+    def __init__(self, current_version: str):
+        super().__init__(f"cursor is from an older version of the file (current version {current_version})")
+        self.current_version = current_version
+
+
+def encode_cursor(version: str, parent_path: str, offset: int) -> str:
+    raw = json.dumps([version, parent_path, offset], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[str, str, int]:
+    """回傳 (版本, 父欄位路徑, offset)"""
+    try:
+        version, parent_path, offset = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("malformed cursor") from e
+    if not isinstance(version, str) or not isinstance(parent_path, str) \
+            or type(offset) is not int or offset < 0:
+        raise InvalidCursor("malformed cursor")
+    return version, parent_path, offset
+
+
+def page_etag(version: str, parent_path: str, offset: int, depth: int, limit: int) -> str:
+    """分頁回應的 ETag：檔案 ETag 加上 (父欄位, offset, depth, limit)，不同頁面不會共用同一個 ETag"""
+    raw = json.dumps([parent_path, offset, depth, limit], separators=(",", ":")).encode()
+    return f'{version[:-1]}-{hashlib.blake2b(raw, digest_size=8).hexdigest()}"'
+
+
+class _CompactNodes:
+    def __init__(self, tree: CompactTree):
+        self.tree = tree
+
+    def find(self, path: str):
+        if not path:
+            return -1
+        node = self.tree.find(path)
+        return node if node >= 0 else None
+
+    def children(self, node) -> Sequence:
+        return self.tree.children(node)
+
+    def key(self, node) -> str:
+        return self.tree.keys[node]
+
+    def describe(self, node) -> dict:
+        return self.tree.describe(node)
+
+
+class _FieldNodes:
+    def __init__(self, entry: CacheEntry):
+        self.entry = entry
+
+    def find(self, path: str):
+        if not path:
+            return _ROOT
+        return self.entry.derive("index", FieldIndex).get(path)
+
+    def children(self, node) -> Sequence:
+        return self.entry.fields if node is _ROOT else node.children
+
+    def key(self, node: Field) -> str:
+        return node.key
+
+    def describe(self, node: Field) -> dict:
+        condition = node.condition
+        if condition is not None:
+            condition = {"logical": condition.logical,
+                         "conditions": [{"key": c.key, "operator": c.operator, "value": c.value}
+                                        for c in condition.conditions]}
+        return {
+            "key": node.key,
+            "description": node.description,
+            "multi_type": node.multi_type,
+            "item_multi_type": node.item_multi_type,
+            "regex": node.regex,
+            "regex_enabled": node.regex_enabled,
+            "required": node.required,
+            "condition": condition,
+        }
+
+
+def build_page(entry: CacheEntry, parent_path: str, offset: int, depth: int, limit: int,
+               version: str) -> Optional[dict]:
+    """parent_path 底下第 offset 個起、最多 limit 個子欄位，各自再往下展開 depth - 1 層
+
+    每個欄位帶有 path 與 child_count；有展開的欄位才有 children（同樣最多 limit 個）。
+    children 沒有全部列出時 children_cursor 可用來讀取剩下的部分，
+    next_cursor 則是這一層的下一頁。父欄位不存在時回傳 None。
+    """
+    nodes = _CompactNodes(entry.compact) if entry.compact is not None else _FieldNodes(entry)
+    parent = nodes.find(parent_path)
+    if parent is None:
+        return None
+    siblings = nodes.children(parent)
+    items = [_expand(nodes, child, FieldIndex.join(parent_path, nodes.key(child)), depth - 1, limit, version)
+             for child in siblings[offset:offset + limit]]
+    end = offset + len(items)
+    return {
+        "version": version,
+        "parent": parent_path,
+        "total": len(siblings),
+        "offset": offset,
+        "limit": limit,
+        "depth": depth,
+        "items": items,
+        "next_cursor": encode_cursor(version, parent_path, end) if end < len(siblings) else None,
+    }
+
+
+def _expand(nodes, node, path: str, depth: int, limit: int, version: str) -> dict:
+    item = nodes.describe(node)
+    item["path"] = path
+    children = nodes.children(node)
+    item["child_count"] = len(children)
+    cursor = None
+    if depth > 0:
+        item["children"] = [_expand(nodes, child, f"{path}.{nodes.key(child)}", depth - 1, limit, version)
+                            for child in children[:limit]]
+        if len(children) > limit:
+            cursor = encode_cursor(version, path, limit)
+    elif children:
+        cursor = encode_cursor(version, path, 0)
+    item["children_cursor"] = cursor
+    return item
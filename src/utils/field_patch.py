@@ -0,0 +1,147 @@
+import json
+from typing import Iterable, List, Set
+
+from src.models import Field, PatchOperation
+from src.utils.dependency_graph import field_paths
+from src.utils.field_index import FieldIndex
+from src.utils.regex_registry import find_regex_error
+from src.utils.serializer import dumps_pretty
+
+
+class PatchError(ValueError):
+    """套用 patch 失敗，reason 為 invalid / not_found / conflict / test_failed 其中之一"""
+
+    def __init__(self, op_index: int, reason: str, message: str):
+        super().__init__(message)
+        self.op_index = op_index
+        self.reason = reason
+
+
+def split_path(path: str):
+    """'a.b.c' -> ('a.b', 'c')"""
+    parent, _, key = path.rpartition('.')
+    return parent, key
+
+
+def field_to_dict(field: Field) -> dict:
+    return json.loads(dumps_pretty(field))
+
+
+def apply_patch(index: FieldIndex, operations: List[PatchOperation]) -> Set[str]:
+    """依序把操作套用到 index 對應的 Field 樹上，回傳被移除（含改名、搬走）後不再存在的欄位路徑
+
+    任一操作失敗就拋出 PatchError，呼叫端應直接丟棄這棵樹（不寫回），達到全有或全無。
+    回傳的路徑可交給 DependencyGraph.breaking_dependents 檢查是否仍被其他 condition 引用。
+    """
+    removed = set()
+    for n, operation in enumerate(operations):
+        removed.update(_apply(index, n, operation))
+    # 之後的操作可能又在同一個路徑加回欄位
+    return {path for path in removed if index.get(path) is None}
+
+
+def _build_field(n: int, value, key: str) -> Field:
+    if isinstance(value, Field):
+        value = field_to_dict(value)
+    if not isinstance(value, dict):
+        raise PatchError(n, "invalid", "value must be a field object")
+    value = {**value, "key": value.get("key", key)}
+    try:
+        field = Field.from_dict(value)
+    except (KeyError, TypeError, ValueError) as e:
+        raise PatchError(n, "invalid", f"invalid field: {e}")
+    error = find_regex_error(field)
+    if error:
+        raise PatchError(n, "invalid", error)
+    return field
+
+
+def _require(index: FieldIndex, n: int, path: str) -> Field:
+    field = index.get(path) if path else None
+    if field is None:
+        raise PatchError(n, "not_found", f"field '{path}' not found")
+    return field
+
+
+def _insert(index: FieldIndex, n: int, path: str, field: Field) -> None:
+    parent_path, key = split_path(path)
+    if not key:
+        raise PatchError(n, "invalid", "path must not be empty")
+    if field.key != key:
+        raise PatchError(n, "invalid", f"value key '{field.key}' does not match path '{path}'")
+    if index.siblings(parent_path) is None:
+        raise PatchError(n, "not_found", f"parent field '{parent_path}' not found")
+    if index.has_child(parent_path, key):
+        raise PatchError(n, "conflict", f"field '{path}' already exists")
+    index.add(parent_path, field)
+
+
+def _apply(index: FieldIndex, n: int, operation: PatchOperation) -> Iterable[str]:
+    """套用單一操作，回傳這個操作移除的欄位路徑"""
+    path = operation.path
+    op = operation.op
+
+    if op == "add":
+        _insert(index, n, path, _build_field(n, operation.value, split_path(path)[1]))
+
+    elif op == "remove":
+        current = _require(index, n, path)
+        index.remove(*split_path(path))
+        return field_paths(current, path)
+
+    elif op == "replace":
+        current = _require(index, n, path)
+        replacement = _build_field(n, operation.value, current.key)
+        parent_path, key = split_path(path)
+        if replacement.key == key:
+            index.replace(parent_path, replacement)
+            return set(field_paths(current, path)) - set(field_paths(replacement, path))
+        else:
+            if index.has_child(parent_path, replacement.key):
+                raise PatchError(n, "conflict", f"field '{parent_path}.{replacement.key}' already exists")
+            siblings = index.siblings(parent_path)
+            position = next(i for i, f in enumerate(siblings) if f is current)
+            index.remove(parent_path, key)
+            index.add(parent_path, replacement)
+            siblings.insert(position, siblings.pop())
+            return field_paths(current, path)
+
+    elif op in ("move", "copy"):
+        from_path = operation.from_path
+        if not from_path:
+            raise PatchError(n, "invalid", f"'{op}' requires 'from'")
+        source = _require(index, n, from_path)
+        key = split_path(path)[1]
+
+        if op == "copy":
+            copied = source.clone()
+            copied.key = key
+            _insert(index, n, path, copied)
+            return ()
+
+        if path == from_path:
+            return ()
+        if path.startswith(from_path + "."):
+            raise PatchError(n, "invalid", "cannot move a field into itself")
+        # 先確認目標位置可用，避免移除來源後才失敗
+        parent_path = split_path(path)[0]
+        if index.siblings(parent_path) is None:
+            raise PatchError(n, "not_found", f"parent field '{parent_path}' not found")
+        if index.has_child(parent_path, key):
+            raise PatchError(n, "conflict", f"field '{path}' already exists")
+        moved = field_paths(source, from_path)
+        index.remove(*split_path(from_path))
+        source.key = key
+        _insert(index, n, path, source)
+        return moved
+
+    elif op == "test":
+        current = _require(index, n, path)
+        if not isinstance(operation.value, dict):
+            raise PatchError(n, "invalid", "'test' value must be an object")
+        actual = field_to_dict(current)
+        for name, expected in operation.value.items():
+            if actual.get(name) != expected:
+                raise PatchError(n, "test_failed", f"'{path}' {name} is {actual.get(name)!r}, expected {expected!r}")
+
+    return ()
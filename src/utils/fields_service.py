@@ -1,47 +1,154 @@
-from typing import List
+import os
+import threading
+from collections import Counter
+from itertools import chain
+from typing import Iterable, List, Optional, Set, Tuple
 
 from src.models import Field, FieldTypes, Condition
-from src.utils.data import FIELD_OPERATORS, OPERATOR_TYPES
-from src.utils.json_loader import load_json as JsonLoader
-from src.utils.json_loader import load_json_to_fields as JsonLoaderToFields
+from src.utils.async_storage import parse_executor
+from src.utils import data
+from src.utils.json_loader import (load_cache_entry, load_json as JsonLoader,
+                                   load_json_to_fields as JsonLoaderToFields,
+                                   load_json_to_index_shared as JsonLoaderToSharedIndex)
+from src.utils.field_index import FieldIndex
+from src.utils import json_stream
+from src.utils.field_cache import field_cache
+from src.utils.field_pages import DEFAULT_PAGE_LIMIT, StaleCursor, build_page
+from src.utils.file_version import FileSignature, make_etag, stat_signature
+from src.utils.compact_tree import CompactTree
+from src.utils.metrics import metrics
+from src.utils.validator import ValidationPlan
 
 
 class FieldLoader:
     def __init__(self, filepath, filename):
         self.filepath = filepath
         self.filename = filename
+        # 最近一次載入的 Field 樹所對應的路徑索引
+        self.index: FieldIndex | None = None
 
     def load_fields(self):
         return JsonLoader(self.filepath, self.filename)
 
     def load_fields_to_dict(self):
-        return JsonLoaderToFields(self.filepath, self.filename)
+        fields = JsonLoaderToFields(self.filepath, self.filename)
+        self.index = FieldIndex(fields)
+        return fields
+
+    def load_fields_shared(self):
+        """唯讀用途：直接回傳快取中的 Field 樹，不可修改"""
+        self.index = JsonLoaderToSharedIndex(self.filepath, self.filename)
+        return self.index.fields
+
+    def load_validation_plan(self) -> ValidationPlan:
+        """取得目前檔案版本編譯好的驗證計畫，同一版本只編譯一次"""
+        entry = load_cache_entry(self.filepath, self.filename)
+        if entry is None:
+            return ValidationPlan([])
+        return entry.derive_transient("validation_plan", ValidationPlan)
+
+    def load_field(self, field_path: str) -> Field | None:
+        """唯讀用途：取得單一欄位（含子欄位）；compact 快取只轉換這棵子樹
+
+        大檔案不在快取中時，以串流方式只讀出目標欄位，不解析整個檔案；
+        設定 FIELD_STREAM_WARM_CACHE 時另外在背景把整個檔案載入快取，之後的讀取改走快取。
+        """
+        file_path = os.path.join(self.filepath, self.filename)
+        signature = stat_signature(file_path)
+        if signature is not None and signature.size >= json_stream.STREAM_MIN_BYTES \
+                and not field_cache.contains(file_path, signature):
+            try:
+                with metrics.span("stream_read"):
+                    data = json_stream.read_subtree(file_path, field_path)
+            except ValueError:
+                # 格式錯誤時改走完整載入，錯誤回報與原本相同
+                pass
+            else:
+                if json_stream.WARM_AFTER_STREAM:
+                    _warm_cache(self.filepath, self.filename, signature)
+                return Field.from_dict(data) if data is not None else None
+
+        entry = load_cache_entry(self.filepath, self.filename)
+        if entry is None:
+            return None
+        with metrics.span("path_walk"):
+            if entry.compact is not None:
+                node = entry.compact.find(field_path)
+                return entry.compact.to_field(node) if node >= 0 else None
+            return entry.derive("index", FieldIndex).get(field_path)
+
+    def load_all_fields(self) -> List[dict]:
+        """唯讀用途：與 get_all_fields 相同的展開結果"""
+        return self.load_views().all_fields
+
+    def load_views(self) -> "FieldViews":
+        """唯讀用途：目前檔案版本的展開結果與父 / 子欄位候選，同一版本只建立一次"""
+        entry = load_cache_entry(self.filepath, self.filename)
+        if entry is None:
+            return FieldViews([], [])
+        views = entry.derived.get("views")
+        if views is None:
+            if entry.compact is not None:
+                views = FieldViews.from_compact(entry.compact)
+            else:
+                views = FieldViews.from_fields(entry.fields)
+            entry.derived["views"] = views
+        return views
+
+    def load_page(self, parent_path: str = "", offset: int = 0, depth: int = 1,
+                  limit: int = DEFAULT_PAGE_LIMIT, version: str | None = None) -> dict | None:
+        """唯讀用途：分頁、只展開 depth 層的欄位樹（見 field_pages.build_page）
+
+        version 為 cursor 中記錄的 ETag，與目前檔案版本不符時拋出 StaleCursor；
+        檔案或父欄位不存在時回傳 None。
+        """
+        entry = load_cache_entry(self.filepath, self.filename)
+        if entry is None:
+            return None
+        current = make_etag(entry.signature)
+        if version is not None and version != current:
+            raise StaleCursor(current)
+        with metrics.span("paginate"):
+            return build_page(entry, parent_path, offset, depth, limit, current)
+
+    # ===== async 版本：在 parse executor 中載入，不阻塞 event loop =====
+    async def aload_fields_to_dict(self):
+        return await parse_executor.run(self.load_fields_to_dict)
+
+    async def aload_fields_shared(self):
+        return await parse_executor.run(self.load_fields_shared)
+
+    async def aload_validation_plan(self) -> ValidationPlan:
+        return await parse_executor.run(self.load_validation_plan)
+
+    async def aload_field(self, field_path: str) -> Field | None:
+        return await parse_executor.run(self.load_field, field_path)
+
+    async def aload_all_fields(self) -> List[dict]:
+        return await parse_executor.run(self.load_all_fields)
+
+    async def aload_views(self) -> "FieldViews":
+        return await parse_executor.run(self.load_views)
+
+    async def aload_page(self, parent_path: str = "", offset: int = 0, depth: int = 1,
+                         limit: int = DEFAULT_PAGE_LIMIT, version: str | None = None) -> dict | None:
+        return await parse_executor.run(self.load_page, parent_path, offset, depth, limit, version)
 
     @staticmethod
     def get_field_operators(field_type):
         """根據字段類型返回可用的運算符"""
-        operators = FIELD_OPERATORS.get(field_type, [])
-        return [op for op in OPERATOR_TYPES if op['value'] in operators]
+        operators = data.FIELD_OPERATORS.get(field_type, [])
+        return [op for op in data.OPERATOR_TYPES if op['value'] in operators]
 
     @staticmethod
     def is_key_exists2(fields: List[Field], key):
         """檢查 key 是否已存在於當前層級"""
-        result = None
-        for field in fields:
-            if field.key == key:
-                result = field
-
-        return result is not None
+        return any(field.key == key for field in fields)
 
     @staticmethod
     def is_key_exists(fields, key):
         """檢查 key 是否已存在於當前層級"""
-        result = None
-        for field in fields:
-            if field.key == key:
-                result = field
-
-        return result is not None
+        return any(field.key == key for field in fields)
 
     @staticmethod
     def find_field_by_key(data, key):
@@ -154,14 +261,20 @@ class FieldLoader:
         """獲取可用的子字段"""
         available_fields = []
 
-        # 根據類型過濾字段
+        # 根據類型過濾字段（object / list 不能作為條件）
         for field_info in all_expends_fields:
-            if field_info['type'] not in ['object', 'list']:
-                available_fields.append({
-                    'key': field_info['key'],
-                    'type': field_info['type'],
-                    'operators': FIELD_OPERATORS.get(field_info['type'], [])
-                })
+            types = field_info['multi_type']
+            if FieldTypes.Object in types or FieldTypes.List in types:
+                continue
+            operators = {}
+            for field_type in types:
+                for operator in data.FIELD_OPERATORS.get(field_type, []):
+                    operators.setdefault(operator['value'], operator)
+            available_fields.append({
+                'key': field_info['key'],
+                'type': types,
+                'operators': list(operators.values())
+            })
         return available_fields
 
     @staticmethod
@@ -182,3 +295,112 @@ class FieldLoader:
         collect_parent_fields(field_list, path)
         return parent_fields
 
+
+# 正在背景載入快取的 (檔案, 版本)，同一版本只排一次
+_warming: Set[Tuple[str, FileSignature]] = set()
+_warming_lock = threading.Lock()
+
+
+def _warm_cache(filepath, filename, signature: FileSignature) -> None:
+    """在 parse executor 中載入整個檔案到快取（不等待結果），parse executor 忙碌時略過"""
+    key = (os.path.abspath(os.path.join(filepath, filename)), signature)
+    with _warming_lock:
+        if key in _warming:
+            return
+        _warming.add(key)
+
+    def load():
+        try:
+            load_cache_entry(filepath, filename)
+        except Exception:
+            # 格式錯誤等到下一次完整載入時再回報
+            pass
+        finally:
+            with _warming_lock:
+                _warming.discard(key)
+
+    if not parse_executor.submit(load):
+        with _warming_lock:
+            _warming.discard(key)
+
+
+class _Segment:
+    """一個第一層欄位（含整棵子樹）的展開結果"""
+
+    __slots__ = ("all_fields", "parent_fields", "child_fields")
+
+    def __init__(self, all_fields: List[dict]):
+        self.all_fields = all_fields
+        self.parent_fields = FieldLoader.get_available_parent_fields(all_fields)
+        self.child_fields = FieldLoader.get_available_child_fields(all_fields)
+
+
+class FieldViews:
+    """一個檔案版本的 get_all_fields 展開結果，以及由它過濾出的父 / 子欄位候選
+
+    依第一層欄位分段保存；透過 FieldIndex 修改後，updated 只重建被修改到的第一層欄位，
+    其他段落沿用上一個版本。內容不引用 Field 物件，檔案轉成 CompactTree 後也能保留。
+    回傳的 list 為共用物件，不可修改。
+    """
+
+    holds_fields = False
+
+    def __init__(self, keys: List[str], segments: List[_Segment]):
+        self._keys = keys
+        self._segments = segments
+        self._all_fields: Optional[List[dict]] = None
+        self._parent_fields: Optional[List[dict]] = None
+        self._child_fields: Optional[List[dict]] = None
+
+    @classmethod
+    def from_fields(cls, fields: List[Field]) -> "FieldViews":
+        return cls([field.key for field in fields],
+                   [_Segment(FieldLoader.get_all_fields([field])) for field in fields])
+
+    @classmethod
+    def from_compact(cls, compact: CompactTree) -> "FieldViews":
+        keys, rows = [], []
+        for row in compact.get_all_fields():
+            # 前序展開，沒有 . 的 key 就是下一個第一層欄位
+            if "." not in row["key"]:
+                keys.append(row["key"])
+                rows.append([])
+            rows[-1].append(row)
+        return cls(keys, [_Segment(segment) for segment in rows])
+
+    def updated(self, fields: List[Field], touched: Iterable[str]) -> "FieldViews":
+        """fields 為修改後的 Field 樹，touched 為 FieldIndex.touched"""
+        touched = set(touched)
+        # 同層 key 重複時無法對應到舊的段落，一律重建
+        old_counts = Counter(self._keys)
+        reusable = {key: segment for key, segment in zip(self._keys, self._segments) if old_counts[key] == 1}
+        keys = [field.key for field in fields]
+        new_counts = Counter(keys)
+
+        segments = []
+        for field in fields:
+            segment = None
+            if field.key not in touched and new_counts[field.key] == 1:
+                segment = reusable.get(field.key)
+            if segment is None:
+                segment = _Segment(FieldLoader.get_all_fields([field]))
+            segments.append(segment)
+        return FieldViews(keys, segments)
+
+    @property
+    def all_fields(self) -> List[dict]:
+        if self._all_fields is None:
+            self._all_fields = list(chain.from_iterable(s.all_fields for s in self._segments))
+        return self._all_fields
+
+    @property
+    def parent_fields(self) -> List[dict]:
+        if self._parent_fields is None:
+            self._parent_fields = list(chain.from_iterable(s.parent_fields for s in self._segments))
+        return self._parent_fields
+
+    @property
+    def child_fields(self) -> List[dict]:
+        if self._child_fields is None:
+            self._child_fields = list(chain.from_iterable(s.child_fields for s in self._segments))
+        return self._child_fields
@@ -0,0 +1,54 @@
+import os
+import threading
+import weakref
+from typing import Callable, List, Optional, Union
+
+WRITTEN = "written"
+CREATED = "created"
+DELETED = "deleted"
+
+Listener = Callable[[str, str], None]
+
+
+class FileEvents:
+    """程序內的檔案異動通知
+
+    透過 API 寫入、建立、刪除檔案時發佈 (event, 絕對路徑)，
+    各種索引訂閱後自行增量更新，不需要重新掃描整個資料夾。
+    以 weak=True 訂閱的 bound method 不會讓物件一直存活，物件被回收後在下一次發佈時移除。
+    """
+
+    def __init__(self):
+        self._listeners: List[Union[Listener, weakref.WeakMethod]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener: Listener, weak: bool = False) -> None:
+        with self._lock:
+            self._listeners = [entry for entry in self._listeners if _resolve(entry) is not None]
+            self._listeners.append(weakref.WeakMethod(listener) if weak else listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        with self._lock:
+            self._listeners = [entry for entry in self._listeners if _resolve(entry) not in (None, listener)]
+
+    def publish(self, event: str, path) -> None:
+        with self._lock:
+            listeners = [_resolve(entry) for entry in self._listeners]
+            if None in listeners:
+                self._listeners = [entry for entry, listener in zip(self._listeners, listeners) if listener is not None]
+        path = os.path.abspath(path)
+        for listener in listeners:
+            if listener is not None:
+                listener(event, path)
+
+    def listener_count(self) -> int:
+        """目前仍有效的訂閱數量"""
+        with self._lock:
+            return sum(1 for entry in self._listeners if _resolve(entry) is not None)
+
+
+def _resolve(entry) -> Optional[Listener]:
+    return entry() if isinstance(entry, weakref.WeakMethod) else entry
+
+
+file_events = FileEvents()
@@ -0,0 +1,53 @@
+import os
+from typing import NamedTuple, Optional
+
+
+class FileSignature(NamedTuple):
+    """檔案版本：只要內容被改寫，其中任一值就會改變"""
+    mtime_ns: int
+    size: int
+    inode: int
+
+
+def stat_signature(file_path) -> Optional[FileSignature]:
+    """取得檔案的版本簽章，檔案不存在時回傳 None"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return signature_from_stat(st)
+
+
+def signature_from_stat(st: os.stat_result) -> FileSignature:
+    return FileSignature(st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def make_etag(signature: FileSignature) -> str:
+    """由 inode / mtime / size 組成的 strong ETag"""
+    return f'"{signature.inode:x}-{signature.mtime_ns:x}-{signature.size:x}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """檢查 If-None-Match header 是否包含 etag（weak 比較，忽略 W/ 前綴）"""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def etag_matches_strong(header: Optional[str], etag: str) -> bool:
+    """檢查 If-Match header 是否包含 etag（strong 比較，W/ 開頭的 weak ETag 一律不符）"""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
@@ -0,0 +1,79 @@
+import os
+import threading
+from typing import Dict, List, Set, Tuple
+
+from src.utils.directory_tree import get_tree_index
+from src.utils.field_cache import NodeInfo
+from src.utils.file_events import DELETED, file_events
+from src.utils.file_version import FileSignature
+from src.utils.json_loader import load_rule_nodes
+
+
+class IncrementalFileIndex:
+    """以檔案為單位增量維護的索引（SearchIndex、DependencyGraph 共用）
+
+    新增、刪除的檔案由 DirectoryTreeIndex 的資料夾版本得知，透過 API 覆寫的檔案由 file_events 得知，
+    sync 只重新讀取這些檔案；直接在磁碟上覆寫的檔案要等 sync(rescan=True) 才會更新。
+    檔案經由 field cache 載入，讀取時不持有 self._lock，查詢可以繼續使用目前的索引。
+    子類別實作 _index_file / _drop_file，兩者都在持有 self._lock 時呼叫。
+    """
+
+    def __init__(self, root, lock=None):
+        self.root = os.path.abspath(root)
+        self._lock = lock if lock is not None else threading.Lock()
+        # 同一時間只有一個 sync，避免較舊的讀取結果覆蓋較新的
+        self._sync_lock = threading.Lock()
+        # 已索引的檔案與索引時的版本
+        self._signatures: Dict[str, FileSignature] = {}
+        # file_events 通知內容已改變、下次 sync 需要重新索引的檔案
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+        self.reindexed = 0
+        file_events.subscribe(self._on_file_event, weak=True)
+
+    def _index_file(self, rel_path: str, nodes: List[NodeInfo]) -> None:
+        raise NotImplementedError
+
+    def _drop_file(self, rel_path: str) -> None:
+        """移除檔案的索引內容，檔案沒有被索引時不做任何事"""
+        raise NotImplementedError
+
+    def sync(self, rescan: bool = False) -> None:
+        """依目前的檔案版本增量更新；rescan 時重新 stat 每個檔案"""
+        with self._sync_lock:
+            current = get_tree_index(self.root).files(rescan=rescan)
+            with self._dirty_lock:
+                dirty, self._dirty = self._dirty, set()
+            with self._lock:
+                for rel_path in [path for path in self._signatures if path not in current]:
+                    del self._signatures[rel_path]
+                    self._drop_file(rel_path)
+                stale = [(rel_path, signature) for rel_path, signature in current.items()
+                         if rel_path in dirty or self._signatures.get(rel_path) != signature]
+            loaded = [(rel_path, signature, load_rule_nodes(self.root, rel_path)) for rel_path, signature in stale]
+            with self._lock:
+                for rel_path, signature, nodes in loaded:
+                    self._drop_file(rel_path)
+                    self._index_file(rel_path, nodes)
+                    self._signatures[rel_path] = signature
+                    self.reindexed += 1
+
+    def _on_file_event(self, event: str, path: str) -> None:
+        if event == DELETED or not path.startswith(os.path.join(self.root, "")):
+            return
+        with self._dirty_lock:
+            self._dirty.add(os.path.relpath(path, self.root).replace(os.sep, "/"))
+
+
+_instances: Dict[Tuple[type, str], IncrementalFileIndex] = {}
+_instances_lock = threading.Lock()
+
+
+def get_index(cls, root):
+    """每種索引、每個 root 共用一個實例"""
+    key = (cls, os.path.abspath(root))
+    with _instances_lock:
+        index = _instances.get(key)
+        if index is None:
+            index = _instances[key] = cls(key[1])
+        return index
@@ -1,8 +1,21 @@
 import json
 import os
-from typing import List
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
 
-from src.models import Field, CustomEncoder
+from src.models import Field
+from src.utils.async_storage import write_executor
+from src.utils.compact_tree import CompactTree, NotCompactable, count_nodes
+from src.utils.field_cache import CacheEntry, NodeInfo, field_cache
+from src.utils.field_index import FieldIndex
+from src.utils.file_events import WRITTEN, file_events
+from src.utils.file_version import FileSignature, stat_signature
+from src.utils.metrics import metrics
+from src.utils.serializer import dumps_pretty
+from src.utils.snapshot import snapshot_store
+from src.utils.trusted_content import content_digest, trust_store
 
 
 def load_json(filepath, filename):
@@ -14,19 +27,313 @@ def load_json(filepath, filename):
 
 
 def load_json_to_fields(filepath, filename) -> List[Field]:
+    """回傳可自由修改的 Field 樹（快取內容的複本）"""
+    entry = load_cache_entry(filepath, filename)
+    return entry.fresh_fields() if entry is not None else []
+
+
+def load_json_to_fields_shared(filepath, filename) -> List[Field]:
+    """回傳快取中共用的 Field 樹，只能讀取不可修改（compact 項目為暫時建立的 Field 樹）"""
+    entry = load_cache_entry(filepath, filename)
+    return entry.fields if entry is not None else []
+
+
+def load_json_to_index_shared(filepath, filename) -> FieldIndex:
+    """回傳快取中共用 Field 樹的路徑索引，每個檔案版本只會建立一次（compact 項目每次建立暫時的索引）"""
+    entry = load_cache_entry(filepath, filename)
+    if entry is None:
+        return FieldIndex([])
+    return entry.derive("index", FieldIndex)
+
+
+def load_rule_nodes(root, rel_path) -> List[NodeInfo]:
+    """經由快取載入檔案的所有欄位（供各種索引使用）；檔案不存在或格式不符時視為沒有欄位"""
+    try:
+        entry = load_cache_entry(root, os.path.join(root, rel_path))
+    except Exception:
+        return []
+    return list(entry.iter_nodes()) if entry is not None else []
+
+
+def load_cache_entry(filepath, filename) -> CacheEntry | None:
     filepath = os.path.join(filepath, filename)
-    if os.path.exists(filepath):
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-            fields = [Field.from_dict(item) for item in data]
-            return fields
-    return []
+    signature = stat_signature(filepath)
+    if signature is None:
+        return None
+
+    entry = field_cache.get_entry(filepath, signature)
+    if entry is None:
+        # 版本與快照相同時不必讀取原始檔
+        with metrics.span("snapshot_read"):
+            compact = snapshot_store.load(filepath, signature)
+        if compact is not None:
+            return _put_compact(filepath, signature, compact)
+
+        with metrics.span("file_read"):
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+        # 只有版本改變、內容相同（例如部署時重新複製）時仍可使用快照
+        digest = content_digest(raw) if snapshot_store.enabled else None
+        if digest is not None:
+            with metrics.span("snapshot_read"):
+                compact = snapshot_store.load(filepath, signature, digest)
+            if compact is not None:
+                return _put_compact(filepath, signature, compact)
+
+        with metrics.span("json_parse"):
+            data = json.loads(raw)
+        nodes = count_nodes(data) if isinstance(data, list) else 0
+        metrics.observe_file(len(raw), nodes)
+        # 大檔案直接建立 CompactTree，不必先建立整棵 pydantic 樹
+        if nodes >= field_cache.compact_min_nodes:
+            try:
+                with metrics.span("build_compact"):
+                    compact = CompactTree.from_json(data)
+                if digest is not None:
+                    with metrics.span("snapshot_write"):
+                        snapshot_store.save(filepath, signature, digest, compact)
+                return field_cache.put(filepath, None, signature, compact=compact)
+            except NotCompactable:
+                pass
+        # 內容與上次透過 save_json 寫出的完全相同時，跳過 pydantic 驗證
+        if digest is None:
+            digest = content_digest(raw)
+        with metrics.span("build_fields"):
+            if trust_store.is_trusted(filepath, digest):
+                fields = [Field.from_dict_trusted(item) for item in data]
+            else:
+                fields = [Field.from_dict(item) for item in data]
+        if snapshot_store.enabled and nodes >= snapshot_store.min_nodes:
+            with metrics.span("snapshot_write"):
+                snapshot_store.save(filepath, signature, digest, CompactTree.from_fields(fields))
+        entry = field_cache.put(filepath, fields, signature)
+    return entry
+
+
+def _put_compact(filepath, signature: FileSignature, compact: CompactTree) -> CacheEntry | None:
+    """由快照載入：大檔案直接保存 compact，小檔案轉回 Field 樹"""
+    if len(compact) >= field_cache.compact_min_nodes:
+        return field_cache.put(filepath, None, signature, compact=compact)
+    with metrics.span("build_fields"):
+        fields = compact.to_fields()
+    return field_cache.put(filepath, fields, signature)
+
+
+class _ValidityCache:
+    """檔案版本 -> 是否為合法 JSON，同一版本只檢查一次
+
+    依最久未使用淘汰，檔案（或所在資料夾）透過 API 寫入、刪除時立即移除。
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[FileSignature, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str, signature: FileSignature) -> bool | None:
+        with self._lock:
+            cached = self._entries.get(file_path)
+            if cached is None or cached[0] != signature:
+                return None
+            self._entries.move_to_end(file_path)
+            return cached[1]
+
+    def put(self, file_path: str, signature: FileSignature, valid: bool) -> None:
+        with self._lock:
+            self._entries[file_path] = (signature, valid)
+            self._entries.move_to_end(file_path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget(self, path: str) -> None:
+        prefix = os.path.join(path, "")
+        with self._lock:
+            for key in [key for key in self._entries if key == path or key.startswith(prefix)]:
+                del self._entries[key]
+
+    def _on_file_event(self, event: str, path: str) -> None:
+        self.forget(path)
+
+
+_json_validity = _ValidityCache()
+file_events.subscribe(_json_validity._on_file_event)
+
+
+def is_valid_json_file(file_path, signature: FileSignature) -> bool:
+    """檢查檔案內容是否為合法 JSON，結果依檔案版本快取"""
+    file_path = os.path.abspath(file_path)
+    valid = _json_validity.get(file_path, signature)
+    if valid is not None:
+        return valid
 
+    if field_cache.contains(file_path, signature):
+        valid = True
+    else:
+        try:
+            with open(file_path, 'rb') as f:
+                json.loads(f.read())
+            valid = True
+        except ValueError:
+            valid = False
+    _json_validity.put(file_path, signature, valid)
+    return valid
 
-def save_json(file_path, data):
+
+def save_json(file_path, data, index: FieldIndex | None = None,
+              derived: Dict[str, object] | None = None) -> FileSignature | None:
+    """寫入檔案並回傳寫入後的檔案版本；derived 為呼叫端已算好、對應 data 的推導資料"""
     # filepath = os.path.join(folder_path, filename)
-    with open(file_path, "w") as file:
-        json.dump(data, file, cls=CustomEncoder, indent=4)
+    try:
+        digest = atomic_write_json(file_path, data)
+    except Exception:
+        field_cache.invalidate(file_path)
+        trust_store.forget(file_path)
+        raise
+    return _after_write(file_path, data, digest, index, derived)
+
+
+def save_json_many(writes: List[Tuple[str, object, FieldIndex | None, Dict[str, object] | None]]) \
+        -> List[FileSignature | None]:
+    """一次寫入多個檔案，writes 的每一項與 save_json 的參數相同
+
+    所有檔案都先寫入暫存檔並 fsync，全部成功後才逐一取代原檔；暫存階段失敗時沒有任何檔案被改變。
+    （取代時失敗只會發生在個別檔案的 rename，已取代的檔案無法復原）
+    """
+    staged: List[StagedWrite] = []
+    try:
+        for file_path, data, _, _ in writes:
+            staged.append(stage_json(file_path, data))
+    except BaseException:
+        for write in staged:
+            write.discard()
+        raise
+
+    signatures = []
+    for n, ((file_path, data, index, derived), write) in enumerate(zip(writes, staged)):
+        try:
+            write.commit()
+        except BaseException:
+            field_cache.invalidate(file_path)
+            trust_store.forget(file_path)
+            for rest in staged[n:]:
+                rest.discard()
+            raise
+        signatures.append(_after_write(file_path, data, write.digest, index, derived))
+    return signatures
+
+
+def _after_write(file_path, data, digest: str, index: FieldIndex | None,
+                 derived: Dict[str, object] | None) -> FileSignature | None:
+    signature = stat_signature(file_path)
+    validated = isinstance(data, list) and all(isinstance(item, Field) for item in data)
+    # 內容來自已驗證的 Field，記錄 hash 讓之後的冷啟動載入可以跳過驗證
+    if validated:
+        trust_store.remember(file_path, digest)
+    else:
+        trust_store.forget(file_path)
+    # 寫入的資料就是最新內容，直接更新快取而不是讓下次讀取重新解析
+    if signature is not None and validated:
+        derived = dict(derived or {})
+        if index is not None and index.fields is data:
+            derived["index"] = index
+        field_cache.put(file_path, data, signature, derived=derived)
+    else:
+        field_cache.invalidate(file_path)
+    file_events.publish(WRITTEN, file_path)
+    return signature
+
+
+async def asave_json(file_path, data, index: FieldIndex | None = None) -> FileSignature | None:
+    """在 write executor 中執行 save_json"""
+    return await write_executor.run(save_json, file_path, data, index)
+
+
+def atomic_write_json(file_path, data) -> str:
+    """先寫入同目錄的暫存檔並 fsync，再以 os.replace 取代原檔，讀取端不會看到寫到一半的內容
+
+    回傳寫入內容的 hash。
+    """
+    write = stage_json(file_path, data)
+    try:
+        write.commit()
+    except BaseException:
+        write.discard()
+        raise
+    return write.digest
+
+
+class StagedWrite:
+    """已寫入同目錄暫存檔並 fsync、尚未取代原檔的內容"""
+
+    def __init__(self, file_path, tmp_path: str, digest: str):
+        self.file_path = file_path
+        self.tmp_path = tmp_path
+        self.digest = digest
+
+    def commit(self) -> None:
+        with metrics.span("file_write"):
+            _copy_mode(self.file_path, self.tmp_path)
+            os.replace(self.tmp_path, self.file_path)
+            _fsync_directory(os.path.dirname(os.path.abspath(self.file_path)))
+
+    def discard(self) -> None:
+        try:
+            os.unlink(self.tmp_path)
+        except OSError:
+            pass
+
+
+def stage_json(file_path, data) -> StagedWrite:
+    with metrics.span("encode"):
+        content = dumps_pretty(data)
+    directory = os.path.dirname(os.path.abspath(file_path))
+    with metrics.span("file_write"):
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    return StagedWrite(file_path, tmp_path, content_digest(content))
+
+
+def _read_umask() -> int:
+    # os.umask 只能以設定的方式讀取，會影響整個程序，因此只在 import 時讀一次
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# 新檔案的權限，與一般 open() 建立的檔案相同
+NEW_FILE_MODE = 0o666 & ~_read_umask()
+
+
+def _copy_mode(src_path, dst_path):
+    # mkstemp 建立的檔案權限為 0600，沿用原檔權限（新檔則依 umask）
+    try:
+        mode = os.stat(src_path).st_mode & 0o777
+    except OSError:
+        mode = NEW_FILE_MODE
+    os.chmod(dst_path, mode)
+
+
+def _fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 def check_folder(folder_path):
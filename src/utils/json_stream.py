@@ -0,0 +1,225 @@
+import json
+import os
+import re
+from typing import List, Optional, Tuple
+
+# 檔案超過這個大小且不在快取中時，單一欄位的讀取改用串流方式
+STREAM_MIN_BYTES = int(os.environ.get("FIELD_STREAM_MIN_BYTES", 1024 * 1024))
+# 串流讀取後是否在背景把整個檔案載入快取；預設關閉，大檔案的單一欄位讀取不會帶出完整解析與整份記憶體
+WARM_AFTER_STREAM = os.environ.get("FIELD_STREAM_WARM_CACHE", "0").lower() in ("1", "true", "yes", "on")
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+# 略過時一次吃掉括號以外的內容（含完整的字串）、不含巢狀結構的陣列 / 物件，
+# 以及只含這類陣列的物件（沒有 condition 的葉節點），只在其他括號處回到 Python 計算深度
+_STRING = rb'"(?:[^"\\]++|\\.)*+"'
+_ATOM = rb'(?:[^"\[\]{}]++|' + _STRING + rb')'
+_FLAT = rb'(?:\[' + _ATOM + rb'*+\]|\{' + _ATOM + rb'*+\})'
+_LEAF = rb'\{(?:' + _ATOM + rb'|' + _FLAT + rb')*+\}'
+_SKIPPABLE = re.compile(rb'(?:' + _ATOM + rb'|' + _FLAT + rb'|' + _LEAF + rb')*+', re.DOTALL)
+_STRING_END = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb"[,\]}\s]")
+
+# 第一個 key 相符的欄位沒有 children，路徑不存在（與 FieldIndex 相同，不再找後面的同名欄位）
+_DEAD_END = (-1, -1)
+
+
+class _Reader:
+    """以固定大小的區塊讀取檔案，只辨識 JSON 的結構符號，略過的值不會建立任何物件"""
+
+    def __init__(self, file, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buf = b""
+        self.pos = 0
+        self.base = 0  # buf[0] 在檔案中的位置
+
+    def _more(self) -> bool:
+        data = self.file.read(self.chunk_size)
+        if not data:
+            return False
+        self.base += self.pos
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def seek(self, offset: int) -> None:
+        self.file.seek(offset)
+        self.buf = b""
+        self.pos = 0
+        self.base = offset
+
+    def tell(self) -> int:
+        return self.base + self.pos
+
+    def peek(self) -> bytes:
+        """略過空白並回傳下一個字元（不移動位置），檔案結束時回傳 b''"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos:self.pos + 1]
+            if not self._more():
+                return b""
+
+    def expect(self, char: bytes) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char.decode()!r} at offset {self.tell()}")
+        self.pos += 1
+
+    def read_string(self) -> str:
+        self.expect(b'"')
+        parts = [b'"']
+        self._scan_string(parts)
+        return json.loads(b"".join(parts))
+
+    def _scan_string(self, parts: Optional[List[bytes]] = None) -> None:
+        """從左引號之後讀到右引號；parts 不為 None 時收集原始內容"""
+        while True:
+            match = _STRING_END.search(self.buf, self.pos)
+            if match is None:
+                if parts is not None:
+                    parts.append(self.buf[self.pos:])
+                self.pos = len(self.buf)
+                if not self._more():
+                    raise ValueError("unterminated string")
+                continue
+            end = match.end()
+            if self.buf[match.start()] == ord('"'):
+                if parts is not None:
+                    parts.append(self.buf[self.pos:end])
+                self.pos = end
+                return
+            # 反斜線：連同下一個字元一起略過
+            if parts is not None:
+                parts.append(self.buf[self.pos:end])
+            self.pos = end
+            if self.pos >= len(self.buf) and not self._more():
+                raise ValueError("unterminated string")
+            if parts is not None:
+                parts.append(self.buf[self.pos:self.pos + 1])
+            self.pos += 1
+
+    def skip_value(self) -> None:
+        char = self.peek()
+        if char == b'"':
+            self.pos += 1
+            self._scan_string()
+            return
+        if char in (b"[", b"{"):
+            # 先跳過開頭的括號，之後的比對只會停在這個值內部的括號
+            self.pos += 1
+            depth = 1
+            while True:
+                self.pos = _SKIPPABLE.match(self.buf, self.pos).end()
+                if self.pos >= len(self.buf) or self.buf[self.pos] == ord('"'):
+                    # 區塊結尾或跨區塊的字串：讀入更多內容後從目前位置重新比對
+                    if not self._more():
+                        raise ValueError("unterminated container")
+                    continue
+                found = self.buf[self.pos]
+                self.pos += 1
+                if found in b"[{":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return
+        if not char:
+            raise ValueError("unexpected end of file")
+        # 數字、true / false / null
+        while True:
+            match = _SCALAR_END.search(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return
+            self.pos = len(self.buf)
+            if not self._more():
+                return
+
+    def read_raw(self, start: int, end: int) -> bytes:
+        self.file.seek(start)
+        return self.file.read(end - start)
+
+
+def read_subtree(file_path, field_path: str, chunk_size: int = CHUNK_SIZE) -> Optional[dict]:
+    """依 dotted path 從規則檔讀出單一欄位（含子欄位）的原始 dict，找不到時回傳 None
+
+    逐層掃描 children：同層 key 不符的欄位只略過不解析，找到目標後停止，
+    只有目標欄位本身的內容會被 json.loads。記憶體與時間取決於目標的大小與位置，而不是整個檔案。
+    只檢查走過的結構，檔案其他部分的格式錯誤不一定會被發現。
+    """
+    parts = field_path.split(".")
+    if not all(parts):
+        return None
+    with open(file_path, "rb") as file:
+        reader = _Reader(file, chunk_size)
+        if reader.peek() != b"[":
+            return None
+        reader.expect(b"[")
+        for depth, part in enumerate(parts):
+            last = depth == len(parts) - 1
+            found = _find_in_array(reader, part, last)
+            if found is None:
+                return None
+            if last:
+                start, end = found
+                return json.loads(reader.read_raw(start, end))
+            # 已停在目標欄位的 children 陣列開頭
+            reader.expect(b"[")
+    return None
+
+
+def _find_in_array(reader: _Reader, key: str, last: bool) -> Optional[Tuple[int, int]]:
+    """在目前的陣列中找第一個 key 相符的欄位
+
+    last 時回傳欄位物件的 (開始, 結束) 位置；否則讓 reader 停在它的 children 陣列開頭並回傳 (0, 0)。
+    """
+    if reader.peek() == b"]":
+        return None
+    while True:
+        if reader.peek() == b"{":
+            found = _scan_object(reader, key, last)
+            if found is _DEAD_END:
+                return None
+            if found is not None:
+                return found
+        else:
+            reader.skip_value()
+        char = reader.peek()
+        if char == b"]":
+            return None
+        reader.expect(b",")
+
+
+def _scan_object(reader: _Reader, key: str, last: bool) -> Optional[Tuple[int, int]]:
+    start = reader.tell()
+    reader.expect(b"{")
+    matched = False
+    children_offset = None
+    if reader.peek() != b"}":
+        while True:
+            name = reader.read_string()
+            reader.expect(b":")
+            if name == "key" and reader.peek() == b'"':
+                matched = reader.read_string() == key
+            elif name == "children":
+                if matched and not last:
+                    # key 在 children 之前（save_json 的順序）可以直接往下一層
+                    return (0, 0) if reader.peek() == b"[" else _DEAD_END
+                children_offset = reader.tell() if reader.peek() == b"[" else None
+                reader.skip_value()
+            else:
+                reader.skip_value()
+            if reader.peek() == b"}":
+                break
+            reader.expect(b",")
+    reader.expect(b"}")
+    if not matched:
+        return None
+    if last:
+        return start, reader.tell()
+    if children_offset is None:
+        return _DEAD_END
+    # key 出現在 children 之後，回到 children 的位置
+    reader.seek(children_offset)
+    return 0, 0
@@ -0,0 +1,216 @@
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 設為 0 / false 時不加 middleware，span 也直接回傳共用的空 context manager
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(1024 * 4 ** n for n in range(10))  # 1 KiB ~ 256 MiB
+NODE_BUCKETS = (10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000)
+
+# 不在 request 中（例如背景工作、Flask app）記錄的 stage
+NO_ENDPOINT = "none"
+
+_NOOP = contextlib.nullcontext()
+# 目前 request 收集 stage 耗時的 list；executor 會複製 contextvars，worker thread 中也取得同一個 list
+_request_stages: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = \
+    contextvars.ContextVar("metrics_request_stages", default=None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily:
+    """同名、依 label 分開的多個 histogram"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            histogram = self._series.get(labels)
+            if histogram is None:
+                histogram = self._series[labels] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+            for labels, histogram in series:
+                pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels)]
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = 'le="%s"' % _number(bound)
+                    lines.append(f"{self.name}_bucket{_labels(pairs + [le])} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(pairs)} {_number(histogram.sum)}")
+                lines.append(f"{self.name}_count{_labels(pairs)} {histogram.count}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class _Span:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record_stage(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """每個 endpoint 的處理時間與各階段（讀檔、解析、寫檔…）耗時，輸出為 Prometheus 文字格式
+
+    stage 的耗時先暫存在目前 request 的 list，request 結束後才以 route 樣板（/api/field）記錄，
+    不會因為路徑參數不同而產生大量 label。
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.requests = HistogramFamily(
+            "precheck_request_duration_seconds", "Request handling time per endpoint",
+            ("method", "endpoint", "status"), LATENCY_BUCKETS)
+        self.stages = HistogramFamily(
+            "precheck_stage_duration_seconds", "Time spent in each processing stage",
+            ("endpoint", "stage"), LATENCY_BUCKETS)
+        self.file_bytes = HistogramFamily(
+            "precheck_rule_file_bytes", "Size of rule files parsed on a cache miss", (), SIZE_BUCKETS)
+        self.file_nodes = HistogramFamily(
+            "precheck_rule_file_nodes", "Field count of rule files parsed on a cache miss", (), NODE_BUCKETS)
+
+    def span(self, stage: str):
+        """with metrics.span("json_parse"): ...；停用時幾乎沒有額外成本"""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, stage)
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((stage, seconds))
+        else:
+            self.stages.observe((NO_ENDPOINT, stage), seconds)
+
+    def observe_file(self, size: int, nodes: int) -> None:
+        if self.enabled:
+            self.file_bytes.observe((), size)
+            self.file_nodes.observe((), nodes)
+
+    def render(self, stats: Optional[Dict[str, dict]] = None) -> str:
+        """stats 為 {區塊名稱: stats() 的結果}，數值欄位輸出為 gauge"""
+        lines = []
+        for family in (self.requests, self.stages, self.file_bytes, self.file_nodes):
+            lines.extend(family.render())
+        for section, values in (stats or {}).items():
+            lines.extend(_stats_gauges(f"precheck_{section}", values))
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        for family in (self.requests, self.stages, self.file_bytes, self.file_nodes):
+            family.clear()
+
+
+class MetricsMiddleware:
+    """ASGI middleware：記錄 request 總時間，並把 request 中的 stage 耗時歸到對應的 endpoint"""
+
+    def __init__(self, app, registry: Optional[Metrics] = None):
+        self.app = app
+        self.metrics = registry if registry is not None else metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stages: List[Tuple[str, float]] = []
+        token = _request_stages.set(stages)
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stages.reset(token)
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            self.metrics.requests.observe((scope["method"], endpoint, str(status[0])), elapsed)
+            for stage, seconds in stages:
+                self.metrics.stages.observe((endpoint, stage), seconds)
+
+
+def _stats_gauges(prefix: str, values: dict) -> Iterable[str]:
+    """{"hits": 1} -> precheck_x_hits 1；{"read": {"queued": 0}} -> precheck_x_queued{name="read"} 0"""
+    gauges: Dict[str, List[str]] = {}
+    for key, value in values.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                if _is_number(sub_value):
+                    gauges.setdefault(f"{prefix}_{sub_key}", []).append(
+                        f'{prefix}_{sub_key}{{name="{_escape(key)}"}} {_number(sub_value)}')
+        elif _is_number(value):
+            gauges.setdefault(f"{prefix}_{key}", []).append(f"{prefix}_{key} {_number(value)}")
+    for name, samples in gauges.items():
+        yield f"# TYPE {name} gauge"
+        yield from samples
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float))
+
+
+def _number(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(pairs: List[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+from src.utils.async_storage import bulk_executor
+from src.utils.dependency_graph import get_dependency_graph
+from src.utils.directory_tree import get_tree_index
+from src.utils.field_cache import field_cache
+from src.utils.field_index import FieldIndex
+from src.utils.fields_service import FieldLoader
+from src.utils.json_loader import load_cache_entry
+from src.utils.search_index import get_search_index
+
+# 設為 1 / true 時，啟動後在背景預先載入所有規則檔
+PREWARM_ENABLED = os.environ.get("FIELD_PREWARM", "0").lower() in ("1", "true", "yes", "on")
+
+DISABLED = "disabled"
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+class Prewarmer:
+    """啟動時在背景解析所有規則檔並建立索引，讓第一批請求不必等待解析
+
+    每個檔案載入快取並建立欄位索引與展開結果，最後同步搜尋索引與 condition 依賴圖。
+    快取用量達到上限後不再載入其他檔案，避免把先前載入的檔案擠出去。
+    單一檔案失敗只記錄在 failed_files；結束（READY 或 FAILED）後 ready 為 True。
+    """
+
+    def __init__(self, enabled: bool = PREWARM_ENABLED):
+        self._lock = threading.Lock()
+        self.state = PENDING if enabled else DISABLED
+        self.total = 0
+        self.loaded = 0
+        self.failed_files = 0
+        self.skipped = 0
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, root) -> None:
+        """在 bulk executor 中執行 run，不等待結束（需在 event loop 中呼叫）"""
+        if self.state != PENDING:
+            return
+        self._task = asyncio.get_running_loop().create_task(bulk_executor.run(self.run, root))
+
+    def run(self, root) -> None:
+        with self._lock:
+            self.state = RUNNING
+        start = time.perf_counter()
+        error = None
+        try:
+            files = sorted(get_tree_index(root).files())
+            with self._lock:
+                self.total = len(files)
+            for rel_path in files:
+                self._load(root, os.path.abspath(os.path.join(root, rel_path)))
+            get_search_index(root).sync()
+            get_dependency_graph(root).sync()
+        except Exception as e:
+            state, error = FAILED, f"{type(e).__name__}: {e}"
+        else:
+            state = READY
+        with self._lock:
+            self.state = state
+            self.error = error
+            self.seconds = time.perf_counter() - start
+
+    def _load(self, root, abs_path: str) -> None:
+        if field_cache.stats()["bytes"] >= field_cache.max_bytes:
+            with self._lock:
+                self.skipped += 1
+            return
+        # 與 API 相同的 (root, 絕對路徑) 組合，快取 key 才會一致
+        loader = FieldLoader(root, abs_path)
+        try:
+            entry = load_cache_entry(loader.filepath, loader.filename)
+            if entry is not None:
+                if entry.compact is None:
+                    entry.derive("index", FieldIndex)
+                loader.load_views()
+        except Exception:
+            with self._lock:
+                self.failed_files += 1
+            return
+        with self._lock:
+            self.loaded += 1
+
+    @property
+    def ready(self) -> bool:
+        return self.state in (DISABLED, READY, FAILED)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "state": self.state,
+                "files": self.total,
+                "loaded": self.loaded,
+                "failed": self.failed_files,
+                "skipped": self.skipped,
+                "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+                "error": self.error,
+            }
+
+
+prewarmer = Prewarmer()
@@ -0,0 +1,199 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+DEFAULT_MAX_PATTERNS = int(os.environ.get("REGEX_CACHE_SIZE", 1024))
+# 有回溯風險的 pattern 只對不超過這個長度的字串執行
+RISKY_MAX_INPUT = int(os.environ.get("REGEX_RISKY_MAX_INPUT", 256))
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _POSSESSIVE = {sre_constants.POSSESSIVE_REPEAT, sre_constants.ATOMIC_GROUP}
+else:
+    _POSSESSIVE = set()
+_ANY_CHAR = None
+
+
+class InvalidRegexError(ValueError):
+    """pattern 無法編譯"""
+
+
+class CompiledRegex:
+    __slots__ = ("pattern", "regex", "risk")
+
+    def __init__(self, pattern: str, regex: re.Pattern, risk: Optional[str]):
+        self.pattern = pattern
+        self.regex = regex
+        # 靜態分析發現的災難性回溯風險，None 代表安全
+        self.risk = risk
+
+    def search(self, value: str) -> Optional[bool]:
+        """回傳是否符合；有風險的 pattern 遇到超過執行預算的輸入時回傳 None（不執行）"""
+        if self.risk is not None and len(value) > RISKY_MAX_INPUT:
+            return None
+        return self.regex.search(value) is not None
+
+
+# ===== 靜態分析 =====
+def _first_chars(items):
+    """回傳 pattern 開頭可能出現的字元集合，無法判斷時回傳 _ANY_CHAR"""
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            return {av}
+        if op == sre_constants.IN:
+            chars = set()
+            for in_op, in_av in av:
+                if in_op == sre_constants.LITERAL:
+                    chars.add(in_av)
+                elif in_op == sre_constants.RANGE and in_av[1] - in_av[0] < 256:
+                    chars.update(range(in_av[0], in_av[1] + 1))
+                else:
+                    return _ANY_CHAR
+            return chars
+        if op == sre_constants.SUBPATTERN:
+            return _first_chars(av[-1])
+        if op in (sre_constants.AT,):
+            continue
+        return _ANY_CHAR
+    return set()
+
+
+def _branches_overlap(branches) -> bool:
+    seen = set()
+    for branch in branches:
+        chars = _first_chars(branch)
+        if chars is _ANY_CHAR or seen & chars:
+            return True
+        seen |= chars
+    return False
+
+
+def _find_risk(items, in_unbounded_repeat: bool = False) -> Optional[str]:
+    for op, av in items:
+        if op in _POSSESSIVE:
+            continue
+        if op in _REPEATS:
+            low, high, sub = av
+            unbounded = high == sre_constants.MAXREPEAT or high > 64
+            if unbounded and in_unbounded_repeat:
+                return "nested quantifier"
+            risk = _find_risk(sub, in_unbounded_repeat or unbounded)
+            if risk:
+                return risk
+        elif op == sre_constants.BRANCH:
+            branches = av[1]
+            if in_unbounded_repeat and _branches_overlap(branches):
+                return "overlapping alternation inside a quantifier"
+            for branch in branches:
+                risk = _find_risk(branch, in_unbounded_repeat)
+                if risk:
+                    return risk
+        elif op == sre_constants.SUBPATTERN:
+            risk = _find_risk(av[-1], in_unbounded_repeat)
+            if risk:
+                return risk
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            risk = _find_risk(av[1], in_unbounded_repeat)
+            if risk:
+                return risk
+        elif op == sre_constants.GROUPREF and in_unbounded_repeat:
+            return "backreference inside a quantifier"
+    return None
+
+
+def analyze(pattern: str) -> Optional[str]:
+    """靜態檢查 pattern 是否可能造成災難性回溯，回傳原因或 None"""
+    try:
+        return _find_risk(sre_parse.parse(pattern))
+    except (re.error, RecursionError):
+        return None
+
+
+class RegexRegistry:
+    """程序層級的 regex 快取
+
+    每個不同的 pattern 只編譯與分析一次（包含編譯失敗的結果），
+    超過 max_patterns 時淘汰最久未使用的項目。
+    """
+
+    def __init__(self, max_patterns: int = DEFAULT_MAX_PATTERNS):
+        self.max_patterns = max_patterns
+        # 編譯失敗時保存錯誤訊息，避免重複編譯同一個錯誤的 pattern
+        self._entries: OrderedDict[str, CompiledRegex | str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def compile(self, pattern: str) -> CompiledRegex:
+        """取得編譯好的 pattern，無法編譯時拋出 InvalidRegexError"""
+        with self._lock:
+            entry = self._entries.get(pattern)
+            if entry is not None:
+                self._entries.move_to_end(pattern)
+                self.hits += 1
+        if entry is None:
+            entry = self._build(pattern)
+            with self._lock:
+                self.misses += 1
+                self._entries[pattern] = entry
+                while len(self._entries) > self.max_patterns:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        if isinstance(entry, str):
+            raise InvalidRegexError(entry)
+        return entry
+
+    def check(self, pattern: str) -> Optional[str]:
+        """儲存規則前的檢查：回傳錯誤原因，pattern 可用時回傳 None"""
+        try:
+            compiled = self.compile(pattern)
+        except InvalidRegexError as e:
+            return str(e)
+        if compiled.risk is not None:
+            return f"pattern '{pattern}' may cause catastrophic backtracking ({compiled.risk})"
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "patterns": len(self._entries),
+                "max_patterns": self.max_patterns,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    @staticmethod
+    def _build(pattern: str) -> CompiledRegex | str:
+        try:
+            regex = re.compile(pattern)
+        except (re.error, RecursionError, OverflowError) as e:
+            return f"pattern '{pattern}' cannot be compiled: {e}"
+        return CompiledRegex(pattern, regex, analyze(pattern))
+
+
+regex_registry = RegexRegistry()
+
+
+def find_regex_error(field, path: str = "") -> Optional[str]:
+    """檢查欄位（含所有子欄位）的 regex，回傳第一個錯誤或 None"""
+    field_path = f"{path}.{field.key}" if path else field.key
+    if field.regex:
+        error = regex_registry.check(field.regex)
+        if error:
+            return f"Invalid regex in '{field_path}': {error}"
+    for child in field.children:
+        error = find_regex_error(child, field_path)
+        if error:
+            return error
+    return None
@@ -0,0 +1,257 @@
+"""規則檔的儲存介面
+
+RuleStore 以「檔案相對路徑 + 欄位 dotted path」存取規則，兩種實作：
+- JsonDirectoryStore：目前的 BASE_PATH 資料夾（每個檔案一份縮排 JSON），沿用快取、write lock 與 save_json
+- SqliteRuleStore（src.utils.sqlite_store）：單一 SQLite 檔，每個欄位一列，單一欄位的修改只動到對應的列
+
+兩者之間的匯入 / 匯出：
+python -m src.utils.rule_store import --root assets --db rules.db
+python -m src.utils.rule_store export --db rules.db --root exported
+
+API 目前只讀寫 BASE_PATH 的 JSON 檔，SQLite 後端只透過上面的匯入 / 匯出使用。
+"""
+import argparse
+import os
+import posixpath
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from src.models import Field
+from src.utils.dependency_graph import field_paths
+from src.utils.directory_tree import get_tree_index
+from src.utils.field_cache import field_cache
+from src.utils.field_index import FieldIndex
+from src.utils.file_events import DELETED, file_events
+from src.utils.json_loader import load_cache_entry, save_json
+from src.utils.write_coordinator import write_coordinator
+
+Reference = Tuple[str, str]  # (檔案相對路徑, 擁有 condition 的欄位 dotted path)
+
+
+class ReferencedError(ValueError):
+    """要移除的欄位仍被其他 condition 引用（force=False 時）"""
+
+    def __init__(self, dependents: List[dict]):
+        super().__init__(f"field is referenced by {len(dependents)} condition(s)")
+        self.dependents = dependents
+
+
+class RuleStore(ABC):
+    """規則檔的儲存後端
+
+    file 為相對路徑（例如 gen2/required.json），path 為欄位的 dotted path，"" 代表第一層。
+    parent 不存在時修改類的方法拋出 KeyError；新增的 key 在同層已存在時拋出 ValueError。
+    replace_field / remove_field 在 force=False 時，會讓其他 condition 失去目標的修改拋出 ReferencedError，
+    檢查與寫入在同一個 transaction（或同一把檔案 lock）中進行。
+    """
+
+    @abstractmethod
+    def files(self) -> List[str]:
+        """所有規則檔的相對路徑（排序後）"""
+
+    @abstractmethod
+    def load(self, file: str) -> Optional[List[Field]]:
+        """整個檔案的 Field 樹（可自由修改），檔案不存在時回傳 None"""
+
+    @abstractmethod
+    def save(self, file: str, fields: List[Field]) -> None:
+        """以 fields 取代整個檔案（不存在時建立）"""
+
+    @abstractmethod
+    def delete(self, file: str) -> bool:
+        """刪除檔案，回傳是否存在"""
+
+    @abstractmethod
+    def get_field(self, file: str, path: str) -> Optional[Field]:
+        """單一欄位（含子欄位），唯讀"""
+
+    @abstractmethod
+    def add_field(self, file: str, parent_path: str, field: Field) -> None:
+        """在 parent 底下最後面新增欄位"""
+
+    @abstractmethod
+    def replace_field(self, file: str, parent_path: str, field: Field, force: bool = True) -> bool:
+        """以 key 找到同層欄位並整個覆蓋（含子欄位），回傳是否找到"""
+
+    @abstractmethod
+    def remove_field(self, file: str, parent_path: str, key: str, force: bool = True) -> bool:
+        """移除同層中所有 key 相同的欄位，回傳是否找到"""
+
+    @abstractmethod
+    def references(self, key: str) -> List[Reference]:
+        """condition 中引用 key 的欄位，依 (檔案, path) 排序"""
+
+    def breaking_dependents(self, file: str, removed_paths: Iterable[str]) -> List[dict]:
+        """移除 file 中這些欄位後會失去引用目標的 condition（一起被移除的 condition 不算）"""
+        return breaking_dependents(file, removed_paths, self.references, self.get_field, self.files)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonDirectoryStore(RuleStore):
+    """目前的儲存方式：root 底下的 JSON 檔；修改與 API 共用同一把檔案 write lock"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def _abs(self, file: str) -> str:
+        abs_path = os.path.abspath(os.path.join(self.root, file))
+        if not abs_path.startswith(os.path.join(self.root, "")):
+            raise ValueError(f"{file} is outside of {self.root}")
+        return abs_path
+
+    def files(self) -> List[str]:
+        return sorted(get_tree_index(self.root).files())
+
+    def load(self, file: str) -> Optional[List[Field]]:
+        entry = load_cache_entry(self.root, self._abs(file))
+        return entry.fresh_fields() if entry is not None else None
+
+    def save(self, file: str, fields: List[Field]) -> None:
+        abs_path = self._abs(file)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        with write_coordinator.lock(abs_path):
+            save_json(abs_path, fields)
+
+    def delete(self, file: str) -> bool:
+        abs_path = self._abs(file)
+        with write_coordinator.lock(abs_path):
+            try:
+                os.remove(abs_path)
+            except FileNotFoundError:
+                return False
+            field_cache.invalidate(abs_path)
+        file_events.publish(DELETED, abs_path)
+        return True
+
+    def get_field(self, file: str, path: str) -> Optional[Field]:
+        entry = load_cache_entry(self.root, self._abs(file))
+        if entry is None:
+            return None
+        if entry.compact is not None:
+            node = entry.compact.find(path)
+            return entry.compact.to_field(node) if node >= 0 else None
+        return entry.derive("index", FieldIndex).get(path)
+
+    def add_field(self, file: str, parent_path: str, field: Field) -> None:
+        def mutation(index: FieldIndex) -> bool:
+            if index.siblings(parent_path) is not None and index.has_child(parent_path, field.key):
+                raise ValueError(f"{field.key} already exists")
+            index.add(parent_path, field.clone())
+            return True
+
+        self._mutate(file, mutation)
+
+    def replace_field(self, file: str, parent_path: str, field: Field, force: bool = True) -> bool:
+        def mutation(index: FieldIndex) -> bool:
+            if not force:
+                self._check_removal(file, index, parent_path, field.key, field)
+            return index.replace(parent_path, field.clone()) is not None
+
+        return self._mutate(file, mutation)
+
+    def remove_field(self, file: str, parent_path: str, key: str, force: bool = True) -> bool:
+        def mutation(index: FieldIndex) -> bool:
+            if not force:
+                self._check_removal(file, index, parent_path, key)
+            return index.remove(parent_path, key) is not None
+
+        return self._mutate(file, mutation)
+
+    def _check_removal(self, file: str, index: FieldIndex, parent_path: str, key: str,
+                       replacement: Optional[Field] = None) -> None:
+        old = index.child(parent_path, key)
+        if old is None:
+            return
+        path = FieldIndex.join(parent_path, key)
+        removed = set(field_paths(old, path))
+        if replacement is not None:
+            removed -= set(field_paths(replacement, path))
+        # 其他檔案讀取磁碟上的版本；這個檔案的內容在 lock 中不會改變
+        broken = self.breaking_dependents(file, removed)
+        if broken:
+            raise ReferencedError(broken)
+
+    def _mutate(self, file: str, mutation: Callable[[FieldIndex], bool]) -> bool:
+        """與 write coordinator 相同：持有檔案 lock，載入、修改後整個檔案寫回"""
+        abs_path = self._abs(file)
+        with write_coordinator.lock(abs_path):
+            entry = load_cache_entry(self.root, abs_path)
+            if entry is None:
+                raise KeyError(file)
+            index = FieldIndex(entry.fresh_fields())
+            changed = mutation(index)
+            if changed:
+                save_json(abs_path, index.fields, index)
+            return changed
+
+    def references(self, key: str) -> List[Reference]:
+        result = []
+        for file in self.files():
+            entry = load_cache_entry(self.root, self._abs(file))
+            if entry is not None:
+                # iter_nodes 不會替 compact 項目建立 Field 樹
+                result.extend((file, node.path) for node in entry.iter_nodes() if key in node.references)
+        return sorted(result)
+
+
+def breaking_dependents(file: str, removed_paths: Iterable[str], references: Callable[[str], List[Reference]],
+                        get_field: Callable[[str, str], Optional[Field]],
+                        files: Callable[[], List[str]]) -> List[dict]:
+    """移除 file 中這些欄位後會失去引用目標的 condition（一起被移除的 condition 不算）
+
+    與 DependencyGraph 相同：key 先在同一個檔案中解析，找不到時再找同一資料夾的其他檔案。
+    查詢以參數傳入，SqliteRuleStore 可以在已開始的 transaction 中使用不加 lock 的版本。
+    """
+    removed = set(removed_paths)
+    folder = posixpath.dirname(file)
+    broken = []
+    for path in sorted(removed):
+        referrers = [(source_file, source) for source_file, source in references(path)
+                     if posixpath.dirname(source_file) == folder
+                     and not (source_file == file and source in removed)]
+        if not referrers:
+            continue
+        # 同資料夾的其他檔案也有這個欄位時，其他檔案的 condition 仍找得到目標
+        defined_elsewhere = any(get_field(other, path) is not None for other in files()
+                                if other != file and posixpath.dirname(other) == folder)
+        broken.extend({"file": source_file, "path": source, "key": path} for source_file, source in referrers
+                      if source_file == file or not defined_elsewhere)
+    return broken
+
+
+def copy_rules(source: RuleStore, target: RuleStore, files: Optional[Iterable[str]] = None) -> List[str]:
+    """把 source 的規則檔整個寫入 target（同名檔案會被覆蓋），回傳複製的檔案"""
+    copied = []
+    for file in (files if files is not None else source.files()):
+        fields = source.load(file)
+        if fields is None:
+            continue
+        target.save(file, fields)
+        copied.append(file)
+    return copied
+
+
+def main():
+    from src.utils.sqlite_store import SqliteRuleStore
+
+    parser = argparse.ArgumentParser(description="Copy rule files between a JSON folder and a SQLite store")
+    parser.add_argument("direction", choices=("import", "export"), help="import: JSON -> SQLite, export: SQLite -> JSON")
+    parser.add_argument("--root", required=True, help="rule file folder (BASE_PATH)")
+    parser.add_argument("--db", required=True, help="SQLite database file")
+    parser.add_argument("files", nargs="*", help="relative paths to copy, all files when omitted")
+    args = parser.parse_args()
+
+    json_store = JsonDirectoryStore(args.root)
+    sqlite_store = SqliteRuleStore(args.db)
+    try:
+        source, target = (json_store, sqlite_store) if args.direction == "import" else (sqlite_store, json_store)
+        copied = copy_rules(source, target, args.files or None)
+    finally:
+        sqlite_store.close()
+    print(f"{args.direction}: {len(copied)} file(s)")
+
+
+if __name__ == "__main__":
+    main()
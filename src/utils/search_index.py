@@ -0,0 +1,173 @@
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.utils.field_cache import NodeInfo
+from src.utils.incremental_index import IncrementalFileIndex, get_index
+
+KEY = "key"
+PATH = "path"
+DESCRIPTION = "description"
+TYPE = "type"
+CONDITION = "condition"
+
+# 各種欄位屬性的權重，排名時 key 命中最優先
+KIND_WEIGHTS = {KEY: 3.0, PATH: 2.0, CONDITION: 1.5, TYPE: 1.0, DESCRIPTION: 1.0}
+EXACT, PREFIX, SUBSTRING = 1.0, 0.6, 0.3
+
+_WORD_RE = re.compile(r"\w+")
+_PART_RE = re.compile(r"[\W_]+")
+
+
+def _identifier_terms(value: str) -> Set[str]:
+    """key / dotted path：完整字串加上以 . _ - 等切開的片段"""
+    value = value.lower()
+    terms = {value}
+    terms.update(part for part in _PART_RE.split(value) if part)
+    return terms
+
+
+def _text_terms(value: str) -> Set[str]:
+    return set(_WORD_RE.findall(value.lower()))
+
+
+class SearchDoc:
+    __slots__ = ("file", "path", "key", "description", "types", "terms")
+
+    def __init__(self, file: str, node: NodeInfo):
+        self.file = file
+        self.path = node.path
+        self.key = node.key
+        self.description = node.description or ""
+        self.types = list(node.types)
+        self.terms: List[Tuple[str, str]] = []
+
+
+class SearchIndex(IncrementalFileIndex):
+    """所有規則檔的反向索引
+
+    索引欄位的 key、dotted path、description、型別與 condition 引用的 key。
+    檔案的增量更新見 IncrementalFileIndex，每次查詢前 sync 一次。
+    詞彙表依屬性各自排序，前綴比對使用 bisect，子字串比對只掃描詞彙表。
+    """
+
+    def __init__(self, root):
+        super().__init__(root)
+        self._files: Dict[str, List[int]] = {}
+        self._docs: Dict[int, SearchDoc] = {}
+        self._next_id = 0
+        self._postings: Dict[str, Dict[str, Set[int]]] = {kind: {} for kind in KIND_WEIGHTS}
+        self._vocab: Dict[str, List[str]] = {kind: [] for kind in KIND_WEIGHTS}
+
+    # ===== 維護 =====
+    def _index_file(self, rel_path: str, nodes: List[NodeInfo]) -> None:
+        self._files[rel_path] = [self._add_doc(SearchDoc(rel_path, node), node) for node in nodes]
+
+    def _add_doc(self, doc: SearchDoc, node: NodeInfo) -> int:
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = doc
+
+        terms = [(KEY, term) for term in _identifier_terms(doc.key)]
+        terms += [(PATH, term) for term in _identifier_terms(doc.path)]
+        terms += [(DESCRIPTION, term) for term in _text_terms(doc.description)]
+        terms += [(TYPE, str(type_name).lower()) for type_name in doc.types]
+        for key in node.references:
+            terms += [(CONDITION, term) for term in _identifier_terms(key)]
+
+        doc.terms = list(set(terms))
+        for kind, term in doc.terms:
+            postings = self._postings[kind]
+            doc_set = postings.get(term)
+            if doc_set is None:
+                doc_set = postings[term] = set()
+                insort(self._vocab[kind], term)
+            doc_set.add(doc_id)
+        return doc_id
+
+    def _drop_file(self, rel_path: str) -> None:
+        doc_ids = self._files.pop(rel_path, None)
+        if doc_ids is None:
+            return
+        for doc_id in doc_ids:
+            doc = self._docs.pop(doc_id)
+            for kind, term in doc.terms:
+                postings = self._postings[kind]
+                doc_set = postings[term]
+                doc_set.discard(doc_id)
+                if not doc_set:
+                    del postings[term]
+                    vocab = self._vocab[kind]
+                    del vocab[bisect_left(vocab, term)]
+
+    # ===== 查詢 =====
+    def search(self, query: str, kinds: Optional[Iterable[str]] = None, substring: bool = True,
+               offset: int = 0, limit: int = 20) -> dict:
+        """多個詞以空白分隔，每個詞都要命中；依命中方式（完全 > 前綴 > 子字串）與屬性權重排序"""
+        self.sync()
+        kinds = [kind for kind in (kinds or KIND_WEIGHTS) if kind in KIND_WEIGHTS]
+        tokens = query.lower().split()
+
+        with self._lock:
+            scores: Optional[Dict[int, float]] = None
+            matched: Dict[int, Set[str]] = {}
+            for token in tokens:
+                token_scores: Dict[int, float] = {}
+                for kind in kinds:
+                    weight = KIND_WEIGHTS[kind]
+                    for term, quality in self._match_terms(kind, token, substring):
+                        score = weight * quality
+                        for doc_id in self._postings[kind][term]:
+                            if score > token_scores.get(doc_id, 0.0):
+                                token_scores[doc_id] = score
+                            matched.setdefault(doc_id, set()).add(kind)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {doc_id: score + token_scores[doc_id]
+                              for doc_id, score in scores.items() if doc_id in token_scores}
+                if not scores:
+                    break
+
+            ranked = sorted((scores or {}).items(),
+                            key=lambda item: (-item[1], self._docs[item[0]].file, self._docs[item[0]].path))
+            items = []
+            for doc_id, score in ranked[offset:offset + limit]:
+                doc = self._docs[doc_id]
+                items.append({
+                    "file": doc.file,
+                    "path": doc.path,
+                    "key": doc.key,
+                    "description": doc.description,
+                    "types": doc.types,
+                    "score": round(score, 3),
+                    "matched": sorted(matched[doc_id]),
+                })
+        return {"total": len(ranked), "offset": offset, "limit": limit, "items": items}
+
+    def _match_terms(self, kind: str, token: str, substring: bool):
+        vocab = self._vocab[kind]
+        start = bisect_left(vocab, token)
+        end = start
+        while end < len(vocab) and vocab[end].startswith(token):
+            yield vocab[end], EXACT if vocab[end] == token else PREFIX
+            end += 1
+        if substring:
+            for n, term in enumerate(vocab):
+                if start <= n < end:
+                    continue
+                if token in term:
+                    yield term, SUBSTRING
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "fields": len(self._docs),
+                "terms": sum(len(vocab) for vocab in self._vocab.values()),
+                "reindexed": self.reindexed,
+            }
+
+
+def get_search_index(root) -> SearchIndex:
+    return get_index(SearchIndex, root)
@@ -0,0 +1,186 @@
+"""規則模型（Field / Condition / ConditionField / PrecheckFile）專用的 JSON 序列化
+
+CustomEncoder 經由 default 為每個模型建立一個 dict，而且 indent=4 時 json 模組只能使用純 Python 的 encoder。
+這裡依模型的欄位直接組出字串（字串跳脫仍使用 json 的 C 實作），輸出與原本的寫法逐 byte 相同：
+- dumps_pretty：寫入規則檔，等同 json.dumps(data, cls=CustomEncoder, indent=4).encode("utf-8")
+- dumps_compact：HTTP 回應，等同 FastAPI 以 jsonable_encoder + JSONResponse 輸出（Field 含 field_type / item_type）
+不認得的型別交給原本的寫法處理，結果一樣只是比較慢。
+"""
+import json
+from json.encoder import encode_basestring, encode_basestring_ascii
+
+from src.models import Condition, CustomEncoder, Field
+from src.models.condition import ConditionField
+from src.models.fileType import PrecheckFile
+
+# 規則檔中 Field 的欄位（CustomEncoder），API 回應另外包含 field_type 與 item_type
+_FILE_KEYS = ("key", "description", "multi_type", "item_multi_type", "regex", "regex_enabled", "required",
+              "condition", "children")
+_API_KEYS = ("key", "description", "field_type", "multi_type", "item_type", "item_multi_type", "regex",
+             "regex_enabled", "required", "condition", "children")
+
+
+class _Writer:
+    def __init__(self, indent, ensure_ascii: bool, keys, reference):
+        self.indent = indent
+        self.string = encode_basestring_ascii if ensure_ascii else encode_basestring
+        self.colon = ": " if indent is not None else ":"
+        self.keys = keys
+        self.api = keys is _API_KEYS
+        # 第一次 TypeError 時改用原本的寫法輸出整份資料
+        self.reference = reference
+        # level -> 換行與縮排 / Field 各欄位前綴；重複計算沒有影響，不需要 lock
+        self._newlines = {}
+        self._prefixes = {}
+
+    def dumps(self, data) -> str:
+        out = []
+        try:
+            self.value(data, 0, out)
+        except TypeError:
+            return self.reference(data)
+        return "".join(out)
+
+    def newline(self, level: int) -> str:
+        newline = self._newlines.get(level)
+        if newline is None:
+            newline = "\n" + " " * (self.indent * level) if self.indent is not None else ""
+            self._newlines[level] = newline
+        return newline
+
+    def prefixes(self, level: int) -> tuple:
+        """Field 每個欄位值之前的字串，最後一個元素為結尾的 }"""
+        prefixes = self._prefixes.get(level)
+        if prefixes is None:
+            inner = self.newline(level + 1)
+            prefixes = tuple(("{" if n == 0 else ",") + f'{inner}"{key}"{self.colon}'
+                             for n, key in enumerate(self.keys)) + (self.newline(level) + "}",)
+            self._prefixes[level] = prefixes
+        return prefixes
+
+    def value(self, value, level: int, out: list) -> None:
+        kind = type(value)
+        if kind is str:
+            out.append(self.string(value))
+        elif value is None:
+            out.append("null")
+        elif value is True:
+            out.append("true")
+        elif value is False:
+            out.append("false")
+        elif kind is int:
+            out.append(int.__repr__(value))
+        elif kind is Field:
+            self.field(value, level, out)
+        elif kind is list:
+            self.array(value, level, out)
+        elif kind is dict:
+            self.object(value, level, out)
+        elif kind is Condition:
+            self.object({"logical": value.logical, "conditions": value.conditions}, level, out)
+        elif kind is ConditionField:
+            self.object({"key": value.key, "operator": value.operator, "value": value.value}, level, out)
+        elif kind is PrecheckFile:
+            self.object({"name": value.name, "file_type": value.file_type.value}, level, out)
+        else:
+            out.append(self.fallback(value, level))
+
+    def field(self, field: Field, level: int, out: list) -> None:
+        prefixes = self.prefixes(level)
+        string = self.string
+        inner = level + 1
+        regex = field.regex
+        out.append(prefixes[0] + string(field.key) + prefixes[1] + string(field.description) + prefixes[2])
+        if self.api:
+            self.value(field.field_type, inner, out)
+            out.append(prefixes[3])
+            self.strings(field.multi_type, inner, out)
+            out.append(prefixes[4])
+            self.value(field.item_type, inner, out)
+            prefixes = prefixes[3:]
+        else:
+            self.strings(field.multi_type, inner, out)
+            prefixes = prefixes[1:]
+        # 以下 prefixes[2] 起依序為 item_multi_type, regex, regex_enabled, required, condition, children, 結尾
+        out.append(prefixes[2])
+        self.strings(field.item_multi_type, inner, out)
+        out.append(prefixes[3] + ("null" if regex is None else string(regex)) + prefixes[4])
+        self.value(field.regex_enabled, inner, out)
+        out.append(prefixes[5])
+        self.value(field.required, inner, out)
+        out.append(prefixes[6])
+        self.value(field.condition, inner, out)
+        out.append(prefixes[7])
+        self.array(field.children, inner, out)
+        out.append(prefixes[8])
+
+    def strings(self, values: list, level: int, out: list) -> None:
+        """multi_type 等字串陣列"""
+        if type(values) is not list or not values:
+            self.value(values, level, out)
+            return
+        inner = self.newline(level + 1)
+        string = self.string
+        out.append("[" + inner + ("," + inner).join([string(v) for v in values]) + self.newline(level) + "]")
+
+    def array(self, values: list, level: int, out: list) -> None:
+        if not values:
+            out.append("[]")
+            return
+        inner = self.newline(level + 1)
+        separator = "," + inner
+        out.append("[" + inner)
+        first = True
+        for value in values:
+            if not first:
+                out.append(separator)
+            first = False
+            self.value(value, level + 1, out)
+        out.append(self.newline(level) + "]")
+
+    def object(self, values: dict, level: int, out: list) -> None:
+        if not values:
+            out.append("{}")
+            return
+        inner = self.newline(level + 1)
+        separator = "," + inner
+        out.append("{" + inner)
+        first = True
+        for key, value in values.items():
+            if type(key) is not str:
+                raise TypeError("non-string key")
+            out.append(("" if first else separator) + self.string(key) + self.colon)
+            first = False
+            self.value(value, level + 1, out)
+        out.append(self.newline(level) + "}")
+
+    def fallback(self, value, level: int) -> str:
+        text = self.reference(value)
+        return text.replace("\n", self.newline(level)) if self.indent is not None and level else text
+
+
+def _pretty_reference(data) -> str:
+    return json.dumps(data, cls=CustomEncoder, indent=4)
+
+
+def _compact_reference(data) -> str:
+    # 只有不認得的型別才會用到，json_loader 等不需要為此載入 fastapi
+    from fastapi.encoders import jsonable_encoder
+
+    # 與 starlette JSONResponse.render 相同的參數
+    return json.dumps(jsonable_encoder(data), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+
+_pretty = _Writer(4, True, _FILE_KEYS, _pretty_reference)
+_compact = _Writer(None, False, _API_KEYS, _compact_reference)
+
+
+def dumps_pretty(data) -> bytes:
+    """寫入規則檔的格式"""
+    return _pretty.dumps(data).encode("utf-8")
+
+
+def dumps_compact(data) -> bytes:
+    """HTTP 回應的格式"""
+    return _compact.dumps(data).encode("utf-8")
+
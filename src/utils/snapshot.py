@@ -0,0 +1,133 @@
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from typing import Optional
+
+from src.utils.compact_tree import CompactTree
+from src.utils.file_events import DELETED, file_events
+from src.utils.file_version import FileSignature
+from src.utils.trusted_content import sidecar_path
+
+# 設為 0 / false 時不讀也不寫快照
+SNAPSHOTS_ENABLED = os.environ.get("FIELD_SNAPSHOTS", "1").lower() not in ("0", "false", "no", "off")
+# 節點數達到這個數量的檔案才寫快照，小檔案直接解析 JSON 已經夠快
+SNAPSHOT_MIN_NODES = int(os.environ.get("FIELD_SNAPSHOT_MIN_NODES", 1000))
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# marshal 格式依 Python 版本而定，版本不同時視為過期
+_MAGIC = b"PRSN" + struct.pack("<BBH", sys.version_info[0], sys.version_info[1], 1)
+# magic, mtime_ns, size, inode, 內容 hash（content_digest 的 hex）, 快照內容的 crc32
+_HEADER = struct.Struct("<8sQQQ32sI")
+
+
+class SnapshotStore:
+    """大型規則檔解析後 CompactTree 的二進位快照，存放在 .cache/<檔名>.snapshot
+
+    以原始檔的版本（mtime / size / inode）與內容 hash 作為 key：
+    - 版本相同時不必讀取原始檔，以 mmap 直接載入快照
+    - 版本不同但內容 hash 相同（例如部署時重新複製檔案）時仍可使用，並更新快照中記錄的版本
+    - 其他情況視為過期，回到解析 JSON，之後再寫入新的快照
+    快照讀寫失敗都只會回到原本的解析流程。
+    """
+
+    def __init__(self, enabled: bool = SNAPSHOTS_ENABLED, min_nodes: int = SNAPSHOT_MIN_NODES):
+        self.enabled = enabled
+        self.min_nodes = min_nodes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        file_events.subscribe(self._on_file_event)
+
+    def load(self, file_path, signature: FileSignature, digest: Optional[str] = None) -> Optional[CompactTree]:
+        """版本相同，或給了 digest 且內容 hash 相同時回傳快照中的樹，否則回傳 None"""
+        if not self.enabled:
+            return None
+        path = sidecar_path(file_path, SNAPSHOT_SUFFIX)
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    tree = self._read(path, data, signature, digest)
+        except (OSError, ValueError, EOFError, TypeError, struct.error):
+            tree = None
+        with self._lock:
+            if tree is not None:
+                self.hits += 1
+            elif digest is None:
+                # 第一次（只比對版本）查詢的結果才計入，避免同一次載入算兩次
+                self.misses += 1
+        return tree
+
+    def _read(self, path: str, data, signature: FileSignature, digest: Optional[str]) -> Optional[CompactTree]:
+        magic, mtime_ns, size, inode, stored_digest, checksum = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            return None
+        same_version = (mtime_ns, size, inode) == (signature.mtime_ns, signature.size, signature.inode)
+        if not same_version and (digest is None or size != signature.size or stored_digest != digest.encode()):
+            return None
+        with memoryview(data) as view, view[_HEADER.size:] as payload:
+            if zlib.crc32(payload) != checksum:
+                return None
+            tree = CompactTree.from_snapshot(marshal.loads(payload))
+        if not same_version:
+            self._write_header(path, signature, stored_digest, checksum)
+        return tree
+
+    def save(self, file_path, signature: FileSignature, digest: str, tree: CompactTree) -> None:
+        if not self.enabled or len(tree) < self.min_nodes:
+            return
+        path = sidecar_path(file_path, SNAPSHOT_SUFFIX)
+        payload = marshal.dumps(tree.to_snapshot())
+        header = _HEADER.pack(_MAGIC, signature.mtime_ns, signature.size, signature.inode, digest.encode(),
+                              zlib.crc32(payload))
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self.writes += 1
+
+    def forget(self, file_path) -> None:
+        try:
+            os.unlink(sidecar_path(file_path, SNAPSHOT_SUFFIX))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write_header(path: str, signature: FileSignature, digest: bytes, checksum: int) -> None:
+        """內容沒變、只有版本改變時，直接覆寫 header 中的版本"""
+        try:
+            with open(path, "r+b") as f:
+                f.write(_HEADER.pack(_MAGIC, signature.mtime_ns, signature.size, signature.inode, digest, checksum))
+        except OSError:
+            pass
+
+    def _on_file_event(self, event: str, path: str) -> None:
+        # 刪除資料夾時 .cache 也一起被刪除
+        if event == DELETED:
+            self.forget(path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+
+snapshot_store = SnapshotStore()
@@ -0,0 +1,321 @@
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.models import Field
+from src.utils.dependency_graph import field_paths
+from src.utils.rule_store import Reference, ReferencedError, RuleStore, breaking_dependents
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    duplicate_keys INTEGER NOT NULL DEFAULT 0   -- 有同層 key 重複時 path 不唯一，查找需逐層進行
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    parent_id INTEGER NOT NULL,         -- 第一層為 0
+    position INTEGER NOT NULL,          -- 同層中的順序
+    path TEXT NOT NULL,
+    key TEXT NOT NULL,
+    description TEXT NOT NULL,
+    multi_type TEXT NOT NULL,           -- JSON array
+    item_multi_type TEXT NOT NULL,      -- JSON array
+    regex TEXT,
+    regex_enabled INTEGER NOT NULL,
+    required INTEGER NOT NULL,
+    condition TEXT                      -- JSON，沒有 condition 時為 NULL
+);
+CREATE INDEX IF NOT EXISTS nodes_path ON nodes (file, path);
+CREATE INDEX IF NOT EXISTS nodes_children ON nodes (file, parent_id, position);
+
+CREATE TABLE IF NOT EXISTS condition_refs (
+    node_id INTEGER NOT NULL,
+    ref_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS condition_refs_key ON condition_refs (ref_key);
+CREATE INDEX IF NOT EXISTS condition_refs_node ON condition_refs (node_id);
+"""
+
+_COLUMNS = "id, parent_id, key, description, multi_type, item_multi_type, regex, regex_enabled, required, condition"
+
+# 某個節點與它所有子孫的 id
+_SUBTREE = """
+WITH RECURSIVE subtree(id) AS (
+    SELECT :id
+    UNION ALL
+    SELECT nodes.id FROM nodes JOIN subtree ON nodes.parent_id = subtree.id WHERE nodes.file = :file
+)
+SELECT id FROM subtree
+"""
+
+
+class SqliteRuleStore(RuleStore):
+    """以 SQLite 保存規則：每個欄位一列，以 (file, path) 與 (file, parent_id, position) 建立索引
+
+    - 單一欄位的查詢只讀出這棵子樹；新增 / 修改 / 刪除葉節點都只動到一列（加上 condition 引用），
+      不需要像 JSON 檔一樣整個讀入再寫回
+    - condition 引用的 key 另外存在 condition_refs，可直接查詢被誰引用
+    - 同層 key 重複（手動編輯的檔案）時與 FieldIndex 相同，以第一個為準，匯出時仍保留全部
+    - 同一個連線以 lock 序列化，每個修改都是一個 transaction；force=False 時引用檢查也在同一個 transaction 中
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ===== 查詢 =====
+    def files(self) -> List[str]:
+        with self._lock:
+            return self._files()
+
+    def load(self, file: str) -> Optional[List[Field]]:
+        with self._lock:
+            if not self._file_exists(file):
+                return None
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM nodes WHERE file = ? ORDER BY parent_id, position", (file,)).fetchall()
+        return _build_tree(rows, 0)
+
+    def get_field(self, file: str, path: str) -> Optional[Field]:
+        with self._lock:
+            return self._get_field(file, path)
+
+    def references(self, key: str) -> List[Reference]:
+        with self._lock:
+            return self._references(key)
+
+    def breaking_dependents(self, file: str, removed_paths) -> List[dict]:
+        with self._lock:
+            return breaking_dependents(file, removed_paths, self._references, self._get_field, self._files)
+
+    # ===== 修改 =====
+    def save(self, file: str, fields: List[Field]) -> None:
+        with self._lock, self._transaction():
+            self._delete_nodes(file)
+            self._conn.execute("INSERT OR REPLACE INTO files (name, duplicate_keys) VALUES (?, 0)", (file,))
+            self._insert(file, 0, "", fields)
+
+    def delete(self, file: str) -> bool:
+        with self._lock, self._transaction():
+            self._delete_nodes(file)
+            return self._conn.execute("DELETE FROM files WHERE name = ?", (file,)).rowcount > 0
+
+    def add_field(self, file: str, parent_path: str, field: Field) -> None:
+        with self._lock, self._transaction():
+            parent_id = self._require_parent(file, parent_path)
+            if self._children_with_key(file, parent_id, field.key):
+                raise ValueError(f"{field.key} already exists")
+            position = self._conn.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM nodes WHERE file = ? AND parent_id = ?",
+                (file, parent_id)).fetchone()[0]
+            self._insert(file, parent_id, parent_path, [field], position)
+
+    def replace_field(self, file: str, parent_path: str, field: Field, force: bool = True) -> bool:
+        with self._lock, self._transaction():
+            parent_id = self._require_parent(file, parent_path)
+            matches = self._children_with_key(file, parent_id, field.key)
+            if not matches:
+                return False
+            if not force:
+                self._check_removal(file, _join(parent_path, field.key), field)
+            # 沿用原本的 id 與位置，只更新這一列；子欄位整個換掉
+            node_id = matches[0]
+            self._delete_subtree(file, node_id, keep_root=True)
+            self._conn.execute(
+                "UPDATE nodes SET description = ?, multi_type = ?, item_multi_type = ?, regex = ?, "
+                "regex_enabled = ?, required = ?, condition = ? WHERE id = ?",
+                (*_values(field)[1:], node_id))
+            self._conn.executemany("INSERT INTO condition_refs (node_id, ref_key) VALUES (?, ?)",
+                                   _references(node_id, field))
+            self._insert(file, node_id, _join(parent_path, field.key), field.children)
+            return True
+
+    def remove_field(self, file: str, parent_path: str, key: str, force: bool = True) -> bool:
+        with self._lock, self._transaction():
+            parent_id = self._require_parent(file, parent_path)
+            matches = self._children_with_key(file, parent_id, key)
+            if matches and not force:
+                self._check_removal(file, _join(parent_path, key))
+            for node_id in matches:
+                self._delete_subtree(file, node_id)
+            return bool(matches)
+
+    # ===== 內部（呼叫前需持有 lock）=====
+    def _files(self) -> List[str]:
+        return [row[0] for row in self._conn.execute("SELECT name FROM files ORDER BY name")]
+
+    def _get_field(self, file: str, path: str) -> Optional[Field]:
+        node_id = self._find(file, path)
+        if not node_id:
+            return None
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM nodes WHERE id IN ({_SUBTREE}) ORDER BY parent_id, position",
+            {"id": node_id, "file": file}).fetchall()
+        # 子樹中只有根節點的 parent 不在子樹內
+        return _build_tree(rows, next(row[1] for row in rows if row[0] == node_id))[0]
+
+    def _references(self, key: str) -> List[Reference]:
+        return [(file, path) for file, path in self._conn.execute(
+            "SELECT DISTINCT nodes.file, nodes.path FROM condition_refs "
+            "JOIN nodes ON nodes.id = condition_refs.node_id "
+            "WHERE condition_refs.ref_key = ? ORDER BY nodes.file, nodes.path", (key,))]
+
+    def _check_removal(self, file: str, path: str, replacement: Optional[Field] = None) -> None:
+        """在目前的 transaction 中檢查移除 path（或以 replacement 覆蓋）會不會讓其他 condition 失去目標"""
+        removed = set(field_paths(self._get_field(file, path), path))
+        if replacement is not None:
+            removed -= set(field_paths(replacement, path))
+        broken = breaking_dependents(file, removed, self._references, self._get_field, self._files)
+        if broken:
+            raise ReferencedError(broken)
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+    def _file_exists(self, file: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM files WHERE name = ?", (file,)).fetchone() is not None
+
+    def _find(self, file: str, path: str) -> Optional[int]:
+        """path 對應的節點 id（第一層的 parent 為 0），不存在時回傳 None"""
+        row = self._conn.execute("SELECT duplicate_keys FROM files WHERE name = ?", (file,)).fetchone()
+        if row is None:
+            return None
+        if not path:
+            return 0
+        if not row[0]:
+            found = self._conn.execute("SELECT id FROM nodes WHERE file = ? AND path = ?", (file, path)).fetchone()
+            return found[0] if found is not None else None
+        # 有重複 key 時逐層找同層的第一個
+        node_id = 0
+        for key in path.split("."):
+            matches = self._children_with_key(file, node_id, key)
+            if not matches:
+                return None
+            node_id = matches[0]
+        return node_id
+
+    def _require_parent(self, file: str, parent_path: str) -> int:
+        parent_id = self._find(file, parent_path)
+        if parent_id is None:
+            raise KeyError(parent_path)
+        return parent_id
+
+    def _children_with_key(self, file: str, parent_id: int, key: str) -> List[int]:
+        return [row[0] for row in self._conn.execute(
+            "SELECT id FROM nodes WHERE file = ? AND parent_id = ? AND key = ? ORDER BY position",
+            (file, parent_id, key))]
+
+    def _insert(self, file: str, parent_id: int, parent_path: str, fields: List[Field], position: int = 0) -> None:
+        """以前序插入 fields（含子欄位），第一個欄位的位置為 position
+
+        在 transaction 中先取得目前最大的 id 自行編號，整批以 executemany 寫入。
+        """
+        next_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM nodes").fetchone()[0]
+        rows, refs = [], []
+        stack = [(parent_id, position + n, _join(parent_path, field.key), field)
+                 for n, field in reversed(list(enumerate(fields)))]
+        while stack:
+            parent, child_position, path, field = stack.pop()
+            node_id = next_id
+            next_id += 1
+            rows.append((node_id, file, parent, child_position, path, *_values(field)))
+            refs.extend(_references(node_id, field))
+            stack.extend((node_id, n, f"{path}.{child.key}", child)
+                         for n, child in reversed(list(enumerate(field.children))))
+        self._conn.executemany(
+            "INSERT INTO nodes (id, file, parent_id, position, path, key, description, multi_type, item_multi_type, "
+            "regex, regex_enabled, required, condition) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._conn.executemany("INSERT INTO condition_refs (node_id, ref_key) VALUES (?, ?)", refs)
+        # 新增的子樹只會在內部重複（同層重複的新增已先被拒絕）
+        if len({row[4] for row in rows}) != len(rows):
+            self._conn.execute("UPDATE files SET duplicate_keys = 1 WHERE name = ?", (file,))
+
+    def _delete_subtree(self, file: str, node_id: int, keep_root: bool = False) -> None:
+        ids = [row[0] for row in self._conn.execute(_SUBTREE, {"id": node_id, "file": file})]
+        self._conn.executemany("DELETE FROM condition_refs WHERE node_id = ?", [(i,) for i in ids])
+        if keep_root:
+            ids.remove(node_id)
+        self._conn.executemany("DELETE FROM nodes WHERE id = ?", [(i,) for i in ids])
+
+    def _delete_nodes(self, file: str) -> None:
+        self._conn.execute(
+            "DELETE FROM condition_refs WHERE node_id IN (SELECT id FROM nodes WHERE file = ?)", (file,))
+        self._conn.execute("DELETE FROM nodes WHERE file = ?", (file,))
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT，發生例外時 ROLLBACK"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+        return False
+
+
+def _join(parent_path: str, key: str) -> str:
+    return f"{parent_path}.{key}" if parent_path else key
+
+
+def _references(node_id: int, field: Field) -> List[Tuple[int, str]]:
+    if field.condition is None:
+        return []
+    return [(node_id, key) for key in dict.fromkeys(c.key for c in field.condition.conditions)]
+
+
+def _values(field: Field) -> Tuple:
+    """(key, description, multi_type, item_multi_type, regex, regex_enabled, required, condition)"""
+    condition = None
+    if field.condition is not None:
+        condition = json.dumps({
+            "logical": field.condition.logical,
+            "conditions": [{"key": c.key, "operator": c.operator, "value": c.value}
+                           for c in field.condition.conditions],
+        })
+    return (field.key, field.description, json.dumps(field.multi_type), json.dumps(field.item_multi_type),
+            field.regex, int(field.regex_enabled), int(field.required), condition)
+
+
+def _build_tree(rows, root_parent: int) -> List[Field]:
+    """rows 依 (parent_id, position) 排序，組回 Field 樹；資料寫入前已驗證過，不再經過 pydantic"""
+    children: Dict[int, List[dict]] = {}
+    # 型別陣列的種類很少，同樣的字串只解析一次（from_dict_trusted 會再複製成新的 list）
+    types: Dict[str, List[str]] = {}
+    for node_id, parent_id, key, description, multi_type, item_multi_type, regex, regex_enabled, required, \
+            condition in rows:
+        parsed_type = types.get(multi_type)
+        if parsed_type is None:
+            parsed_type = types[multi_type] = json.loads(multi_type)
+        parsed_item_type = types.get(item_multi_type)
+        if parsed_item_type is None:
+            parsed_item_type = types[item_multi_type] = json.loads(item_multi_type)
+        item = {
+            "key": key,
+            "description": description,
+            "multi_type": parsed_type,
+            "item_multi_type": parsed_item_type,
+            "regex": regex,
+            "regex_enabled": bool(regex_enabled),
+            "required": bool(required),
+            "condition": json.loads(condition) if condition is not None else None,
+            "children": children.setdefault(node_id, []),
+        }
+        children.setdefault(parent_id, []).append(item)
+    return [Field.from_dict_trusted(item) for item in children.get(root_parent, [])]
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from src.utils.file_events import DELETED, file_events
+
+# 與規則檔同目錄的隱藏資料夾，存放服務自己產生的輔助檔案
+CACHE_DIR = ".cache"
+TRUST_SUFFIX = ".trusted"
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def sidecar_path(file_path, suffix: str) -> str:
+    directory, name = os.path.split(os.path.abspath(file_path))
+    return os.path.join(directory, CACHE_DIR, name + suffix)
+
+
+class TrustStore:
+    """記錄由 save_json 寫出（內容來自已驗證的 Field）的檔案內容 hash
+
+    載入時內容 hash 相同代表檔案沒有在服務外被修改，可以跳過 pydantic 驗證。
+    hash 同時寫到 .cache/ 底下的 sidecar 檔，重新啟動後仍然有效；
+    sidecar 寫入失敗只會讓下次載入走完整驗證。
+    """
+
+    def __init__(self):
+        self._digests: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        file_events.subscribe(self._on_file_event)
+
+    def remember(self, file_path, digest: str) -> None:
+        key = os.path.abspath(file_path)
+        with self._lock:
+            self._digests[key] = digest
+        _write_sidecar(sidecar_path(key, TRUST_SUFFIX), digest)
+
+    def forget(self, file_path) -> None:
+        key = os.path.abspath(file_path)
+        with self._lock:
+            self._digests.pop(key, None)
+        try:
+            os.unlink(sidecar_path(key, TRUST_SUFFIX))
+        except OSError:
+            pass
+
+    def is_trusted(self, file_path, digest: str) -> bool:
+        key = os.path.abspath(file_path)
+        with self._lock:
+            known = self._digests.get(key)
+        if known is None:
+            known = _read_sidecar(sidecar_path(key, TRUST_SUFFIX))
+            if known is not None:
+                with self._lock:
+                    self._digests[key] = known
+        return known == digest
+
+    def _on_file_event(self, event: str, path: str) -> None:
+        if event != DELETED:
+            return
+        if path in self._digests:
+            self.forget(path)
+            return
+        # 刪除資料夾時 sidecar 也一起被刪除，只需清掉記憶體中的紀錄
+        prefix = os.path.join(path, "")
+        with self._lock:
+            for key in [k for k in self._digests if k.startswith(prefix)]:
+                del self._digests[key]
+
+
+def _read_sidecar(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_sidecar(path: str, content: str) -> None:
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+trust_store = TrustStore()
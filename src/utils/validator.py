@@ -0,0 +1,218 @@
+import ipaddress
+import re
+from typing import Callable, List, Optional, Tuple
+
+from src.models import Field, FieldTypes, Violation
+from src.utils.condition_engine import ConditionCompiler
+from src.utils.field_index import FieldIndex
+from src.utils.regex_registry import CompiledRegex, InvalidRegexError, regex_registry
+
+_MISSING = object()
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+# ===== 型別檢查 =====
+def _is_string(value) -> bool:
+    return isinstance(value, str)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_list(value) -> bool:
+    return isinstance(value, list)
+
+
+def _is_bool(value) -> bool:
+    return isinstance(value, bool)
+
+
+def _is_email(value) -> bool:
+    return isinstance(value, str) and _EMAIL_RE.match(value) is not None
+
+
+def _is_ip(value) -> bool:
+    if not isinstance(value, str):
+        return False
+    try:
+        ipaddress.ip_interface(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_object(value) -> bool:
+    return isinstance(value, dict)
+
+
+TYPE_CHECKERS = {
+    FieldTypes.String: _is_string,
+    FieldTypes.Number: _is_number,
+    FieldTypes.List: _is_list,
+    FieldTypes.Email: _is_email,
+    FieldTypes.Bool: _is_bool,
+    FieldTypes.IP: _is_ip,
+    FieldTypes.Object: _is_object,
+}
+
+
+# ===== 規則編譯 =====
+class CompiledRule:
+    __slots__ = ("key", "path", "required", "types", "checkers", "item_types", "item_checkers",
+                 "regex", "condition", "child_start", "child_end")
+
+    def __init__(self, field: Field, path: str):
+        self.key = field.key
+        self.path = path
+        self.required = field.required
+        self.types: Tuple[str, ...] = ()
+        self.checkers: Tuple[Callable, ...] = ()
+        self.item_types: Tuple[str, ...] = ()
+        self.item_checkers: Tuple[Callable, ...] = ()
+        self.regex: Optional[CompiledRegex] = None
+        self.condition: Optional[Callable[[list, list], bool]] = None
+        self.child_start = 0
+        self.child_end = 0
+
+
+class ValidationPlan:
+    """由 Field 樹編譯出的驗證計畫
+
+    規則依層展開成一個 list，每條規則的直接子規則位於 rules[child_start:child_end]，
+    驗證時以 stack 走訪，不需要再遞迴 pydantic 模型。
+    條件引用的 key 在每份文件開始驗證時統一解析一次。
+    """
+
+    def __init__(self, fields: List[Field]):
+        self.rules: List[CompiledRule] = []
+        self.errors: List[Violation] = []
+        self._conditions = ConditionCompiler(FieldIndex(fields))
+        self._pending_conditions = []
+        self.root_end = self._compile_level(fields, "")
+        self._compile_conditions()
+
+    def _compile_level(self, fields: List[Field], prefix: str) -> int:
+        start = len(self.rules)
+        level = [self._compile_rule(field, prefix + field.key) for field in fields]
+        self.rules.extend(level)
+        for field, rule in zip(fields, level):
+            if field.children:
+                rule.child_start = len(self.rules)
+                rule.child_end = self._compile_level(field.children, rule.path + ".")
+        return start + len(level)
+
+    def _compile_rule(self, field: Field, path: str) -> CompiledRule:
+        rule = CompiledRule(field, path)
+        rule.types, rule.checkers = self._compile_types(field.multi_type, path)
+        if FieldTypes.List in field.multi_type:
+            rule.item_types, rule.item_checkers = self._compile_types(field.item_multi_type, path)
+
+        if field.regex_enabled and field.regex:
+            try:
+                rule.regex = regex_registry.compile(field.regex)
+            except InvalidRegexError as e:
+                self._rule_error(path, "invalid_regex", str(e))
+            else:
+                if rule.regex.risk is not None:
+                    self._rule_error(path, "unsafe_regex",
+                                     f"regex '{field.regex}' may backtrack catastrophically ({rule.regex.risk}), "
+                                     f"long values are not checked")
+
+        if field.condition is not None and field.condition.conditions:
+            self._conditions.register(field.condition)
+            self._pending_conditions.append((rule, field.condition))
+        return rule
+
+    def _compile_conditions(self):
+        self.resolver = self._conditions.build_resolver()
+        for rule, condition in self._pending_conditions:
+            errors = len(self._conditions.errors)
+            try:
+                rule.condition = self._conditions.compile(condition)
+            except ValueError as e:
+                self._rule_error(rule.path, "invalid_condition", str(e))
+            for key, message in self._conditions.errors[errors:]:
+                self._rule_error(rule.path, "invalid_condition", f"{key}: {message}")
+        del self._pending_conditions
+
+    def _compile_types(self, type_names: List[str], path: str):
+        types, checkers = [], []
+        for type_name in type_names:
+            checker = TYPE_CHECKERS.get(type_name)
+            if checker is None:
+                self._rule_error(path, "unknown_type", f"unknown type '{type_name}'")
+                continue
+            types.append(type_name)
+            checkers.append(checker)
+        return tuple(types), tuple(checkers)
+
+    def _rule_error(self, path: str, code: str, message: str):
+        self.errors.append(Violation(path=path, code=code, message=message))
+
+    # ===== 驗證 =====
+    def validate(self, document: dict) -> List[Violation]:
+        """驗證一份設定檔，回傳所有違規項目"""
+        violations: List[Violation] = []
+        rules = self.rules
+        raw, coerced = self.resolver.resolve(document)
+        stack = [(0, self.root_end, document, "")]
+
+        while stack:
+            start, end, container, prefix = stack.pop()
+            for i in range(start, end):
+                rule = rules[i]
+                path = prefix + rule.key
+                value = container.get(rule.key, _MISSING)
+
+                if value is _MISSING or value is None:
+                    if rule.required or (rule.condition is not None and rule.condition(raw, coerced)):
+                        violations.append(Violation(path=path, code="required", message="field is required"))
+                    continue
+
+                if rule.checkers and not any(check(value) for check in rule.checkers):
+                    violations.append(Violation(
+                        path=path, code="type",
+                        message=f"expected {' / '.join(rule.types)}, got {type(value).__name__}"))
+                    continue
+
+                is_list = isinstance(value, list)
+                if is_list and rule.item_checkers:
+                    for n, item in enumerate(value):
+                        if not any(check(item) for check in rule.item_checkers):
+                            violations.append(Violation(
+                                path=f"{path}[{n}]", code="item_type",
+                                message=f"expected {' / '.join(rule.item_types)}, got {type(item).__name__}"))
+
+                if rule.regex is not None:
+                    self._check_regex(rule, path, value, violations)
+
+                if rule.child_start != rule.child_end:
+                    if isinstance(value, dict):
+                        stack.append((rule.child_start, rule.child_end, value, path + "."))
+                    elif is_list:
+                        # 反向放入 stack，讓輸出依照 list 順序
+                        for n in range(len(value) - 1, -1, -1):
+                            item = value[n]
+                            if isinstance(item, dict):
+                                stack.append((rule.child_start, rule.child_end, item, f"{path}[{n}]."))
+
+        return violations
+
+    @staticmethod
+    def _check_regex(rule: CompiledRule, path: str, value, violations: List[Violation]):
+        if isinstance(value, str):
+            ValidationPlan._match_regex(rule.regex, path, value, violations)
+        elif isinstance(value, list):
+            for n, item in enumerate(value):
+                if isinstance(item, str):
+                    ValidationPlan._match_regex(rule.regex, f"{path}[{n}]", item, violations)
+
+    @staticmethod
+    def _match_regex(regex: CompiledRegex, path: str, value: str, violations: List[Violation]):
+        matched = regex.search(value)
+        if matched is None:
+            violations.append(Violation(
+                path=path, code="regex_budget", message=f"value is too long to check against '{regex.pattern}'"))
+        elif not matched:
+            violations.append(Violation(path=path, code="regex", message=f"value does not match '{regex.pattern}'"))
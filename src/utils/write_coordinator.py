@@ -0,0 +1,230 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Callable, Dict, List, Optional
+
+from src.utils.async_storage import write_executor
+from src.utils.field_index import FieldIndex
+from src.utils.file_version import etag_matches_strong, make_etag
+from src.utils.json_loader import load_cache_entry, save_json
+from src.utils.metrics import metrics
+
+# 同一個檔案在這段時間內排隊的修改會合併成一次寫入
+GROUP_COMMIT_WINDOW = float(os.environ.get("WRITE_GROUP_WINDOW_MS", 2)) / 1000
+
+# mutation 直接修改 index 對應的 Field 樹，回傳是否有改變；失敗時拋出例外
+Mutation = Callable[[FieldIndex], bool]
+
+
+class PreconditionFailed(Exception):
+    """If-Match 與檔案目前的版本不符"""
+
+    def __init__(self, current_etag: Optional[str]):
+        super().__init__(f"file has been modified (current version {current_etag or 'unknown'})")
+        self.current_etag = current_etag
+
+
+class FileMissing(Exception):
+    """要修改的檔案已不存在（例如在排隊期間被刪除）"""
+
+    def __init__(self, file_path: str):
+        super().__init__(f"file '{os.path.basename(file_path)}' not found")
+        self.file_path = file_path
+
+
+class FileLock:
+    """單一檔案的寫入 lock，沒有任何人持有參照時會從 WriteCoordinator 中移除
+
+    threading.Lock 不能被 weakref 參照，因此包一層。
+    """
+
+    __slots__ = ("_lock", "__weakref__")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        return self._lock.acquire(blocking, timeout)
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+class _PendingWrite:
+    __slots__ = ("mutation", "if_match", "future", "error")
+
+    def __init__(self, mutation: Mutation, if_match: Optional[str], future: asyncio.Future):
+        self.mutation = mutation
+        self.if_match = if_match
+        self.future = future
+        self.error: Optional[BaseException] = None
+
+
+class WriteCoordinator:
+    """規則檔的寫入協調
+
+    - 每個檔案一把 lock，載入、修改、寫回在同一把 lock 內完成，不會互相覆蓋
+    - 呼叫端可帶 If-Match（strong 比較），版本不符時拋出 PreconditionFailed；檔案已不存在時拋出 FileMissing
+    - group commit：同一時間窗內對同一檔案的修改依序套用在同一棵樹上，只寫一次檔案
+    """
+
+    def __init__(self, window: float = GROUP_COMMIT_WINDOW):
+        self.window = window
+        # 只保留仍有人使用的 lock，不會隨著寫過的檔案數量增加
+        self._locks: "weakref.WeakValueDictionary[str, FileLock]" = weakref.WeakValueDictionary()
+        self._locks_guard = threading.Lock()
+        # event loop -> {檔案路徑: 等待寫入的修改}；有項目代表該檔案已有 flush 工作在執行
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, List[_PendingWrite]]]" = \
+            weakref.WeakKeyDictionary()
+        self._tasks = set()
+        self._stats_lock = threading.Lock()
+        self.commits = 0
+        self.mutations = 0
+        self.conflicts = 0
+
+    def lock(self, file_path) -> FileLock:
+        """取得檔案的寫入 lock，同步的寫入流程（例如刪除檔案）也應持有這把 lock
+
+        呼叫端在使用期間必須保留回傳的物件，釋放參照後同一個檔案會拿到新的 lock。
+        """
+        key = os.path.abspath(file_path)
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = FileLock()
+                self._locks[key] = lock
+            return lock
+
+    async def submit(self, file_path, mutation: Mutation, if_match: Optional[str] = None) -> Optional[str]:
+        """排入一個修改並等待它被寫入，回傳寫入後的 ETag"""
+        loop = asyncio.get_running_loop()
+        key = os.path.abspath(file_path)
+        queues = self._queues.setdefault(loop, {})
+        pending = _PendingWrite(mutation, if_match, loop.create_future())
+
+        queue = queues.get(key)
+        if queue is None:
+            queues[key] = [pending]
+            task = loop.create_task(self._flush(key, queues))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            queue.append(pending)
+        return await pending.future
+
+    async def _flush(self, key: str, queues: Dict[str, List[_PendingWrite]]):
+        while True:
+            if self.window > 0:
+                await asyncio.sleep(self.window)
+            batch = queues[key]
+            queues[key] = []
+
+            try:
+                etag = await write_executor.run(self._commit, key, batch)
+            except BaseException as e:
+                for pending in batch:
+                    if pending.error is None:
+                        pending.error = e
+                etag = None
+            for pending in batch:
+                if pending.future.done():
+                    continue
+                if pending.error is not None:
+                    pending.future.set_exception(pending.error)
+                else:
+                    pending.future.set_result(etag)
+            # 寫入期間又有新的修改排入時繼續下一批
+            if not queues[key]:
+                del queues[key]
+                return
+
+    def _commit(self, key: str, batch: List[_PendingWrite]) -> Optional[str]:
+        """在 write executor 中執行：持有檔案 lock，依序套用整批修改後只寫一次"""
+        lock = self.lock(key)
+        with metrics.span("lock_wait"):
+            lock.acquire()
+        try:
+            return self._commit_locked(key, batch)
+        finally:
+            lock.release()
+
+    def _commit_locked(self, key: str, batch: List[_PendingWrite]) -> Optional[str]:
+        entry = load_cache_entry(os.path.dirname(key), os.path.basename(key))
+        if entry is None:
+            # 不重新建立已被刪除的檔案
+            for pending in batch:
+                pending.error = FileMissing(key)
+            return None
+        # 已套用未寫入的修改後，版本就不再是原本的 ETag
+        current = make_etag(entry.signature)
+        index = FieldIndex(entry.fresh_fields())
+        applied: List[_PendingWrite] = []
+
+        for pending in batch:
+            if pending.if_match is not None and not self._precondition_holds(pending.if_match, current):
+                pending.error = PreconditionFailed(current)
+                with self._stats_lock:
+                    self.conflicts += 1
+                continue
+            try:
+                with metrics.span("mutation"):
+                    changed = pending.mutation(index)
+            except Exception as e:
+                pending.error = e
+                # 失敗的修改可能只做了一半，從原始版本重建並重放先前成功的修改
+                index = FieldIndex(entry.fresh_fields())
+                for done in applied:
+                    done.mutation(index)
+                continue
+            if changed:
+                applied.append(pending)
+                current = None
+
+        with self._stats_lock:
+            self.mutations += len(batch)
+        if not applied:
+            return make_etag(entry.signature)
+
+        # 上一個版本已有展開結果時，只重建被修改到的第一層欄位
+        derived = None
+        views = entry.derived.get("views")
+        if views is not None:
+            derived = {"views": views.updated(index.fields, index.touched)}
+        try:
+            signature = save_json(key, index.fields, index, derived)
+        except Exception as e:
+            for pending in applied:
+                pending.error = e
+            return None
+        with self._stats_lock:
+            self.commits += 1
+        return make_etag(signature) if signature is not None else None
+
+    @staticmethod
+    def _precondition_holds(if_match: str, current: Optional[str]) -> bool:
+        if if_match.strip() == "*":
+            return True
+        return current is not None and etag_matches_strong(if_match, current)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "window_ms": self.window * 1000,
+                "commits": self.commits,
+                "mutations": self.mutations,
+                "conflicts": self.conflicts,
+            }
+
+
+write_coordinator = WriteCoordinator()